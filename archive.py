@@ -0,0 +1,242 @@
+"""Hot/cold archival of closed production and invoice periods.
+
+Production records dated before a cutoff, and paid invoices dated before
+it, are moved out of the main database into one archive file per year
+(archive/factory-2023.db next to factory.db). The main file keeps only the
+hot set, so the list screens, backups and VACUUM stop growing with every
+month of history. The production_daily rollup keeps every day, so salary,
+payroll, the dashboard and the schedule read the same figures as before.
+
+The archives table in the main database records, per year, the date up to
+which that year has been archived. database.py attaches a year's file
+(ATTACH DATABASE) and unions it in only when a query's date range reaches
+back before that date; a range reaching into more years than SQLite can
+attach at once is read as consecutive spans of years (archive_spans).
+Archived invoice ids stay in the main database too (archived_invoices), so
+an invoice can still be opened by id, its order is not offered for
+invoicing again and the order still cannot be deleted.
+
+Command line, from the project root:
+    python manage.py archive [--months 12] [--vacuum]
+"""
+import os
+from datetime import date
+
+import connection
+from connection import get_connection, transaction
+from migrations import PRODUCTION_DAILY_TRIGGERS
+
+# Directory, next to the database file, that holds the yearly archive files
+ARCHIVE_DIR = 'archive'
+
+# Months of history kept in the main database by default
+ARCHIVE_MONTHS = 12
+
+# SQLite attaches at most 10 databases to one connection
+MAX_ATTACHED = 10
+
+# Archived tables: their date column and the columns copied, in table order
+ARCHIVED_TABLES = {
+    'worker_production': ('date', ('id', 'worker_id', 'design_id', 'quantity', 'date')),
+    'invoices': ('invoice_date', ('id', 'order_id', 'invoice_date', 'amount', 'tax', 'discount', 'total_amount',
+                                  'status', 'version')),
+}
+
+# Tables of an archive file: the hot tables' columns, without foreign keys
+# (workers, designs and orders stay in the main database)
+ARCHIVE_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS {schema}.worker_production (
+        id INTEGER PRIMARY KEY,
+        worker_id INTEGER,
+        design_id INTEGER,
+        quantity INTEGER,
+        date TEXT
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_worker_production_date ON worker_production(date)",
+    '''
+    CREATE TABLE IF NOT EXISTS {schema}.invoices (
+        id INTEGER PRIMARY KEY,
+        order_id INTEGER,
+        invoice_date TEXT,
+        amount REAL,
+        tax REAL DEFAULT 0,
+        discount REAL DEFAULT 0,
+        total_amount REAL,
+        status TEXT,
+        version INTEGER NOT NULL DEFAULT 1
+    )
+    ''',
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_invoices_invoice_date ON invoices(invoice_date)",
+)
+
+
+def archive_path(year):
+    """Archive file for a year, e.g. archive/factory-2023.db beside factory.db"""
+    path = os.path.abspath(connection.DB_PATH)
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(os.path.dirname(path), ARCHIVE_DIR, f"{name}-{year}.db")
+
+
+def _schema(year):
+    return f"archive_{year}"
+
+
+def attach(conn, years):
+    """Attach the archive files of years to conn; returns their schema names.
+
+    Files already attached are reused. Archives attached for earlier
+    queries are detached when the connection would go over MAX_ATTACHED.
+    Like DETACH, this cannot run inside a transaction.
+    """
+    attached = {row[1] for row in conn.execute("PRAGMA database_list")} - {'main', 'temp'}
+    wanted = [_schema(year) for year in years]
+    missing = [year for year in years if _schema(year) not in attached]
+    spare = [schema for schema in attached if schema not in wanted]
+    while missing and spare and len(attached) + len(missing) > MAX_ATTACHED:
+        schema = spare.pop()
+        conn.execute(f"DETACH DATABASE {schema}")
+        attached.discard(schema)
+    for year in missing:
+        path = archive_path(year)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn.execute(f"ATTACH DATABASE ? AS {_schema(year)}", (path,))
+    return wanted
+
+
+def archive_boundary(conn=None):
+    """Date before which production has been archived ('' if nothing has)"""
+    conn = conn or get_connection()
+    return conn.execute("SELECT COALESCE(MAX(archived_before), '') FROM archives").fetchone()[0]
+
+
+def archived_years(conn, start=None, end=None):
+    """Years whose archive file may hold rows dated in [start, end)"""
+    years = []
+    for year, archived_before in conn.execute("SELECT year, archived_before FROM archives ORDER BY year"):
+        if (start is None or start < archived_before) and (end is None or end > f"{year}-01-01"):
+            years.append(year)
+    return years
+
+
+def archive_spans(conn, start=None, end=None):
+    """Split [start, end) into consecutive date ranges, oldest first, that each reach at most MAX_ATTACHED archives.
+
+    A range reaching into more archived years than a connection can attach
+    at once is read one span at a time, with union_source for each span.
+    """
+    years = archived_years(conn, start, end)
+    bounds = [start] + [f"{year}-01-01" for year in years[MAX_ATTACHED::MAX_ATTACHED]] + [end]
+    return list(zip(bounds, bounds[1:]))
+
+
+def union_source(conn, table, start=None, end=None):
+    """FROM-clause source of `table` rows dated in [start, end).
+
+    The hot table itself when the range is all hot, otherwise a UNION ALL
+    subquery over it and the archives the range reaches into; callers
+    still filter on the date, which SQLite pushes down into each part.
+    The range may reach at most MAX_ATTACHED archives; split longer ones
+    with archive_spans().
+    """
+    years = archived_years(conn, start, end)
+    if not years:
+        return table
+    if len(years) > MAX_ATTACHED:
+        raise ValueError(f"{start or 'the start'} to {end or 'today'} reaches {len(years)} archive years, "
+                         f"more than the {MAX_ATTACHED} that can be attached at once")
+    columns = ', '.join(ARCHIVED_TABLES[table][1])
+    schemas = ['main'] + attach(conn, years)
+    return '(' + ' UNION ALL '.join(f"SELECT {columns} FROM {schema}.{table}" for schema in schemas) + ')'
+
+
+def invoice_archive(conn, invoice_id):
+    """The archived invoices table holding invoice_id, or None if it is hot"""
+    row = conn.execute("SELECT invoice_date FROM archived_invoices WHERE id = ?", (invoice_id,)).fetchone()
+    if row is None:
+        return None
+    return attach(conn, [int(row[0][:4])])[0] + '.invoices'
+
+
+def cutoff_for(months=ARCHIVE_MONTHS, today=None):
+    """First day of the month `months` months before today's month"""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months
+    return f"{index // 12}-{index % 12 + 1:02d}-01"
+
+
+def _pending(conn, start, end):
+    # Whether [start, end) holds anything to archive
+    return conn.execute('''
+    SELECT EXISTS (SELECT 1 FROM worker_production WHERE date >= ? AND date < ?)
+        OR EXISTS (SELECT 1 FROM invoices WHERE invoice_date >= ? AND invoice_date < ? AND status = 'Paid')
+    ''', (start, end, start, end)).fetchone()[0]
+
+
+def _move_year(conn, schema, start, end):
+    # Copies then deletes the year's rows; the delete trigger is dropped so
+    # production_daily keeps the archived days. Returns (production, invoices).
+    columns = ', '.join(ARCHIVED_TABLES['worker_production'][1])
+    where = "date >= ? AND date < ?"
+    conn.execute(f"INSERT OR IGNORE INTO {schema}.worker_production ({columns}) "
+                 f"SELECT {columns} FROM main.worker_production WHERE {where}", (start, end))
+    conn.execute("DROP TRIGGER IF EXISTS trg_worker_production_delete")
+    production = conn.execute(f"DELETE FROM main.worker_production WHERE {where}", (start, end)).rowcount
+    conn.execute(PRODUCTION_DAILY_TRIGGERS['trg_worker_production_delete'])
+
+    columns = ', '.join(ARCHIVED_TABLES['invoices'][1])
+    where = "invoice_date >= ? AND invoice_date < ? AND status = 'Paid'"
+    conn.execute(f"INSERT OR IGNORE INTO {schema}.invoices ({columns}) "
+                 f"SELECT {columns} FROM main.invoices WHERE {where}", (start, end))
+    conn.execute(f"INSERT OR IGNORE INTO archived_invoices (id, order_id, invoice_date) "
+                 f"SELECT id, order_id, invoice_date FROM main.invoices WHERE {where}", (start, end))
+    invoices = conn.execute(f"DELETE FROM main.invoices WHERE {where}", (start, end)).rowcount
+    return production, invoices
+
+
+def archive_before(cutoff):
+    """Move production dated before cutoff, and paid invoices dated before it, to the yearly archive files.
+
+    Each year is moved in its own transaction. With the main database in
+    WAL mode a commit spanning two files is atomic per file only: if the
+    process dies mid-commit, a year's rows may be left in both files, and
+    running the archive again removes the hot copies. Returns
+    {year: (production rows, invoices)} for the years moved.
+    """
+    conn = get_connection()
+    first = conn.execute('''
+    SELECT MIN(first) FROM (
+        SELECT MIN(date) AS first FROM worker_production
+        UNION ALL
+        SELECT MIN(invoice_date) FROM invoices WHERE status = 'Paid'
+    )
+    ''').fetchone()[0]
+    moved = {}
+    if first is None or first >= cutoff:
+        return moved
+
+    for year in range(int(first[:4]), int(cutoff[:4]) + 1):
+        start, end = f"{year}-01-01", min(cutoff, f"{year + 1}-01-01")
+        if start >= end or not _pending(conn, start, end):
+            continue
+        schema, = attach(conn, [year])
+        for statement in ARCHIVE_SCHEMA:
+            conn.execute(statement.format(schema=schema))
+        with transaction():
+            moved[year] = _move_year(conn, schema, start, end)
+            conn.execute('''
+            INSERT INTO archives (year, archived_before) VALUES (?, ?)
+            ON CONFLICT (year) DO UPDATE SET archived_before = MAX(archived_before, excluded.archived_before)
+            ''', (year, end))
+    return moved
+
+
+def archive_status(conn=None):
+    """(year, archived_before, file path, file size in bytes) of every archive"""
+    conn = conn or get_connection()
+    status = []
+    for year, archived_before in conn.execute("SELECT year, archived_before FROM archives ORDER BY year").fetchall():
+        path = archive_path(year)
+        status.append((year, archived_before, path, os.path.getsize(path) if os.path.exists(path) else 0))
+    return status
@@ -0,0 +1 @@
+"""Benchmarks and checks; run each with python -m benchmarks.<name> from the project root"""
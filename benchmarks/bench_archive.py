@@ -0,0 +1,106 @@
+"""Hot/cold archival: main database size and query times before and after.
+
+Generates a dataset (or copies --db), times a few queries, archives
+everything older than --months before the generated period's end, VACUUMs
+and times the same queries again. Recent ranges should read only the hot
+set; ranges reaching back into the archives pay for attaching them.
+
+Run from the project root:
+    python -m benchmarks.bench_archive [--scale medium] [--db large.db] [--months 12]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import archive
+import connection
+import database
+from benchmarks import datagen
+
+
+def timed(runs, func, *args):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def _size(path):
+    return sum(os.path.getsize(path + suffix) for suffix in ('', '-wal') if os.path.exists(path + suffix))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=datagen.SCALES, default='medium')
+    parser.add_argument('--db', help="use a copy of this generated database instead")
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'factory.db')
+        if args.db:
+            source = sqlite3.connect(args.db)
+            target = sqlite3.connect(path)
+            source.backup(target)
+            source.close()
+            target.close()
+        else:
+            datagen.generate(path, **datagen.SCALES[args.scale])
+            connection.close_all()
+        connection.set_database_path(path)
+        database.initialize_database()
+
+        recent = database.month_range(datagen.END_DATE.month, datagen.END_DATE.year)
+        cutoff = archive.cutoff_for(args.months, datagen.END_DATE)
+        # The last month archived
+        old = (archive.cutoff_for(args.months + 1, datagen.END_DATE), cutoff)
+        cases = [
+            ('production list, first page', database.get_production_page),
+            ('invoices list, first page', database.get_invoices_page),
+            ('production, latest month', database.get_production_between, *recent),
+            (f'production, {old[0][:7]}', database.get_production_between, *old),
+            (f'invoices, {old[0][:7]}', database.get_invoice_details_between, *old),
+            ('uninvoiced orders', database.get_uninvoiced_orders),
+        ]
+
+        def run_cases():
+            results = []
+            for label, func, *params in cases:
+                # A fresh connection each case, so attaching the archives is timed
+                connection.close_all()
+                ms, result = timed(args.runs, func, *params)
+                # The list pages come back as (rows, next cursor)
+                results.append((ms, len(result[0] if isinstance(result, tuple) else result)))
+            return results
+
+        before = run_cases()
+        size_before = _size(path)
+        started = time.perf_counter()
+        moved = archive.archive_before(cutoff)
+        archive_s = time.perf_counter() - started
+        conn = database.get_db_connection()
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size_after = _size(path)
+        archived = sum(size for _, _, _, size in archive.archive_status())
+        after = run_cases()
+
+        print(f"archived {sum(p for p, _ in moved.values()):,} production records and "
+              f"{sum(i for _, i in moved.values()):,} paid invoices before {cutoff} in {archive_s:.1f}s")
+        print(f"main database: {size_before / 2**20:.1f} MB -> {size_after / 2**20:.1f} MB "
+              f"(+ {archived / 2**20:.1f} MB in {len(moved)} archive files)")
+        print(f"{'case':32} {'before ms':>10} {'after ms':>10} {'rows':>9}")
+        for (label, *_), (before_ms, rows), (after_ms, rows_after) in zip(cases, before, after):
+            assert rows == rows_after, label
+            print(f"{label:32} {before_ms:10.2f} {after_ms:10.2f} {rows:9,}")
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
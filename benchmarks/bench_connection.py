@@ -0,0 +1,75 @@
+"""Open-per-call versus pooled connection latency for the database.py helpers.
+
+Run from the project root:
+    python -m benchmarks.bench_connection [--calls N]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import connection
+import database
+
+
+def seed(workers=50, designs=50, clients=100, orders=2000, production=20000):
+    rnd = random.Random(42)
+    with connection.transaction() as conn:
+        conn.executemany("INSERT INTO workers (name, contact, joining_date, hourly_rate) VALUES (?, ?, ?, ?)",
+                         [(f"Worker {i}", "", "2024-01-01", 10 + i % 5) for i in range(workers)])
+        conn.executemany("INSERT INTO designs (name, description, base_price, complexity_level) VALUES (?, ?, ?, ?)",
+                         [(f"Design {i}", "", 5 + i % 20, 1 + i % 5) for i in range(designs)])
+        conn.executemany("INSERT INTO clients (name, company, contact, email, address) VALUES (?, ?, ?, ?, ?)",
+                         [(f"Client {i}", f"Company {i}", "", "", "") for i in range(clients)])
+        conn.executemany("INSERT INTO orders (client_id, design_id, quantity, order_date, deadline, status) VALUES (?, ?, ?, ?, ?, ?)",
+                         [(rnd.randint(1, clients), rnd.randint(1, designs), rnd.randint(1, 500),
+                           f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}", "2025-01-01", "Pending")
+                          for _ in range(orders)])
+        conn.executemany("INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+                         [(rnd.randint(1, workers), rnd.randint(1, designs), rnd.randint(1, 50),
+                           f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}")
+                          for _ in range(production)])
+
+
+def time_calls(func, calls, reopen, first=0):
+    start = time.perf_counter()
+    for i in range(first, first + calls):
+        func(i)
+        if reopen:
+            # Drop the connection so the next call pays the full open cost,
+            # which is what every helper did before the connection manager
+            connection.close_connection()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'bench.db'))
+        database.initialize_database()
+        # Each pass invoices its own orders: an order can only be invoiced once
+        seed(orders=max(2000, 2 * args.calls))
+
+        cases = [
+            ("get_all_workers", lambda i: database.get_all_workers()),
+            ("get_all_clients", lambda i: database.get_all_clients()),
+            ("calculate_worker_salary", lambda i: database.calculate_worker_salary(1 + i % 50, 1 + i % 12, 2024)),
+            ("get_all_orders", lambda i: database.get_all_orders()),
+            ("create_invoice", lambda i: database.create_invoice(1 + i, 5, 0)),
+        ]
+
+        print(f"{'helper':<26}{'per-call (us)':>16}{'pooled (us)':>14}{'speedup':>10}")
+        for name, func in cases:
+            per_call = time_calls(func, args.calls, reopen=True)
+            pooled = time_calls(func, args.calls, reopen=False, first=args.calls)
+            print(f"{name:<26}{per_call:>16.1f}{pooled:>14.1f}{per_call / pooled:>9.1f}x")
+
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Streaming export throughput and peak memory for production records.
+
+Exports a small and a large table in both formats. With --memory the peak
+Python memory is traced too (much slower); it should be about the same for
+both sizes, since rows are never all held.
+
+Run from the project root:
+    python -m benchmarks.bench_export [--rows N] [--memory]
+"""
+import argparse
+import os
+import tempfile
+import tracemalloc
+
+import connection
+import database
+import exporter
+from benchmarks.bench_connection import seed
+
+
+def measure(path, fmt, trace):
+    if not trace:
+        return exporter.export_rows('production', path, fmt), None
+    tracemalloc.start()
+    result = exporter.export_rows('production', path, fmt)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--memory', action='store_true', help="trace peak memory")
+    args = parser.parse_args()
+
+    for rows in (args.rows // 10, args.rows):
+        with tempfile.TemporaryDirectory() as tmp:
+            connection.set_database_path(os.path.join(tmp, 'export.db'))
+            database.initialize_database()
+            seed(production=rows)
+
+            for fmt in exporter.FORMATS:
+                result, peak = measure(os.path.join(tmp, 'production.' + fmt), fmt, args.memory)
+                line = (f"{fmt:5} {result['rows']:>10,} rows in {result['seconds']:6.2f}s "
+                        f"({result['per_second']:>9,.0f} rows/s)")
+                if peak is not None:
+                    line += f", peak {peak / 1024 / 1024:.1f} MiB"
+                print(line)
+
+            connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
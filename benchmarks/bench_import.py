@@ -0,0 +1,59 @@
+"""CSV import throughput for production records.
+
+Writes a CSV of --rows production rows (workers and designs by name, with a
+few deliberately bad rows) and imports it into a scratch database.
+
+Run from the project root:
+    python -m benchmarks.bench_import [--rows N]
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+
+import connection
+import database
+import importer
+from lookups import design_lookup, worker_lookup
+
+
+def write_csv(path, rows, workers, designs):
+    rnd = random.Random(42)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['worker', 'design', 'quantity', 'date'])
+        for i in range(rows):
+            if i % 10000 == 0:
+                writer.writerow(['Nobody', 'Design 1', '5', '2025-06-01'])
+                continue
+            writer.writerow([f"Worker {rnd.randrange(workers)}", f"Design {rnd.randrange(designs)}",
+                             rnd.randint(1, 50), f"2025-06-{rnd.randint(1, 28):02d}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'import.db'))
+        database.initialize_database()
+        with connection.transaction() as conn:
+            conn.executemany("INSERT INTO workers (name) VALUES (?)", [(f"Worker {i}",) for i in range(500)])
+            conn.executemany("INSERT INTO designs (name) VALUES (?)", [(f"Design {i}",) for i in range(200)])
+        worker_lookup.invalidate()
+        design_lookup.invalidate()
+
+        path = os.path.join(tmp, 'production.csv')
+        write_csv(path, args.rows, 500, 200)
+
+        result = importer.import_csv('production', path)
+        print(f"imported {result['imported']:,} rejected {len(result['rejected']):,} "
+              f"in {result['seconds']:.2f}s ({result['per_second']:,.0f} rows/s)")
+
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Month-end invoicing: create_invoice per order versus create_invoices.
+
+Run from the project root:
+    python -m benchmarks.bench_invoicing [--orders N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import connection
+import database
+from benchmarks.bench_connection import seed
+
+
+def fresh_database(path, orders):
+    connection.set_database_path(path)
+    database.initialize_database()
+    seed(orders=orders, production=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fresh_database(os.path.join(tmp, 'single.db'), args.orders)
+        start = time.perf_counter()
+        for order_id in range(1, args.orders + 1):
+            database.create_invoice(order_id, 5, 0)
+        single = time.perf_counter() - start
+
+        fresh_database(os.path.join(tmp, 'batch.db'), args.orders)
+        result = database.create_invoices(tax=5)
+        batch = result['seconds']
+        assert result['count'] == args.orders
+
+        connection.close_all()
+
+    print(f"orders: {args.orders}")
+    print(f"create_invoice loop: {single:8.3f} s  ({args.orders / single:10.0f} invoices/s)")
+    print(f"create_invoices:     {batch:8.3f} s  ({args.orders / batch:10.0f} invoices/s)")
+
+
+if __name__ == '__main__':
+    main()
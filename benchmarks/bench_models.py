@@ -0,0 +1,93 @@
+"""Per-row memory and construction rate of the record types in models.py.
+
+Loads --rows production records from a scratch database as plain tuples,
+sqlite3.Row, dicts, the previous dict-backed classes and the slotted
+models built by row_factory, and reports bytes per row and rows/second.
+
+Run from the project root:
+    python -m benchmarks.bench_models [--rows N]
+"""
+import argparse
+import gc
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+import connection
+import database
+from models import ProductionRecord
+
+
+class DictProductionRecord:
+    # models.ProductionRecord before __slots__, for comparison
+    def __init__(self, worker_id, design_id, quantity, date=None):
+        self.worker_id = worker_id
+        self.design_id = design_id
+        self.quantity = quantity
+        self.date = date
+
+    @classmethod
+    def from_db_row(cls, row):
+        return cls(worker_id=row[1], design_id=row[2], quantity=row[3], date=row[4])
+
+
+FACTORIES = [
+    ("tuple", None),
+    ("sqlite3.Row", sqlite3.Row),
+    ("dict", lambda cursor, row: {d[0]: v for d, v in zip(cursor.description, row)}),
+    ("dict-backed class", lambda cursor, row: DictProductionRecord.from_db_row(row)),
+    ("slotted ProductionRecord", ProductionRecord.row_factory),
+]
+
+
+def load(factory):
+    cursor = connection.get_connection().cursor()
+    cursor.row_factory = factory
+    cursor.execute("SELECT * FROM worker_production")
+    return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'models.db'))
+        database.initialize_database()
+        with connection.transaction() as conn:
+            conn.execute("INSERT INTO workers (name) VALUES ('Worker')")
+            conn.execute("INSERT INTO designs (name) VALUES ('Design')")
+            conn.executemany(
+                "INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (1, 1, ?, ?)",
+                ((rnd.randint(1, 50), f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}")
+                 for _ in range(args.rows)))
+
+        print(f"{'row type':<26}{'bytes/row':>12}{'rows/s':>14}")
+        for name, factory in FACTORIES:
+            load(factory)  # warm the page cache
+
+            gc.collect()
+            tracemalloc.start()
+            rows = load(factory)
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del rows
+            gc.collect()
+
+            start = time.perf_counter()
+            rows = load(factory)
+            rate = len(rows) / (time.perf_counter() - start)
+            del rows
+
+            print(f"{name:<26}{current / args.rows:>12.0f}{rate:>14,.0f}")
+
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
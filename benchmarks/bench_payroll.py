@@ -0,0 +1,58 @@
+"""Whole-factory payroll: one grouped query versus one call per worker.
+
+Run from the project root:
+    python -m benchmarks.bench_payroll [--workers N] [--rows N]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import connection
+import database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=500)
+    parser.add_argument('--rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'payroll.db'))
+        database.initialize_database()
+        with connection.transaction() as conn:
+            conn.executemany("INSERT INTO workers (name, hourly_rate) VALUES (?, ?)",
+                             [(f"Worker {i}", 10 + i % 7) for i in range(args.workers)])
+            conn.execute("INSERT INTO designs (name, base_price) VALUES ('Design', 10)")
+            conn.executemany(
+                "INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, 1, ?, ?)",
+                ((rnd.randint(1, args.workers), rnd.randint(1, 50),
+                  f"{rnd.randint(2022, 2025)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}")
+                 for _ in range(args.rows)))
+            conn.execute("ANALYZE")
+
+        worker_ids = [row[0] for row in database.get_all_workers()]
+
+        start = time.perf_counter()
+        per_worker = [database.calculate_worker_salary(worker_id, 6, 2025) for worker_id in worker_ids]
+        loop_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        payroll = database.run_payroll(6, 2025)
+        grouped_ms = (time.perf_counter() - start) * 1000
+
+        # Both paths must agree on the month's total
+        assert round(sum(p['salary'] for p in per_worker), 2) == round(sum(row[5] for row in payroll), 2)
+
+        print(f"workers: {len(worker_ids)}, production rows: {args.rows}")
+        print(f"per-worker calls: {loop_ms:8.1f} ms")
+        print(f"run_payroll:      {grouped_ms:8.1f} ms")
+
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Piece-rate payroll: priced with NumPy versus row by row, next to the hourly run.
+
+Each case is the median of --runs calls, for June 2025 and for the whole
+generated period (every production_daily row). The piece-rate paths must
+agree to the cent.
+
+Run from the project root:
+    python -m benchmarks.bench_piece_payroll [--scale medium] [--db large.db]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import connection
+import database
+import payroll
+from benchmarks import datagen
+
+
+def timed(runs, func, *args, **kwargs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=datagen.SCALES, default='medium')
+    parser.add_argument('--db', help="run against this generated database instead (read only)")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.db:
+            connection.set_database_path(args.db)
+        else:
+            datagen.generate(os.path.join(tmp, 'payroll.db'), **datagen.SCALES[args.scale])
+        conn = database.get_db_connection()
+        rows = conn.execute("SELECT COUNT(*) FROM production_daily").fetchone()[0]
+        workers = conn.execute("SELECT COUNT(*) FROM workers").fetchone()[0]
+        print(f"{workers:,} workers, {rows:,} production_daily rows, NumPy "
+              f"{'available' if payroll.np is not None else 'not installed'}")
+
+        periods = [('June 2025', database.month_range(6, 2025)), ('whole period', ('0000-01-01', '9999-12-31'))]
+        print(f"{'case':42} {'median ms':>10}")
+        for label, (start, end) in periods:
+            params = (database.HOURS_PER_ITEM, database.HOURS_PER_ITEM, start, end)
+            hourly_ms, _ = timed(args.runs, lambda: conn.execute(database.PAYROLL_SQL, params).fetchall())
+            print(f"{'hourly run_payroll, ' + label:42} {hourly_ms:10.1f}")
+
+            results = []
+            for vectorized in ((True, False) if payroll.np is not None else (False,)):
+                ms, result = timed(args.runs, payroll.piece_payroll_between, start, end, vectorized=vectorized)
+                results.append(result)
+                name = 'NumPy' if vectorized else 'row by row'
+                print(f"{f'piece rate, {name}, ' + label:42} {ms:10.1f}")
+            assert all(result == results[0] for result in results)
+
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Salary report latency as worker_production history grows.
+
+Fills worker_production in steps up to --rows (5M by default), spreading the
+rows over --years of history, and after each step times
+calculate_worker_salary for one month against the old strftime() filter.
+The range predicate should stay flat while the strftime() scan grows with
+the table.
+
+Run from the project root:
+    python -m benchmarks.bench_salary [--rows N] [--steps K]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import connection
+import database
+
+WORKERS = 200
+DESIGNS = 100
+
+LEGACY_SQL = '''
+SELECT SUM(quantity) as total_quantity
+FROM worker_production
+WHERE worker_id = ? AND strftime('%Y-%m', date) = ?
+'''
+
+
+def add_production(rows, years, rnd):
+    batch = 100000
+    with connection.transaction() as conn:
+        while rows > 0:
+            n = min(batch, rows)
+            conn.executemany(
+                "INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+                [(rnd.randint(1, WORKERS), rnd.randint(1, DESIGNS), rnd.randint(1, 50),
+                  f"{2025 - rnd.randrange(years)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}")
+                 for _ in range(n)])
+            rows -= n
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000000)
+    parser.add_argument('--steps', type=int, default=5)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'salary.db'))
+        database.initialize_database()
+        with connection.transaction() as conn:
+            conn.executemany("INSERT INTO workers (name, hourly_rate) VALUES (?, ?)",
+                             [(f"Worker {i}", 12) for i in range(WORKERS)])
+            conn.executemany("INSERT INTO designs (name, base_price) VALUES (?, ?)",
+                             [(f"Design {i}", 10) for i in range(DESIGNS)])
+
+        conn = connection.get_connection()
+        print(f"{'rows':>10}{'range (ms)':>14}{'strftime (ms)':>16}")
+        loaded = 0
+        for step in range(1, args.steps + 1):
+            target = args.rows * step // args.steps
+            add_production(target - loaded, args.years, rnd)
+            loaded = target
+
+            ranged = best_of(lambda: database.calculate_worker_salary(7, 6, 2025), args.repeat)
+            legacy = best_of(lambda: conn.execute(LEGACY_SQL, (7, "2025-06")).fetchone(), args.repeat)
+            print(f"{loaded:>10}{ranged:>14.3f}{legacy:>16.3f}")
+
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
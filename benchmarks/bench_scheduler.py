@@ -0,0 +1,111 @@
+"""Production schedule: a full build versus keeping it up to date.
+
+Builds the schedule of a generated dataset's open orders, then saves
+--records production records and --orders new orders one at a time and
+invoices --orders open orders, bringing the schedule up to date after each
+(the part timed), and reads the plan again. Finally the plan is checked
+against a fresh build: the two must be identical.
+
+Run from the project root:
+    python -m benchmarks.bench_scheduler [--scale medium] [--db large.db]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+import connection
+import database
+import scheduler
+from benchmarks import datagen
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=datagen.SCALES, default='medium')
+    parser.add_argument('--db', help="use a copy of this generated database instead")
+    parser.add_argument('--records', type=int, default=500)
+    parser.add_argument('--orders', type=int, default=100)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    today = datagen.END_DATE
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'schedule.db')
+        if args.db:
+            # The backup API copies a consistent snapshot, WAL included
+            source = sqlite3.connect(args.db)
+            target = sqlite3.connect(path)
+            source.backup(target)
+            source.close()
+            target.close()
+        else:
+            datagen.generate(path, **datagen.SCALES[args.scale])
+            connection.close_all()
+        connection.set_database_path(path)
+        database.initialize_database()
+
+        schedule = scheduler.Scheduler(today)
+        started = time.perf_counter()
+        schedule.replan()
+        build_s = time.perf_counter() - started
+        before = schedule.summary()
+        print(f"{len(schedule.jobs):,} open orders, {before['scheduled']:,} still to make, "
+              f"{before['late']:,} late")
+        print(f"full build:          {build_s * 1000:10.1f} ms")
+
+        conn = database.get_db_connection()
+        workers = [row[0] for row in conn.execute("SELECT id FROM workers")]
+        pending = [job.design_id for job in schedule.jobs.values() if job.worker_id is not None]
+        designs = [row[0] for row in conn.execute("SELECT id FROM designs")]
+
+        timings = []
+        for _ in range(args.records):
+            worker_id, design_id, quantity = rnd.choice(workers), rnd.choice(pending), rnd.randint(1, 60)
+            database.record_production(worker_id, design_id, quantity, today.isoformat())
+            started = time.perf_counter()
+            schedule.record_production(worker_id, design_id, quantity, today.isoformat())
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"production record:   {statistics.median(timings):10.2f} ms median, "
+              f"{_percentile(timings, 0.95):.2f} ms p95 ({args.records} records)")
+
+        timings = []
+        for _ in range(args.orders):
+            order_id = database.create_order(rnd.randint(1, 100), rnd.choice(designs), rnd.choice((50, 100, 500)),
+                                             today.isoformat(), (today + timedelta(days=30)).isoformat())
+            started = time.perf_counter()
+            schedule.order_changed(order_id)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"new order:           {statistics.median(timings):10.2f} ms median, "
+              f"{_percentile(timings, 0.95):.2f} ms p95 ({args.orders} orders)")
+
+        order_ids = rnd.sample(sorted(schedule.jobs), args.orders)
+        database.create_invoices(order_ids)
+        started = time.perf_counter()
+        schedule.orders_changed(order_ids)
+        print(f"{args.orders} invoices:        {(time.perf_counter() - started) * 1000:10.2f} ms")
+
+        started = time.perf_counter()
+        repaired = schedule.summary()
+        print(f"plan on next read:   {(time.perf_counter() - started) * 1000:10.1f} ms")
+
+        fresh = scheduler.Scheduler(today)
+        fresh.replan()
+        rebuilt = fresh.summary()
+        print(f"late orders:         {repaired['late']:,} kept up to date, {rebuilt['late']:,} rebuilt; "
+              f"{repaired['scheduled']:,} / {rebuilt['scheduled']:,} still to make")
+        assert repaired == rebuilt and schedule.rows() == fresh.rows(), "kept-up-to-date plan differs from a rebuild"
+        connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
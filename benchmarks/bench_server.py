@@ -0,0 +1,136 @@
+"""Requests per second through server.py under a shop-floor style load.
+
+Starts server.py on a generated dataset, then --clients concurrent
+keep-alive connections send a mix of requests for --seconds: mostly
+production entries and order list pages, with some new orders, single
+orders, salary lookups and invoices. The run is repeated with batching off
+(--batch-size 1) and on, and throughput, per-endpoint latency and the
+server's average batch size are printed for each.
+
+Run from the project root:
+    python -m benchmarks.bench_server [--clients 32] [--seconds 10] [--scale small]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import connection
+import server
+from benchmarks import datagen
+
+# Request mix as (weight, name, method, path factory, body factory)
+def workload(rnd, counts):
+    def production():
+        return {'worker_id': rnd.randint(1, counts['workers']), 'design_id': rnd.randint(1, counts['designs']),
+                'quantity': rnd.randint(1, 60), 'date': datagen.END_DATE.isoformat()}
+
+    def order():
+        return {'client_id': rnd.randint(1, counts['clients']), 'design_id': rnd.randint(1, counts['designs']),
+                'quantity': rnd.choice((50, 100, 500)), 'order_date': datagen.END_DATE.isoformat(),
+                'deadline': '2025-08-01'}
+
+    return [
+        (40, 'POST /production', 'POST', lambda: '/production', production),
+        (20, 'GET /orders', 'GET', lambda: '/orders', None),
+        (10, 'GET /orders/<id>', 'GET', lambda: f"/orders/{rnd.randint(1, counts['orders'])}", None),
+        (10, 'POST /orders', 'POST', lambda: '/orders', order),
+        (10, 'GET /salary', 'GET', lambda: f"/salary?worker_id={rnd.randint(1, counts['workers'])}&month=6&year=2025",
+         None),
+        (5, 'GET /clients?q=', 'GET', lambda: f"/clients?q={rnd.choice(datagen.LAST_NAMES)}", None),
+        (5, 'POST /invoices', 'POST', lambda: '/invoices', lambda: {'order_id': rnd.randint(1, counts['orders'])}),
+    ]
+
+
+async def request(reader, writer, method, path, body):
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: bench\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    payload = json.loads(await reader.readexactly(length))
+    return status, payload
+
+
+async def client(port, mix, deadline, latencies, statuses):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    weights = [entry[0] for entry in mix]
+    rnd = random.Random()
+    while time.perf_counter() < deadline:
+        _, name, method, path, body = rnd.choices(mix, weights)[0]
+        started = time.perf_counter()
+        status, _ = await request(reader, writer, method, path(), body() if body else None)
+        latencies.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+        statuses[status] = statuses.get(status, 0) + 1
+    writer.close()
+
+
+async def load(port, clients, seconds, mix):
+    latencies = {}
+    statuses = {}
+    deadline = time.perf_counter() + seconds
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, mix, deadline, latencies, statuses) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    _, stats = await request(reader, writer, 'GET', '/stats', None)
+    writer.close()
+    return latencies, statuses, elapsed, stats
+
+
+def start_server(path, batch_size):
+    process = subprocess.Popen([sys.executable, 'server.py', '--db', path, '--port', '0',
+                                '--batch-size', str(batch_size)], stdout=subprocess.PIPE, text=True)
+    # "serving <path> on http://127.0.0.1:<port>"
+    port = int(process.stdout.readline().rsplit(':', 1)[1])
+    return process, port
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--scale', choices=datagen.SCALES, default='small')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'server.db')
+        counts = datagen.generate(path, **datagen.SCALES[args.scale])
+        connection.close_all()
+        mix = workload(random.Random(42), counts)
+
+        for batch_size in (1, server.BATCH_SIZE):
+            process, port = start_server(path, batch_size)
+            try:
+                latencies, statuses, elapsed, stats = asyncio.run(load(port, args.clients, args.seconds, mix))
+            finally:
+                process.terminate()
+                process.wait()
+
+            total = sum(len(times) for times in latencies.values())
+            print(f"\nbatch size {batch_size}: {total:,} requests from {args.clients} clients in {elapsed:.1f}s "
+                  f"= {total / elapsed:,.0f} requests/s, average batch {stats['average_batch']:.1f}, "
+                  f"statuses {dict(sorted(statuses.items()))}")
+            print(f"  {'endpoint':20} {'requests':>9} {'median ms':>10} {'p95 ms':>10}")
+            for name, times in sorted(latencies.items()):
+                times.sort()
+                print(f"  {name:20} {len(times):>9,} {statistics.median(times):10.2f} "
+                      f"{times[min(len(times) - 1, int(len(times) * 0.95))]:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
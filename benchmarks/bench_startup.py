@@ -0,0 +1,142 @@
+"""Cold start: import time of the GUI and time until the main menu is usable.
+
+Import time comes from `python -X importtime -c "import gui"`, with the
+slowest modules it pulls in listed. Time to interactive is measured from
+launching a fresh interpreter to the main menu having been drawn, against a
+generated dataset (skipped without a display; use xvfb-run on a headless
+machine). Each figure is the median of --runs fresh processes. --out and
+--compare work like benchmarks.suite, so regressions show up as 'slower'.
+
+Run from the project root:
+    python -m benchmarks.bench_startup --out startup.json
+    python -m benchmarks.bench_startup --compare startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+from datetime import datetime
+
+import connection
+from benchmarks import datagen
+from benchmarks.suite import _git_commit, compare
+
+# Runs in the child: open the app on argv[1], print the time the menu is drawn
+INTERACTIVE = '''
+import sys, time, tkinter as tk
+import connection
+connection.set_database_path(sys.argv[1])
+from gui import FactoryManagementGUI
+root = tk.Tk()
+app = FactoryManagementGUI(root)
+show_menu = app.create_main_menu
+def ready():
+    show_menu()
+    root.update()
+    print(time.time())
+    root.destroy()
+app.create_main_menu = ready
+root.mainloop()
+'''
+
+
+def import_times():
+    # {module: cumulative microseconds} for one `import gui`
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import gui'],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def time_to_interactive(path):
+    started = time.time()
+    result = subprocess.run([sys.executable, '-c', INTERACTIVE, path],
+                            capture_output=True, text=True, check=True)
+    return (float(result.stdout.split()[-1]) - started) * 1000
+
+
+def has_display():
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return False
+    return True
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'calls': len(timings),
+        'median_ms': statistics.median(timings),
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'min_ms': timings[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--scale', choices=datagen.SCALES, default='small')
+    parser.add_argument('--top', type=int, default=10, help="list this many of the slowest imports")
+    parser.add_argument('--out', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare medians against")
+    args = parser.parse_args()
+
+    # One discarded run so every measured one finds the bytecode caches warm
+    import_times()
+    runs = [import_times() for _ in range(args.runs)]
+    results = {'import gui': summarize([run['gui'] / 1000 for run in runs])}
+
+    print(f"{'case':30} {'median ms':>10} {'p95 ms':>10}")
+    print(f"{'import gui':30} {results['import gui']['median_ms']:10.1f} {results['import gui']['p95_ms']:10.1f}")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)[1:args.top + 1]
+    for name, micros in slowest:
+        print(f"    {name:40} {micros / 1000:8.1f} ms cumulative")
+
+    if has_display():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'startup.db')
+            datagen.generate(path, **datagen.SCALES[args.scale])
+            connection.close_all()
+            time_to_interactive(path)
+            results['time_to_interactive'] = summarize([time_to_interactive(path) for _ in range(args.runs)])
+        stats = results['time_to_interactive']
+        print(f"{'time_to_interactive':30} {stats['median_ms']:10.1f} {stats['p95_ms']:10.1f}")
+    else:
+        print("time_to_interactive: skipped, no display available")
+
+    if args.out:
+        report = {
+            'meta': {
+                'commit': _git_commit(),
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'scale': args.scale,
+            },
+            'results': results,
+        }
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\ncompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}), median ms:")
+        print(f"{'case':30} {'before':>10} {'after':>10} {'ratio':>8}")
+        for line in compare(results, baseline['results']):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
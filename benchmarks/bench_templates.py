@@ -0,0 +1,50 @@
+"""Invoice render latency: read-and-compile per call versus the shared environment.
+
+Run from the project root:
+    python -m benchmarks.bench_templates [--renders N]
+"""
+import argparse
+import os
+import time
+
+from jinja2 import Template
+
+from invoice_pdf import TEMPLATE_NAME, render_invoice_html
+from templates import TEMPLATE_DIR
+
+INVOICE = {
+    'invoice_id': 42, 'order_id': 7, 'client_name': 'Client', 'client_company': 'Company',
+    'client_address': '1 Street', 'design_name': 'Design', 'unit_price': 12.5, 'quantity': 40,
+    'invoice_date': '2025-06-30', 'subtotal': 500.0, 'tax': 5.0, 'discount': 10.0, 'total': 515.0,
+}
+
+
+def render_uncached(invoice_data):
+    # What print_invoice used to do on every click
+    with open(os.path.join(TEMPLATE_DIR, TEMPLATE_NAME), 'r') as f:
+        template = Template(f.read())
+    return template.render(**invoice_data)
+
+
+def per_render_us(func, renders):
+    start = time.perf_counter()
+    for _ in range(renders):
+        func(INVOICE)
+    return (time.perf_counter() - start) / renders * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--renders', type=int, default=500)
+    args = parser.parse_args()
+
+    assert render_uncached(INVOICE) == render_invoice_html(INVOICE)
+
+    uncached = per_render_us(render_uncached, args.renders)
+    cached = per_render_us(render_invoice_html, args.renders)
+    print(f"compile per render: {uncached:9.1f} us")
+    print(f"shared environment: {cached:9.1f} us  ({uncached / cached:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
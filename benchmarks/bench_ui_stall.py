@@ -0,0 +1,115 @@
+"""Longest Tk main-loop stall while the GUI loads large tables.
+
+A heartbeat callback is scheduled every few milliseconds; the largest gap
+between two beats is how long the window was frozen. Each screen is opened
+on a seeded scratch database and the worst gap is reported, next to the
+stall caused by running the old full-table query on the main thread.
+
+Needs a display (use xvfb-run on a headless machine). Run from the project root:
+    python -m benchmarks.bench_ui_stall [--production N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+import connection
+import database
+from benchmarks.bench_connection import seed
+from gui import FactoryManagementGUI
+
+HEARTBEAT_MS = 5
+
+
+class StallMeter:
+    def __init__(self, root):
+        self.root = root
+        self.last = time.perf_counter()
+        self.worst = 0.0
+        self.beat()
+
+    def beat(self):
+        now = time.perf_counter()
+        self.worst = max(self.worst, now - self.last)
+        self.last = now
+        self.root.after(HEARTBEAT_MS, self.beat)
+
+    def reset(self):
+        self.last = time.perf_counter()
+        self.worst = 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--production', type=int, default=500000)
+    parser.add_argument('--orders', type=int, default=100000)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"no display available: {e}")
+        return 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        connection.set_database_path(os.path.join(tmp, 'ui.db'))
+        database.initialize_database()
+        seed(orders=args.orders, production=args.production)
+        with connection.transaction():
+            for order_id in range(1, args.orders // 10):
+                database.create_invoice(order_id)
+
+        app = FactoryManagementGUI(root)
+        app.create_main_menu()
+        meter = StallMeter(root)
+
+        def salary_report():
+            app.show_salary_reports()
+            app.salary_worker_var.set("1 - Worker 0")
+            app.generate_salary_report()
+
+        steps = [
+            ("main-thread get_production_records", lambda: database.get_production_records()),
+            ("Production Tracking", app.show_production_tracking),
+            ("Orders", app.show_orders_management),
+            ("Invoices", app.show_invoices_management),
+            ("Salary report", salary_report),
+        ]
+        results = []
+
+        def run_step(index):
+            if index == len(steps):
+                root.quit()
+                return
+            name, action = steps[index]
+            meter.reset()
+            action()
+            wait_idle(name, index)
+
+        def wait_idle(name, index):
+            # Let the background jobs finish, then give the loop a moment to settle
+            if app.db.pending:
+                root.after(10, lambda: wait_idle(name, index))
+                return
+            root.after(100, lambda: finish_step(name, index))
+
+        def finish_step(name, index):
+            results.append((name, meter.worst * 1000))
+            run_step(index + 1)
+
+        root.after(200, lambda: run_step(0))
+        root.mainloop()
+        app.db.shutdown()
+        root.destroy()
+        connection.close_all()
+
+    print(f"{'step':<40}{'longest stall (ms)':>20}")
+    for name, worst in results:
+        print(f"{name:<40}{worst:>20.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
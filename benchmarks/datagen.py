@@ -0,0 +1,211 @@
+"""Generate a synthetic factory database at a configurable scale.
+
+Data is shaped like a real shop floor rather than uniform noise: production
+is logged day by day over the period, a minority of designs and clients get
+most of the work, worker output varies, and older orders are more likely to
+be finished and invoiced. The same --seed always produces the same data.
+
+Run from the project root:
+    python -m benchmarks.datagen scratch.db --scale medium
+    python -m benchmarks.datagen scratch.db --workers 1000 --production 10000000
+"""
+import argparse
+import itertools
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import connection
+import database
+
+# Row counts per table; invoices cover INVOICED_SHARE of the orders
+SCALES = {
+    'small': dict(workers=50, designs=200, clients=500, orders=5000, production=100000),
+    'medium': dict(workers=200, designs=2000, clients=10000, orders=100000, production=1000000),
+    'large': dict(workers=1000, designs=10000, clients=100000, orders=1000000, production=10000000),
+}
+
+INVOICED_SHARE = 0.8
+
+# Production and orders are spread over this many days ending at END_DATE
+PERIOD_DAYS = 730
+END_DATE = date(2025, 6, 30)
+
+# Rows per executemany call
+CHUNK = 100000
+
+FIRST_NAMES = ('Ali', 'Sara', 'Omar', 'Ayesha', 'Bilal', 'Fatima', 'Hamza', 'Zainab', 'Usman', 'Hina')
+LAST_NAMES = ('Khan', 'Ahmed', 'Malik', 'Hussain', 'Shah', 'Iqbal', 'Raza', 'Butt', 'Qureshi', 'Sheikh')
+PRODUCTS = ('Shirt', 'Kurta', 'Scarf', 'Cushion', 'Tablecloth', 'Dupatta', 'Bag', 'Cap')
+STYLES = ('Floral', 'Paisley', 'Geometric', 'Monogram', 'Border', 'Logo', 'Bridal', 'Festive')
+
+
+def _zipf_weights(n, s=1.1):
+    # Cumulative weights where item k gets weight 1/k^s: a few items dominate
+    return list(itertools.accumulate(1 / (k ** s) for k in range(1, n + 1)))
+
+
+def _chunks(rows, size=CHUNK):
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            break
+        yield chunk
+
+
+def _insert(conn, sql, rows):
+    for chunk in _chunks(rows):
+        conn.executemany(sql, chunk)
+
+
+def _days():
+    first = END_DATE - timedelta(days=PERIOD_DAYS - 1)
+    return [(first + timedelta(days=i)).isoformat() for i in range(PERIOD_DAYS)]
+
+
+def _workers(rnd, count):
+    for i in range(count):
+        name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)} {i + 1}"
+        joined = (END_DATE - timedelta(days=rnd.randint(30, 3000))).isoformat()
+        yield name, f"03{rnd.randint(0, 99):02d}-{rnd.randint(0, 9999999):07d}", joined, rnd.choice((8, 10, 12, 15, 18, 20))
+
+
+def _designs(rnd, count):
+    for i in range(count):
+        complexity = rnd.choices((1, 2, 3, 4, 5), weights=(30, 30, 20, 12, 8))[0]
+        name = f"{rnd.choice(STYLES)} {rnd.choice(PRODUCTS)} {i + 1}"
+        yield name, f"{name} embroidery", round(2 + complexity * rnd.uniform(1.5, 4), 2), complexity
+
+
+def _clients(rnd, count):
+    for i in range(count):
+        company = f"{rnd.choice(LAST_NAMES)} Textiles {i + 1}"
+        yield (f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}", company,
+               f"03{rnd.randint(0, 99):02d}-{rnd.randint(0, 9999999):07d}",
+               f"orders{i + 1}@example.com", f"{rnd.randint(1, 500)} Industrial Area, Faisalabad")
+
+
+def _production(rnd, count, workers, designs, days):
+    # Logged in date order, like a real table growing over time; each worker
+    # has a steady output level so salaries differ in a believable way
+    output = [rnd.uniform(5, 60) for _ in range(workers)]
+    design_weights = _zipf_weights(designs)
+    per_day = count / len(days)
+    produced = 0
+    for index, day in enumerate(days):
+        target = min(count, round(per_day * (index + 1)))
+        n = target - produced
+        produced = target
+        worker_ids = rnd.choices(range(1, workers + 1), k=n)
+        design_ids = rnd.choices(range(1, designs + 1), cum_weights=design_weights, k=n)
+        for worker_id, design_id in zip(worker_ids, design_ids):
+            yield worker_id, design_id, max(1, int(rnd.gauss(output[worker_id - 1], 5))), day
+
+
+def _orders(rnd, count, clients, designs, days):
+    client_weights = _zipf_weights(clients, 1.0)
+    design_weights = _zipf_weights(designs)
+    last = len(days) - 1
+    client_ids = rnd.choices(range(1, clients + 1), cum_weights=client_weights, k=count)
+    design_ids = rnd.choices(range(1, designs + 1), cum_weights=design_weights, k=count)
+    for i in range(count):
+        placed = i * last // max(1, count - 1)
+        deadline = END_DATE - timedelta(days=last - placed) + timedelta(days=rnd.randint(7, 60))
+        # Older orders are more likely to be done and billed
+        age = (last - placed) / last if last else 0
+        if rnd.random() < INVOICED_SHARE * min(1, age * 1.5 + 0.2):
+            status = 'Invoiced'
+        else:
+            status = rnd.choices(('Pending', 'In Progress', 'Completed', 'Delivered', 'Cancelled'),
+                                 weights=(30, 35, 15, 15, 5))[0]
+        yield (client_ids[i], design_ids[i], rnd.choice((50, 100, 200, 250, 500, 1000, 2000)),
+               days[placed], deadline.isoformat(), status)
+
+
+def _invoices(rnd, conn):
+    # One invoice per 'Invoiced' order, priced the way create_invoice does
+    cursor = conn.execute('''
+    SELECT o.id, o.order_date, d.base_price * o.quantity
+    FROM orders o JOIN designs d ON o.design_id = d.id
+    WHERE o.status = 'Invoiced'
+    ORDER BY o.id
+    ''')
+    for order_id, order_date, amount in cursor:
+        tax = rnd.choice((0, 0, 5, 17))
+        discount = rnd.choice((0, 0, 0, 50, 100))
+        invoiced = (date.fromisoformat(order_date) + timedelta(days=rnd.randint(5, 45))).isoformat()
+        status = 'Paid' if rnd.random() < 0.7 else 'Unpaid'
+        yield order_id, invoiced, amount, tax, discount, amount + amount * tax / 100 - discount, status
+
+
+def generate(path, workers, designs, clients, orders, production, seed=42):
+    """Create a fresh database at path; returns per-table row counts"""
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    rnd = random.Random(seed)
+    days = _days()
+    connection.set_database_path(path)
+    database.initialize_database()
+
+    with connection.transaction() as conn:
+        _insert(conn, "INSERT INTO workers (name, contact, joining_date, hourly_rate) VALUES (?, ?, ?, ?)",
+                _workers(rnd, workers))
+        _insert(conn, "INSERT INTO designs (name, description, base_price, complexity_level) VALUES (?, ?, ?, ?)",
+                _designs(rnd, designs))
+        _insert(conn, "INSERT INTO clients (name, company, contact, email, address) VALUES (?, ?, ?, ?, ?)",
+                _clients(rnd, clients))
+        _insert(conn, "INSERT INTO orders (client_id, design_id, quantity, order_date, deadline, status) "
+                      "VALUES (?, ?, ?, ?, ?, ?)",
+                _orders(rnd, orders, clients, designs, days))
+        _insert(conn, "INSERT INTO invoices (order_id, invoice_date, amount, tax, discount, total_amount, status) "
+                      "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                list(_invoices(rnd, conn)))
+
+    # Production in its own transactions so a 10M-row run does not hold one
+    # giant journal
+    for chunk in _chunks(_production(rnd, production, workers, designs, days)):
+        with connection.transaction() as conn:
+            conn.executemany("INSERT INTO worker_production (worker_id, design_id, quantity, date) "
+                             "VALUES (?, ?, ?, ?)", chunk)
+
+    conn = connection.get_connection()
+    conn.execute("ANALYZE")
+    return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('workers', 'designs', 'clients', 'orders', 'invoices', 'worker_production')}
+
+
+def add_scale_arguments(parser):
+    parser.add_argument('--scale', choices=SCALES, default='medium')
+    for table in SCALES['small']:
+        parser.add_argument(f'--{table}', type=int, help=f"override the number of {table} rows")
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def scale_from_args(args):
+    counts = dict(SCALES[args.scale])
+    for table in counts:
+        if getattr(args, table) is not None:
+            counts[table] = getattr(args, table)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help="database file to create (replaced if it exists)")
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    counts = generate(args.path, seed=args.seed, **scale_from_args(args))
+    print(f"generated {args.path} in {time.perf_counter() - started:.1f}s")
+    for table, count in counts.items():
+        print(f"  {table:18} {count:>12,}")
+    connection.close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""Several processes writing one database file at once, as clerks sharing factory.db do.
+
+Each process spends --seconds recording production, creating orders and
+incrementing the quantity of a few shared "counter" orders the way the
+order form updates them (read the order, think, write it back). The
+increments go through update_order, so a clash is reported as a
+ConflictError and retried from a fresh read. Every successful increment is
+counted, and the counters must have grown by exactly that much: any
+difference is a lost update. --unversioned writes the increments back
+with a plain UPDATE instead, as the order form used to, to show what the
+versioning prevents.
+
+Lock waits are the time BEGIN IMMEDIATE spent waiting for the write lock,
+taken from querylog's histogram (so each percentile is a bucket's upper
+bound).
+
+Run from the project root:
+    python -m benchmarks.stress_writers [--processes 8] [--seconds 10] [--unversioned]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+
+import connection
+import database
+import querylog
+from benchmarks.bench_connection import seed
+
+COUNTERS = 5
+
+# Pause between reading an order and writing it back, in seconds; a clerk's
+# edit, scaled down
+THINK_TIME = 0.002
+
+
+def _increment_versioned(order_id):
+    # Returns the number of conflicts it took
+    conflicts = 0
+    while True:
+        order = database.get_order(order_id)
+        time.sleep(random.uniform(0, THINK_TIME))
+        try:
+            database.update_order(order_id, order.version, order.client_id, order.design_id, order.quantity + 1,
+                                  order.order_date, order.deadline, order.status)
+            return conflicts
+        except database.ConflictError:
+            conflicts += 1
+
+
+def _increment_unversioned(order_id):
+    quantity = database.get_order(order_id).quantity
+    time.sleep(random.uniform(0, THINK_TIME))
+    with connection.transaction() as conn:
+        conn.execute("UPDATE orders SET quantity=? WHERE id=?", (quantity + 1, order_id))
+    return 0
+
+
+def worker(path, seconds, unversioned, seed_value):
+    connection.set_database_path(path)
+    rnd = random.Random(seed_value)
+    increment = _increment_unversioned if unversioned else _increment_versioned
+    counts = {'increments': 0, 'conflicts': 0, 'production': 0, 'orders': 0, 'locked_errors': 0}
+    latencies = []
+
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        choice = rnd.random()
+        started = time.perf_counter()
+        try:
+            if choice < 0.5:
+                counts['conflicts'] += increment(rnd.randint(1, COUNTERS))
+                counts['increments'] += 1
+            elif choice < 0.8:
+                database.record_production(rnd.randint(1, 50), rnd.randint(1, 50), rnd.randint(1, 50), '2025-06-01')
+                counts['production'] += 1
+            else:
+                database.create_order(rnd.randint(1, 100), rnd.randint(1, 50), 100, '2025-06-01', '2025-07-01')
+                counts['orders'] += 1
+        except sqlite3.OperationalError as error:
+            if not connection.is_busy_error(error):
+                raise
+            counts['locked_errors'] += 1
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    begin = [row for row in querylog.snapshot() if row['sql'] == 'BEGIN IMMEDIATE']
+    waits = [count for bound, count in begin[0]['histogram']] if begin else [0] * len(querylog.BUCKETS_MS)
+    connection.close_all()
+    return counts, latencies, waits
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0
+
+
+def _bucket_percentile(buckets, fraction):
+    wanted = sum(buckets) * fraction
+    seen = 0
+    for bound, count in zip(querylog.BUCKETS_MS, buckets):
+        seen += count
+        if count and seen >= wanted:
+            return bound
+    return 0
+
+
+def counter_total():
+    return database.get_db_connection().execute(
+        "SELECT SUM(quantity) FROM orders WHERE id <= ?", (COUNTERS,)).fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--unversioned', action='store_true',
+                        help="write increments back unconditionally (last writer wins)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'stress.db')
+        connection.set_database_path(path)
+        database.initialize_database()
+        seed()
+        before = counter_total()
+        connection.close_all()
+
+        # spawn, so no process inherits another's open connection
+        context = multiprocessing.get_context('spawn')
+        started = time.perf_counter()
+        with context.Pool(args.processes) as pool:
+            results = pool.starmap(worker, [(path, args.seconds, args.unversioned, i)
+                                            for i in range(args.processes)])
+        elapsed = time.perf_counter() - started
+
+        connection.set_database_path(path)
+        grown = counter_total() - before
+        connection.close_all()
+
+    totals = {key: sum(counts[key] for counts, _, _ in results) for key in results[0][0]}
+    latencies = sorted(ms for _, times, _ in results for ms in times)
+    waits = [sum(column) for column in zip(*(buckets for _, _, buckets in results))]
+    lost = totals['increments'] - grown
+    writes = totals['increments'] + totals['production'] + totals['orders']
+
+    print(f"{args.processes} processes, {args.seconds:g}s, "
+          f"{'unversioned (last writer wins)' if args.unversioned else 'versioned updates'}")
+    print(f"  writes            {writes:,} ({writes / elapsed:,.0f}/s): {totals['increments']:,} increments, "
+          f"{totals['production']:,} production records, {totals['orders']:,} orders")
+    print(f"  write latency     median {statistics.median(latencies):.2f} ms, "
+          f"p95 {_percentile(latencies, 0.95):.2f} ms, p99 {_percentile(latencies, 0.99):.2f} ms")
+    print(f"  lock wait         p50 <= {_bucket_percentile(waits, 0.5):g} ms, "
+          f"p95 <= {_bucket_percentile(waits, 0.95):g} ms, p99 <= {_bucket_percentile(waits, 0.99):g} ms")
+    print(f"  conflicts retried {totals['conflicts']:,}")
+    print(f"  locked errors     {totals['locked_errors']:,}")
+    print(f"  lost updates      {lost:,} (counters grew {grown:,} for {totals['increments']:,} increments)")
+    return 1 if lost or totals['locked_errors'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,290 @@
+"""Time every public database.py function against a synthetic dataset.
+
+The dataset comes from benchmarks.datagen: generated fresh into a scratch
+directory, or copied from an existing file with --db so one large dataset
+can be reused across runs (the copy keeps the writes at the end of the run
+from changing it). Results are printed as a table and, with --out, written
+as JSON that a later run can be compared against with --compare.
+
+Run from the project root:
+    python -m benchmarks.suite --scale small --out before.json
+    python -m benchmarks.suite --scale small --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import connection
+import database
+from benchmarks import datagen
+
+
+def _git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('-dirty' if dirty else '')
+
+
+def _ids(table):
+    return [row[0] for row in database.get_db_connection().execute(f"SELECT id FROM {table}")]
+
+
+def _deep_cursor(page_func, pages):
+    # Cursor token up to `pages` pages into the list, to time a scrolled-down
+    # page; stops at the last non-empty page of a shorter list
+    tokens = [None]
+    for _ in range(pages):
+        rows, next_token = page_func(tokens[-1])
+        if not rows:
+            tokens.pop()
+            break
+        if not next_token:
+            break
+        tokens.append(next_token)
+    return tokens[-1] if tokens else None
+
+
+def _bulk_load(records):
+    # database.bulk_production_load is a context manager; this is one load
+    with database.bulk_production_load() as conn:
+        conn.executemany("INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+                         records)
+    return len(records)
+
+
+def build_cases(rnd):
+    """(name, function, argument factory, calls), read-only cases first"""
+    worker_ids = _ids('workers')
+    design_ids = _ids('designs')
+    client_ids = _ids('clients')
+    order_ids = _ids('orders')
+    invoice_ids = _ids('invoices')
+    end = datagen.END_DATE
+    months = [(m, y) for y in (end.year - 1, end.year) for m in range(1, 13)
+              if (y, m) <= (end.year, end.month)]
+
+    def pick(ids):
+        return lambda: (rnd.choice(ids),)
+
+    def month():
+        return rnd.choice(months)
+
+    def month_bounds():
+        return database.month_range(*month())
+
+    # Production ids are contiguous; listing 10M of them would cost more than the case
+    last_production = database.get_db_connection().execute("SELECT MAX(id) FROM worker_production").fetchone()[0] or 1
+
+    deep_orders = _deep_cursor(database.get_orders_page, 50)
+    deep_production = _deep_cursor(database.get_production_page, 50)
+    deep_invoices = _deep_cursor(database.get_invoices_page, 50)
+    uninvoiced = [row[0] for row in database.get_uninvoiced_orders()]
+    rnd.shuffle(uninvoiced)
+    # update_order edits orders already invoiced, so create_invoice's pool is untouched
+    invoiced = sorted(set(order_ids) - set(uninvoiced)) or order_ids
+    days = [(end - timedelta(days=n)).isoformat() for n in range(30)]
+
+    def production():
+        return (rnd.choice(worker_ids), rnd.choice(design_ids), rnd.randint(1, 60), rnd.choice(days))
+
+    def new_order():
+        placed = rnd.choice(days)
+        return (rnd.choice(client_ids), rnd.choice(design_ids), rnd.choice((50, 100, 500)), placed,
+                (date.fromisoformat(placed) + timedelta(days=30)).isoformat())
+
+    def order_edit():
+        # Reads the version each time, as the edit dialog does
+        order = database.get_order(rnd.choice(invoiced))
+        return (order.id, order.version, order.client_id, order.design_id, order.quantity + 1,
+                order.order_date, order.deadline, order.status)
+
+    def invoice_status():
+        invoice = database.get_invoice(rnd.choice(invoice_ids))
+        return (invoice.id, invoice.version, 'Paid' if invoice.status == 'Unpaid' else 'Unpaid')
+
+    return [
+        ('initialize_database', database.initialize_database, tuple, 20),
+        ('get_db_connection', database.get_db_connection, tuple, 1000),
+        ('month_range', database.month_range, month, 1000),
+        ('get_all_workers', database.get_all_workers, tuple, 20),
+        ('get_all_designs', database.get_all_designs, tuple, 10),
+        ('get_all_clients', database.get_all_clients, tuple, 5),
+        ('get_all_orders', database.get_all_orders, tuple, 2),
+        ('get_production_records', database.get_production_records, tuple, 1),
+        ('get_worker', database.get_worker, pick(worker_ids), 500),
+        ('get_design', database.get_design, pick(design_ids), 500),
+        ('get_client', database.get_client, pick(client_ids), 500),
+        ('get_order', database.get_order, pick(order_ids), 500),
+        ('get_production', database.get_production, lambda: (rnd.randint(1, last_production),), 500),
+        ('get_invoice', database.get_invoice, pick(invoice_ids), 500),
+        ('get_order_row', database.get_order_row, pick(order_ids), 500),
+        ('get_production_row', database.get_production_row, lambda: (rnd.randint(1, last_production),), 500),
+        ('get_invoice_row', database.get_invoice_row, pick(invoice_ids), 500),
+        ('get_production_between', database.get_production_between, month_bounds, 5),
+        ('fetch_records', lambda start, end: database.fetch_records(
+            database.ProductionRecord,
+            "SELECT * FROM worker_production WHERE date >= ? AND date < ?", (start, end)), month_bounds, 5),
+        # The GUI list screens (orders, production, and load_invoices)
+        ('get_orders_page', database.get_orders_page, tuple, 50),
+        ('get_orders_page.deep', database.get_orders_page, lambda: (deep_orders,), 50),
+        ('get_production_page', database.get_production_page, tuple, 50),
+        ('get_production_page.deep', database.get_production_page, lambda: (deep_production,), 50),
+        ('get_invoices_page', database.get_invoices_page, tuple, 50),
+        ('get_invoices_page.deep', database.get_invoices_page, lambda: (deep_invoices,), 50),
+        # The search boxes on the designs, clients and orders screens
+        ('fts_query', database.fts_query, lambda: (rnd.choice(datagen.PRODUCTS) + ' ' + rnd.choice(datagen.STYLES),),
+         1000),
+        ('search_clients', database.search_clients, lambda: (rnd.choice(datagen.LAST_NAMES),), 50),
+        ('search_designs', database.search_designs, lambda: (rnd.choice(datagen.STYLES)[:3],), 50),
+        ('search_orders_page', database.search_orders_page, lambda: (rnd.choice(datagen.PRODUCTS),), 50),
+        # gui show_dashboard, refreshed while it is open
+        ('get_dashboard', database.get_dashboard, lambda: (end,), 20),
+        # gui load_invoice_dropdown
+        ('get_uninvoiced_orders', database.get_uninvoiced_orders, tuple, 5),
+        # gui print_invoice / generate_invoice join
+        ('get_invoice_details', database.get_invoice_details, pick(invoice_ids), 500),
+        ('get_invoice_details_between', database.get_invoice_details_between, month_bounds, 5),
+        ('calculate_worker_salary', database.calculate_worker_salary,
+         lambda: (rnd.choice(worker_ids),) + month(), 200),
+        ('run_payroll', database.run_payroll, month, 10),
+        ('check_production_daily', database.check_production_daily, tuple, 1),
+        # Writes last
+        ('create_order', database.create_order, new_order, 200),
+        ('update_order', database.update_order, order_edit, 200),
+        ('set_invoice_status', database.set_invoice_status, invoice_status, 200),
+        ('record_production', database.record_production, production, 200),
+        ('record_production_many', database.record_production_many,
+         lambda: ([production() for _ in range(100)],), 20),
+        ('bulk_production_load', _bulk_load, lambda: ([production() for _ in range(10000)],), 5),
+        ('rebuild_production_daily', database.rebuild_production_daily, tuple, 1),
+        # Each on orders nobody has invoiced yet
+        ('create_invoice', database.create_invoice, lambda: (uninvoiced.pop(), 5, 0), min(200, len(uninvoiced) // 2)),
+        ('create_invoices', database.create_invoices,
+         lambda: ([uninvoiced.pop() for _ in range(min(100, len(uninvoiced)))],), 5),
+    ]
+
+
+def run_case(func, make_args, calls):
+    timings = []
+    result = None
+    for _ in range(calls):
+        args = make_args()
+        started = time.perf_counter()
+        result = func(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    stats = {
+        'calls': calls,
+        'mean_ms': statistics.fmean(timings),
+        'median_ms': statistics.median(timings),
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        'min_ms': timings[0],
+    }
+    if isinstance(result, list):
+        stats['rows'] = len(result)
+    elif isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], list):
+        # A page: (rows, next_cursor)
+        stats['rows'] = len(result[0])
+    elif isinstance(result, dict) and 'count' in result:
+        stats['rows'] = result['count']
+    return stats
+
+
+def compare(results, baseline):
+    # Lines of 'name  before  after  ratio' for cases present in both runs
+    lines = []
+    for name, stats in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = stats['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        flag = '  slower' if ratio > 1.2 else '  faster' if ratio < 0.8 else ''
+        lines.append(f"{name:30} {before['median_ms']:10.3f} {stats['median_ms']:10.3f} {ratio:7.2f}x{flag}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    datagen.add_scale_arguments(parser)
+    parser.add_argument('--db', help="reuse this generated database (it is copied, not modified)")
+    parser.add_argument('--only', nargs='*', help="run only these cases")
+    parser.add_argument('--out', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare medians against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'suite.db')
+        started = time.perf_counter()
+        if args.db:
+            # The backup API copies a consistent snapshot, WAL included
+            source = sqlite3.connect(args.db)
+            target = sqlite3.connect(path)
+            source.backup(target)
+            source.close()
+            target.close()
+            connection.set_database_path(path)
+            # Brings a dataset generated before a schema migration up to date
+            database.initialize_database()
+            counts = {table: database.get_db_connection().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                      for table in ('workers', 'designs', 'clients', 'orders', 'invoices', 'worker_production')}
+        else:
+            counts = datagen.generate(path, seed=args.seed, **datagen.scale_from_args(args))
+        print(f"dataset ready in {time.perf_counter() - started:.1f}s: "
+              + ", ".join(f"{table} {count:,}" for table, count in counts.items()))
+
+        rnd = random.Random(args.seed)
+        results = {}
+        print(f"{'case':30} {'calls':>6} {'median ms':>10} {'p95 ms':>10} {'rows':>10}")
+        for name, func, make_args, calls in build_cases(rnd):
+            if args.only and name not in args.only:
+                continue
+            if calls <= 0:
+                continue
+            stats = run_case(func, make_args, calls)
+            results[name] = stats
+            print(f"{name:30} {calls:>6} {stats['median_ms']:10.3f} {stats['p95_ms']:10.3f} "
+                  f"{stats.get('rows', ''):>10}")
+
+        connection.close_all()
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'dataset': counts,
+        },
+        'results': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\ncompared with {baseline['meta'].get('commit')} ({baseline['meta'].get('timestamp')}), median ms:")
+        print(f"{'case':30} {'before':>10} {'after':>10} {'ratio':>8}")
+        for line in compare(results, baseline['results']):
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
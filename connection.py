@@ -0,0 +1,155 @@
+import functools
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+import querylog
+
+DB_PATH = 'factory.db'
+
+# Applied once to every new connection
+PRAGMAS = (
+    # Wait up to 5 s for another process's write lock instead of failing
+    # at once with "database is locked"
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",     # ~20 MB page cache
+    "PRAGMA mmap_size=268435456",   # 256 MB memory-mapped I/O
+)
+
+# Further attempts at a write that still finds the database locked after
+# busy_timeout, with a random backoff of up to BUSY_BACKOFF * 2**attempt seconds
+BUSY_RETRIES = 4
+BUSY_BACKOFF = 0.05
+
+_local = threading.local()
+_all_connections = []
+_lock = threading.Lock()
+# Bumped by close_all() so other threads drop their stale connections
+_generation = 0
+
+
+def _open_connection(path):
+    # isolation_level=None puts sqlite3 in autocommit mode; writes are grouped
+    # explicitly with transaction() below. Each thread still only uses its own
+    # connection; check_same_thread is off so close_all() can shut them down.
+    # Statements are timed by querylog unless it has been switched off.
+    factory = querylog.InstrumentedConnection if querylog.ENABLED else sqlite3.Connection
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False, factory=factory)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def get_connection():
+    """Return the long-lived connection for the calling thread"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.generation != _generation:
+        conn = _open_connection(DB_PATH)
+        _local.conn = conn
+        _local.depth = 0
+        _local.generation = _generation
+        with _lock:
+            _all_connections.append(conn)
+    return conn
+
+
+@contextmanager
+def transaction():
+    """Run a block of statements atomically on the thread's connection.
+
+    Nested blocks become savepoints, so helpers that write can be called
+    from inside a larger transaction. The outermost block takes the write
+    lock up front (BEGIN IMMEDIATE): a deferred transaction that reads and
+    then writes can fail with "database is locked" when another process
+    wrote in between, without busy_timeout ever being consulted.
+    """
+    conn = get_connection()
+    depth = _local.depth
+    if depth == 0:
+        conn.execute("BEGIN IMMEDIATE")
+    else:
+        conn.execute(f"SAVEPOINT sp_{depth}")
+    _local.depth = depth + 1
+    try:
+        yield conn
+    except BaseException:
+        _local.depth = depth
+        if depth == 0:
+            conn.execute("ROLLBACK")
+        else:
+            conn.execute(f"ROLLBACK TO sp_{depth}")
+            conn.execute(f"RELEASE sp_{depth}")
+        raise
+    else:
+        _local.depth = depth
+        if depth == 0:
+            try:
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                # A failed COMMIT leaves the transaction open
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        else:
+            conn.execute(f"RELEASE sp_{depth}")
+
+
+def is_busy_error(error):
+    return isinstance(error, sqlite3.OperationalError) and (
+        'locked' in str(error) or 'busy' in str(error))
+
+
+def retry_on_busy(func):
+    """Re-run func when the database stays locked past busy_timeout.
+
+    Each retry waits a random (jittered) backoff first, so processes that
+    collided do not all try again at the same moment. Inside an enclosing
+    transaction the error is passed up instead: only the outermost caller
+    can safely run the whole unit of work again.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(BUSY_RETRIES + 1):
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as error:
+                if attempt == BUSY_RETRIES or not is_busy_error(error) or getattr(_local, 'depth', 0):
+                    raise
+            time.sleep(random.uniform(0, BUSY_BACKOFF * 2 ** attempt))
+    return wrapper
+
+
+def close_connection():
+    """Close the calling thread's connection (reopened on next use)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        with _lock:
+            if conn in _all_connections:
+                _all_connections.remove(conn)
+        conn.close()
+        _local.conn = None
+
+
+def close_all():
+    """Close every connection opened by any thread"""
+    global _generation
+    with _lock:
+        _generation += 1
+        connections = list(_all_connections)
+        _all_connections.clear()
+    for conn in connections:
+        conn.close()
+    _local.conn = None
+
+
+def set_database_path(path):
+    """Point the manager at another database file (used by tools and benchmarks)"""
+    global DB_PATH
+    close_all()
+    DB_PATH = path
@@ -1,92 +1,46 @@
-import sqlite3
-from datetime import datetime
+import json
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from archive import archive_boundary, archive_spans, invoice_archive, union_source
+from connection import get_connection, retry_on_busy, transaction
+from migrations import PRODUCTION_DAILY_TRIGGERS, run_migrations
+from models import Invoice, InvoiceRow, Order, OrderRow, ProductionRecord, ProductionRow
+
+# Production time assumed per item when converting output to paid hours
+HOURS_PER_ITEM = 0.1
+
+# Rows per page for the keyset-paginated list queries
+PAGE_SIZE = 200
+
+# Most rows a client or design search returns
+SEARCH_LIMIT = 200
+
+# Column order of the rows returned by run_payroll()
+PAYROLL_COLUMNS = ('worker_id', 'worker_name', 'total_quantity', 'hours_worked', 'hourly_rate', 'salary')
+
+class ConflictError(Exception):
+    """A row was changed or deleted by someone else since the caller read it"""
 
 def initialize_database():
-    conn = sqlite3.connect('factory.db')
-    cursor = conn.cursor()
-    
-    # Workers table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS workers (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        contact TEXT,
-        joining_date TEXT,
-        hourly_rate REAL DEFAULT 0
-    )
-    ''')
-    
-    # Designs table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS designs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        description TEXT,
-        base_price REAL DEFAULT 0,
-        complexity_level INTEGER DEFAULT 1
-    )
-    ''')
-    
-    # Worker Production table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS worker_production (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        worker_id INTEGER,
-        design_id INTEGER,
-        quantity INTEGER,
-        date TEXT,
-        FOREIGN KEY(worker_id) REFERENCES workers(id),
-        FOREIGN KEY(design_id) REFERENCES designs(id)
-    )
-    ''')
-    
-    # Clients table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS clients (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        company TEXT,
-        contact TEXT,
-        email TEXT,
-        address TEXT
-    )
-    ''')
-    
-    # Orders table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS orders (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        client_id INTEGER,
-        design_id INTEGER,
-        quantity INTEGER,
-        order_date TEXT,
-        deadline TEXT,
-        status TEXT DEFAULT 'Pending',
-        FOREIGN KEY(client_id) REFERENCES clients(id),
-        FOREIGN KEY(design_id) REFERENCES designs(id)
-    )
-    ''')
-    
-    # Invoices table
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS invoices (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        order_id INTEGER,
-        invoice_date TEXT,
-        amount REAL,
-        tax REAL DEFAULT 0,
-        discount REAL DEFAULT 0,
-        total_amount REAL,
-        status TEXT DEFAULT 'Unpaid',
-        FOREIGN KEY(order_id) REFERENCES orders(id)
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    # Creates the tables on first run and applies any pending schema migrations
+    run_migrations()
 
 def get_db_connection():
-    return sqlite3.connect('factory.db')
+    # Shared per-thread connection; callers must not close it
+    return get_connection()
+
+def month_range(month, year):
+    # Half-open [start, end) bounds for a month. Dates are stored as ISO text,
+    # so comparing against these keeps the date column indexable, unlike
+    # wrapping it in strftime().
+    start = f"{year}-{month:02d}-01"
+    if month == 12:
+        end = f"{year + 1}-01-01"
+    else:
+        end = f"{year}-{month + 1:02d}-01"
+    return start, end
 
 # Helper functions for all modules
 def get_all_workers():
@@ -94,7 +48,6 @@ def get_all_workers():
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM workers ORDER BY name")
     workers = cursor.fetchall()
-    conn.close()
     return workers
 
 def get_all_designs():
@@ -102,7 +55,6 @@ def get_all_designs():
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM designs ORDER BY name")
     designs = cursor.fetchall()
-    conn.close()
     return designs
 
 def get_all_clients():
@@ -110,36 +62,274 @@ def get_all_clients():
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM clients ORDER BY name")
     clients = cursor.fetchall()
-    conn.close()
     return clients
 
+# Row shapes shown in the list screens (OrderRow, ProductionRow and
+# InvoiceRow); shared by the full, paged and single-row queries so an
+# edited row always matches the rest of its list
+ORDERS_LIST_SQL = '''
+SELECT o.id, c.name, d.name, o.quantity, o.order_date, o.deadline, o.status 
+FROM orders o
+JOIN clients c ON o.client_id = c.id
+JOIN designs d ON o.design_id = d.id
+'''
+
+PRODUCTION_LIST_SQL = '''
+SELECT wp.id, w.name, d.name, wp.quantity, wp.date 
+FROM worker_production wp
+JOIN workers w ON wp.worker_id = w.id
+JOIN designs d ON wp.design_id = d.id
+'''
+
+INVOICES_LIST_SQL = '''
+SELECT i.id, i.order_id, c.name, i.invoice_date, i.total_amount, i.status
+FROM {invoices} i
+JOIN orders o ON i.order_id = o.id
+JOIN clients c ON o.client_id = c.id
+'''
+
 def get_all_orders():
+    return fetch_records(OrderRow, ORDERS_LIST_SQL + "ORDER BY o.order_date DESC")
+
+def get_production_records():
+    return fetch_records(ProductionRow, PRODUCTION_LIST_SQL + "ORDER BY wp.date DESC")
+
+def _fetch_row(sql, row_id, model=None):
+    # A model instance when a model is given (sql must then select its columns in order)
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('''
-    SELECT o.id, c.name, d.name, o.quantity, o.order_date, o.deadline, o.status 
+    if model is not None:
+        cursor.row_factory = model.row_factory
+    cursor.execute(sql, (row_id,))
+    return cursor.fetchone()
+
+# Single rows in the same shape as the lists above, or None if deleted
+def get_worker(worker_id):
+    return _fetch_row("SELECT * FROM workers WHERE id = ?", worker_id)
+
+def get_design(design_id):
+    return _fetch_row("SELECT * FROM designs WHERE id = ?", design_id)
+
+def get_client(client_id):
+    return _fetch_row("SELECT * FROM clients WHERE id = ?", client_id)
+
+def get_order(order_id):
+    # The orders table row itself as an Order, including its version
+    return _fetch_row("SELECT * FROM orders WHERE id = ?", order_id, Order)
+
+def get_production(record_id):
+    # The worker_production table row itself as a ProductionRecord
+    return _fetch_row("SELECT * FROM worker_production WHERE id = ?", record_id, ProductionRecord)
+
+def _fetch_invoice(sql, invoice_id, model=None):
+    # sql reads FROM {invoices}; an archived invoice is read from its archive
+    row = _fetch_row(sql.format(invoices='invoices'), invoice_id, model)
+    if row is None:
+        archived = invoice_archive(get_db_connection(), invoice_id)
+        if archived:
+            row = _fetch_row(sql.format(invoices=archived), invoice_id, model)
+    return row
+
+def get_invoice(invoice_id):
+    # The invoices table row itself as an Invoice, including its version
+    return _fetch_invoice("SELECT * FROM {invoices} i WHERE i.id = ?", invoice_id, Invoice)
+
+def get_order_row(order_id):
+    return _fetch_row(ORDERS_LIST_SQL + "WHERE o.id = ?", order_id, OrderRow)
+
+def get_production_row(record_id):
+    return _fetch_row(PRODUCTION_LIST_SQL + "WHERE wp.id = ?", record_id, ProductionRow)
+
+def get_invoice_row(invoice_id):
+    return _fetch_invoice(INVOICES_LIST_SQL + "WHERE i.id = ?", invoice_id, InvoiceRow)
+
+def fetch_records(model, sql, params=()):
+    # Rows come back as model instances built by the cursor's row_factory;
+    # sql must select the model's columns in order (SELECT * for a table)
+    cursor = get_db_connection().cursor()
+    cursor.row_factory = model.row_factory
+    cursor.execute(sql, params)
+    return cursor.fetchall()
+
+def get_production_between(start, end):
+    # ProductionRecord objects dated in [start, end), oldest first, archived
+    # ones included when the range reaches back that far
+    conn = get_db_connection()
+    records = []
+    for span_start, span_end in archive_spans(conn, start, end):
+        source = union_source(conn, 'worker_production', span_start, span_end)
+        records += fetch_records(ProductionRecord, f'''
+        SELECT * FROM {source}
+        WHERE date >= ? AND date < ?
+        ORDER BY date, id
+        ''', (span_start, span_end))
+    return records
+
+def _encode_cursor(date, row_id):
+    return f"{date}|{row_id}"
+
+def _decode_cursor(token):
+    date, row_id = token.rsplit('|', 1)
+    return date, int(row_id)
+
+def _fetch_page(select_sql, model, date_column, id_column, date_field, cursor_token, page_size,
+                where=None, where_params=()):
+    # Keyset (seek) pagination, newest first: each page continues strictly
+    # after the (date, id) of the previous page's last row, so fetching page N
+    # costs an index seek instead of skipping N * page_size rows. `where` is an
+    # optional extra filter on the list.
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = model.row_factory
+    conditions = [where] if where else []
+    params = list(where_params)
+    if cursor_token:
+        conditions.append(f"({date_column}, {id_column}) < (?, ?)")
+        params.extend(_decode_cursor(cursor_token))
+    sql = select_sql
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += f" ORDER BY {date_column} DESC, {id_column} DESC LIMIT ?"
+    cursor.execute(sql, (*params, page_size))
+    rows = cursor.fetchall()
+    
+    next_cursor = None
+    if len(rows) == page_size:
+        last = rows[-1]
+        next_cursor = _encode_cursor(getattr(last, date_field), last.id)
+    return rows, next_cursor
+
+def get_orders_page(cursor_token=None, page_size=PAGE_SIZE):
+    # Same columns as get_all_orders(); returns (rows, next_cursor_token)
+    return _fetch_page(ORDERS_LIST_SQL, OrderRow, 'o.order_date', 'o.id', 'order_date', cursor_token, page_size)
+
+def get_production_page(cursor_token=None, page_size=PAGE_SIZE):
+    # Same columns as get_production_records(); returns (rows, next_cursor_token)
+    return _fetch_page(PRODUCTION_LIST_SQL, ProductionRow, 'wp.date', 'wp.id', 'date', cursor_token, page_size)
+
+def get_invoices_page(cursor_token=None, page_size=PAGE_SIZE):
+    # Rows for the invoices list (archived invoices are not listed); returns
+    # (rows, next_cursor_token)
+    return _fetch_page(INVOICES_LIST_SQL.format(invoices='invoices'), InvoiceRow, 'i.invoice_date', 'i.id',
+                       'invoice_date', cursor_token, page_size)
+
+def fts_query(text):
+    # FTS5 MATCH expression for what the user typed: every word must match,
+    # the last one as a prefix since it may still be being typed. Quoting
+    # each word keeps FTS5 operators and punctuation in the input inert.
+    # Returns None when there is nothing to search for.
+    words = re.findall(r'\w+', text)
+    if not words or len(''.join(words)) < 2:
+        return None
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+def _search(fts_table, table, text, limit):
+    query = fts_query(text)
+    if query is None:
+        return []
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    # No ORDER BY rank: ranking every match of a common prefix costs far
+    # more than the search itself. Matches are shown sorted by name.
+    cursor.execute(f'''
+    SELECT t.* FROM {fts_table} f
+    JOIN {table} t ON t.id = f.rowid
+    WHERE {fts_table} MATCH ?
+    LIMIT ?
+    ''', (query, limit))
+    rows = cursor.fetchall()
+    rows.sort(key=lambda row: row[1])
+    return rows
+
+def search_clients(text, limit=SEARCH_LIMIT):
+    # Clients matching text in any of name, company, contact, email or address
+    return _search('clients_fts', 'clients', text, limit)
+
+def search_designs(text, limit=SEARCH_LIMIT):
+    # Designs matching text in their name or description
+    return _search('designs_fts', 'designs', text, limit)
+
+def search_orders_page(text, cursor_token=None, page_size=PAGE_SIZE):
+    # Orders whose client or design matches text (or whose id is text),
+    # newest first; paged like get_orders_page
+    query = fts_query(text)
+    if query is None and not text.strip().isdigit():
+        return [], None
+    where = '''(o.client_id IN (SELECT rowid FROM clients_fts WHERE clients_fts MATCH ?)
+        OR o.design_id IN (SELECT rowid FROM designs_fts WHERE designs_fts MATCH ?)
+        OR o.id = ?)'''
+    order_id = int(text) if text.strip().isdigit() else None
+    return _fetch_page(ORDERS_LIST_SQL, OrderRow, 'o.order_date', 'o.id', 'order_date', cursor_token, page_size,
+                       where, (query or '""', query or '""', order_id))
+
+# Condition on orders o: not cancelled and without an invoice, hot or
+# archived. NOT EXISTS rather than NOT IN, which matches nothing once
+# either table holds a NULL order_id.
+INVOICEABLE_ORDER = '''o.status != 'Cancelled'
+    AND NOT EXISTS (SELECT 1 FROM invoices WHERE order_id = o.id)
+    AND NOT EXISTS (SELECT 1 FROM archived_invoices WHERE order_id = o.id)'''
+
+def get_uninvoiced_orders():
+    # Orders that can still be invoiced: not cancelled and without an
+    # invoice, hot or archived
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute(f'''
+    SELECT o.id, c.name, d.name 
     FROM orders o
     JOIN clients c ON o.client_id = c.id
     JOIN designs d ON o.design_id = d.id
-    ORDER BY o.order_date DESC
+    WHERE {INVOICEABLE_ORDER}
     ''')
     orders = cursor.fetchall()
-    conn.close()
     return orders
 
-def get_production_records():
+# Everything an invoice document needs, in the key order of _invoice_details()
+INVOICE_DETAILS_SQL = '''
+SELECT i.id, i.order_id, c.name, c.company, c.address, 
+    d.name, d.base_price, o.quantity, 
+    i.invoice_date, i.amount, i.tax, i.discount, i.total_amount
+FROM {invoices} i
+JOIN orders o ON i.order_id = o.id
+JOIN clients c ON o.client_id = c.id
+JOIN designs d ON o.design_id = d.id
+'''
+
+def _invoice_details(invoice):
+    return {
+        'invoice_id': invoice[0],
+        'order_id': invoice[1],
+        'client_name': invoice[2],
+        'client_company': invoice[3],
+        'client_address': invoice[4],
+        'design_name': invoice[5],
+        'unit_price': invoice[6],
+        'quantity': invoice[7],
+        'invoice_date': invoice[8],
+        'subtotal': invoice[9],
+        'tax': invoice[10],
+        'discount': invoice[11],
+        'total': invoice[12]
+    }
+
+def get_invoice_details(invoice_id):
+    invoice = _fetch_invoice(INVOICE_DETAILS_SQL + "WHERE i.id = ?", invoice_id)
+    return _invoice_details(invoice) if invoice else None
+
+def get_invoice_details_between(start, end):
+    # Invoices dated in [start, end), oldest first, archived ones included
+    # when the range reaches back that far
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute('''
-    SELECT wp.id, w.name, d.name, wp.quantity, wp.date 
-    FROM worker_production wp
-    JOIN workers w ON wp.worker_id = w.id
-    JOIN designs d ON wp.design_id = d.id
-    ORDER BY wp.date DESC
-    ''')
-    records = cursor.fetchall()
-    conn.close()
-    return records
+    details = []
+    for span_start, span_end in archive_spans(conn, start, end):
+        invoices = union_source(conn, 'invoices', span_start, span_end)
+        cursor.execute(INVOICE_DETAILS_SQL.format(invoices=invoices) + '''
+        WHERE i.invoice_date >= ? AND i.invoice_date < ?
+        ORDER BY i.invoice_date, i.id
+        ''', (span_start, span_end))
+        details += [_invoice_details(invoice) for invoice in cursor.fetchall()]
+    return details
 
 def calculate_worker_salary(worker_id, month, year):
     conn = get_db_connection()
@@ -149,18 +339,18 @@ def calculate_worker_salary(worker_id, month, year):
     cursor.execute("SELECT hourly_rate FROM workers WHERE id = ?", (worker_id,))
     hourly_rate = cursor.fetchone()[0]
     
-    # Get production records for the month
+    # Get the month's output from the daily rollup
+    start, end = month_range(month, year)
     cursor.execute('''
     SELECT SUM(quantity) as total_quantity
-    FROM worker_production
-    WHERE worker_id = ? AND strftime('%Y-%m', date) = ?
-    ''', (worker_id, f"{year}-{month:02d}"))
+    FROM production_daily
+    WHERE worker_id = ? AND date >= ? AND date < ?
+    ''', (worker_id, start, end))
     
     total_quantity = cursor.fetchone()[0] or 0
-    conn.close()
     
     # Simple calculation: Assume 1 item takes 0.1 hour to produce
-    hours_worked = total_quantity * 0.1
+    hours_worked = total_quantity * HOURS_PER_ITEM
     salary = hours_worked * hourly_rate
     
     return {
@@ -173,43 +363,275 @@ def calculate_worker_salary(worker_id, month, year):
         'salary': salary
     }
 
-def create_invoice(order_id, tax=0, discount=0):
+# Salary per worker over a half-open date range, in PAYROLL_COLUMNS order.
+# Parameters: (HOURS_PER_ITEM, HOURS_PER_ITEM, start, end)
+PAYROLL_SQL = '''
+SELECT w.id, w.name,
+       COALESCE(SUM(pd.quantity), 0) AS total_quantity,
+       COALESCE(SUM(pd.quantity), 0) * ? AS hours_worked,
+       w.hourly_rate,
+       COALESCE(SUM(pd.quantity), 0) * ? * w.hourly_rate AS salary
+FROM workers w
+LEFT JOIN production_daily pd
+    ON pd.worker_id = w.id AND pd.date >= ? AND pd.date < ?
+GROUP BY w.id
+ORDER BY w.name
+'''
+
+def run_payroll(month, year):
+    # Salary for every worker for the month in one grouped query, as compact
+    # tuples in PAYROLL_COLUMNS order. Workers with no output get a zero row.
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    # Get order details
+    start, end = month_range(month, year)
+    cursor.execute(PAYROLL_SQL, (HOURS_PER_ITEM, HOURS_PER_ITEM, start, end))
+    payroll = cursor.fetchall()
+    return payroll
+
+# production_daily rows from the worker_production rows dated on or after ?
+PRODUCTION_DAILY_REBUILD = '''
+INSERT INTO production_daily (date, worker_id, design_id, quantity, records)
+SELECT date, worker_id, design_id, SUM(COALESCE(quantity, 0)), COUNT(*)
+FROM worker_production
+WHERE date >= ? AND worker_id IS NOT NULL AND design_id IS NOT NULL
+GROUP BY date, worker_id, design_id
+'''
+
+def rebuild_production_daily():
+    # Recompute the production_daily rollup from worker_production, e.g.
+    # after rows were loaded with the triggers bypassed. Days before the
+    # archive boundary are kept as they are: their raw rows are in the
+    # archive files. Returns the row count.
+    with transaction() as conn:
+        boundary = archive_boundary(conn)
+        conn.execute("DELETE FROM production_daily WHERE date >= ?", (boundary,))
+        conn.execute(PRODUCTION_DAILY_REBUILD, (boundary,))
+        count = conn.execute("SELECT COUNT(*) FROM production_daily").fetchone()[0]
+    get_db_connection().execute("ANALYZE production_daily")
+    return count
+
+# Adds the worker_production rows with id >= ? to production_daily, as the
+# insert trigger would have. NOT INDEXED keeps the planner on the rowid
+# range: through idx_worker_production_worker_date (for worker_id IS NOT
+# NULL) it read the whole table on every chunk. The upsert folds repeated
+# keys itself, which is cheaper than sorting the rows for a GROUP BY.
+PRODUCTION_DAILY_APPEND = '''
+INSERT INTO production_daily (date, worker_id, design_id, quantity, records)
+SELECT date, worker_id, design_id, COALESCE(quantity, 0), 1
+FROM worker_production NOT INDEXED
+WHERE id >= ? AND date IS NOT NULL AND worker_id IS NOT NULL AND design_id IS NOT NULL
+ON CONFLICT (date, worker_id, design_id) DO UPDATE
+SET quantity = quantity + excluded.quantity, records = records + excluded.records
+'''
+
+@contextmanager
+def bulk_production_load():
+    # Transaction for inserting many worker_production rows. The rollup
+    # triggers cost about as much as the inserts themselves, so they are
+    # dropped for the block and the new rows are added to production_daily
+    # in one statement at the end. DDL is transactional: other connections
+    # never see the triggers missing, and a failure restores them.
+    # Only INSERT into worker_production inside the block.
+    with transaction() as conn:
+        first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM worker_production").fetchone()[0]
+        for name in PRODUCTION_DAILY_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        yield conn
+        conn.execute(PRODUCTION_DAILY_APPEND, (first_id,))
+        for sql in PRODUCTION_DAILY_TRIGGERS.values():
+            conn.execute(sql)
+
+def check_production_daily():
+    # Rollup rows that disagree with the raw rows, as
+    # (date, worker_id, design_id, rollup quantity, raw quantity); empty when
+    # exact. Archived days are not checked.
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    boundary = archive_boundary(conn)
     cursor.execute('''
-    SELECT o.id, c.name, c.company, c.address, d.name, d.base_price, o.quantity, o.order_date
-    FROM orders o
-    JOIN clients c ON o.client_id = c.id
-    JOIN designs d ON o.design_id = d.id
-    WHERE o.id = ?
-    ''', (order_id,))
-    
-    order = cursor.fetchone()
-    
-    if not order:
-        conn.close()
-        return None
-    
-    # Calculate amounts
-    subtotal = order[5] * order[6]
-    total = subtotal + (subtotal * tax / 100) - discount
+    WITH raw AS (
+        SELECT date, worker_id, design_id, SUM(COALESCE(quantity, 0)) AS quantity, COUNT(*) AS records
+        FROM worker_production
+        WHERE date >= ? AND worker_id IS NOT NULL AND design_id IS NOT NULL
+        GROUP BY date, worker_id, design_id
+    )
+    SELECT r.date, r.worker_id, r.design_id, pd.quantity, r.quantity
+    FROM raw r
+    LEFT JOIN production_daily pd USING (date, worker_id, design_id)
+    WHERE pd.quantity IS NOT r.quantity OR pd.records IS NOT r.records
+    UNION ALL
+    SELECT pd.date, pd.worker_id, pd.design_id, pd.quantity, NULL
+    FROM production_daily pd
+    WHERE pd.date >= ? AND NOT EXISTS (SELECT 1 FROM raw r
+                      WHERE r.date = pd.date AND r.worker_id = pd.worker_id AND r.design_id = pd.design_id)
+    ''', (boundary, boundary))
+    mismatches = cursor.fetchall()
+    return mismatches
+
+# Days of daily output the dashboard charts, and how far ahead it looks
+# for orders coming due
+DASHBOARD_DAYS = 14
+DUE_SOON_DAYS = 7
+DUE_SOON_LIMIT = 15
+
+# Orders still to be made; matches the idx_orders_open_deadline condition
+OPEN_ORDER_STATUSES = "('Pending', 'In Progress')"
+
+def get_dashboard(today=None):
+    # Every dashboard figure from a handful of indexed aggregate queries.
+    # Daily output comes from the production_daily rollup, so its cost does
+    # not grow with the number of raw production rows. today is a date.
+    today = today or datetime.now().date()
+    days = [(today - timedelta(days=DASHBOARD_DAYS - 1 - i)).isoformat() for i in range(DASHBOARD_DAYS)]
+    due_by = (today + timedelta(days=DUE_SOON_DAYS)).isoformat()
+    today = today.isoformat()
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    # Insert invoice
-    invoice_date = datetime.now().strftime('%Y-%m-%d')
     cursor.execute('''
-    INSERT INTO invoices (order_id, invoice_date, amount, tax, discount, total_amount, status)
-    VALUES (?, ?, ?, ?, ?, ?, ?)
-    ''', (order_id, invoice_date, subtotal, tax, discount, total, 'Unpaid'))
+    SELECT date, SUM(quantity) FROM production_daily
+    WHERE date >= ? AND date <= ?
+    GROUP BY date
+    ''', (days[0], today))
+    output = dict(cursor.fetchall())
     
-    invoice_id = cursor.lastrowid
+    # Three plain counts: each is a walk over one range of an index, which
+    # is about twice as fast as one pass evaluating conditions per order
+    open_sql = f"SELECT COUNT(*) FROM orders WHERE status IN {OPEN_ORDER_STATUSES}"
+    open_orders = cursor.execute(open_sql).fetchone()[0]
+    overdue = cursor.execute(open_sql + " AND deadline < ?", (today,)).fetchone()[0]
+    due_soon = cursor.execute(open_sql + " AND deadline >= ? AND deadline <= ?", (today, due_by)).fetchone()[0]
     
-    # Update order status
-    cursor.execute("UPDATE orders SET status = 'Invoiced' WHERE id = ?", (order_id,))
+    cursor.execute(ORDERS_LIST_SQL + f'''
+    WHERE o.status IN {OPEN_ORDER_STATUSES} AND o.deadline >= ? AND o.deadline <= ?
+    ORDER BY o.deadline LIMIT ?
+    ''', (today, due_by, DUE_SOON_LIMIT))
+    due_orders = cursor.fetchall()
     
-    conn.commit()
-    conn.close()
+    cursor.execute("SELECT COUNT(*), TOTAL(total_amount) FROM invoices WHERE status = 'Unpaid'")
+    unpaid_invoices, unpaid_total = cursor.fetchone()
+    
+    return {
+        'daily_output': [(day, output.get(day, 0)) for day in days],
+        'output_today': output.get(today, 0),
+        'output_week': sum(output.get(day, 0) for day in days[-7:]),
+        'open_orders': open_orders,
+        'overdue_orders': overdue,
+        'due_soon_orders': due_soon,
+        'due_orders': due_orders,
+        'unpaid_invoices': unpaid_invoices,
+        'unpaid_total': unpaid_total,
+    }
+
+# Statuses an order can be given by hand; 'Invoiced' is set by create_invoice
+ORDER_STATUSES = ('Pending', 'In Progress', 'Completed', 'Delivered', 'Cancelled')
+
+@retry_on_busy
+def create_order(client_id, design_id, quantity, order_date, deadline, status='Pending'):
+    # Returns the new order's id
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO orders (client_id, design_id, quantity, order_date, deadline, status) VALUES (?, ?, ?, ?, ?, ?)",
+            (client_id, design_id, quantity, order_date, deadline, status)
+        )
+    return cursor.lastrowid
+
+@retry_on_busy
+def record_production(worker_id, design_id, quantity, date):
+    # Returns the new production record's id
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+            (worker_id, design_id, quantity, date)
+        )
+    return cursor.lastrowid
+
+@retry_on_busy
+def record_production_many(records):
+    # (worker_id, design_id, quantity, date) tuples in one statement; returns the count
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+            records
+        )
+    return cursor.rowcount
+
+@retry_on_busy
+def update_order(order_id, version, client_id, design_id, quantity, order_date, deadline, status):
+    # Applies only if the order is still at the version the caller read;
+    # otherwise raises ConflictError rather than overwrite the other change.
+    # Returns the new version.
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+        UPDATE orders SET client_id=?, design_id=?, quantity=?, order_date=?, deadline=?, status=?,
+            version = version + 1
+        WHERE id=? AND version=?
+        ''', (client_id, design_id, quantity, order_date, deadline, status, order_id, version))
+        if cursor.rowcount == 0:
+            raise ConflictError(f"Order {order_id} was changed or deleted by someone else")
+    return version + 1
+
+@retry_on_busy
+def set_invoice_status(invoice_id, version, status):
+    # Conditional on the version like update_order; returns the new version
+    with transaction() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE invoices SET status=?, version = version + 1 WHERE id=? AND version=?",
+            (status, invoice_id, version)
+        )
+        if cursor.rowcount == 0:
+            raise ConflictError(f"Invoice {invoice_id} was changed or deleted by someone else")
+    return version + 1
+
+@retry_on_busy
+def create_invoice(order_id, tax=0, discount=0):
+    with transaction() as conn:
+        cursor = conn.cursor()
+        
+        # Get order details
+        cursor.execute('''
+        SELECT o.id, c.name, c.company, c.address, d.name, d.base_price, o.quantity, o.order_date, o.status
+        FROM orders o
+        JOIN clients c ON o.client_id = c.id
+        JOIN designs d ON o.design_id = d.id
+        WHERE o.id = ?
+        ''', (order_id,))
+        
+        order = cursor.fetchone()
+        
+        if not order:
+            return None
+        
+        # The write lock is held from the start of the transaction, so no
+        # other clerk can invoice the order between this check and the insert.
+        # Same rule as create_invoices: the status alone is not enough, as it
+        # can be changed by hand after the order was invoiced.
+        if order[8] == 'Cancelled':
+            raise ConflictError(f"Order {order_id} is cancelled")
+        cursor.execute(f"SELECT {INVOICEABLE_ORDER} FROM orders o WHERE o.id = ?", (order_id,))
+        if order[8] == 'Invoiced' or not cursor.fetchone()[0]:
+            raise ConflictError(f"Order {order_id} has already been invoiced")
+        
+        # Calculate amounts
+        subtotal = order[5] * order[6]
+        total = subtotal + (subtotal * tax / 100) - discount
+        
+        # Insert invoice
+        invoice_date = datetime.now().strftime('%Y-%m-%d')
+        cursor.execute('''
+        INSERT INTO invoices (order_id, invoice_date, amount, tax, discount, total_amount, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (order_id, invoice_date, subtotal, tax, discount, total, 'Unpaid'))
+        
+        invoice_id = cursor.lastrowid
+        
+        # Update order status
+        cursor.execute("UPDATE orders SET status = 'Invoiced', version = version + 1 WHERE id = ?", (order_id,))
     
     return {
         'invoice_id': invoice_id,
@@ -226,4 +648,56 @@ def create_invoice(order_id, tax=0, discount=0):
         'tax': tax,
         'discount': discount,
         'total': total
-    }
\ No newline at end of file
+    }
+
+@retry_on_busy
+def create_invoices(order_ids=None, tax=0, discount=0):
+    # Invoice many orders in one transaction: a set-based SELECT of the
+    # eligible orders (not cancelled, not yet invoiced), one executemany
+    # INSERT and one status UPDATE. order_ids=None invoices every eligible
+    # order; ids that are not eligible are skipped.
+    started = time.perf_counter()
+    invoice_date = datetime.now().strftime('%Y-%m-%d')
+    
+    with transaction() as conn:
+        cursor = conn.cursor()
+        
+        sql = f'''
+        SELECT o.id, d.base_price * o.quantity
+        FROM orders o
+        JOIN designs d ON o.design_id = d.id
+        WHERE {INVOICEABLE_ORDER}
+        '''
+        params = ()
+        if order_ids is not None:
+            # json_each() passes any number of ids as a single parameter
+            sql += " AND o.id IN (SELECT value FROM json_each(?))"
+            params = (json.dumps(list(order_ids)),)
+        cursor.execute(sql, params)
+        orders = cursor.fetchall()
+        
+        invoices = []
+        for order_id, subtotal in orders:
+            total = subtotal + (subtotal * tax / 100) - discount
+            invoices.append((order_id, invoice_date, subtotal, tax, discount, total, 'Unpaid'))
+        
+        cursor.executemany('''
+        INSERT INTO invoices (order_id, invoice_date, amount, tax, discount, total_amount, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', invoices)
+        
+        invoiced_ids = [order[0] for order in orders]
+        cursor.execute(
+            "UPDATE orders SET status = 'Invoiced', version = version + 1 WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(invoiced_ids),)
+        )
+    
+    elapsed = time.perf_counter() - started
+    return {
+        'count': len(invoices),
+        'order_ids': invoiced_ids,
+        'total': sum(invoice[5] for invoice in invoices),
+        'invoice_date': invoice_date,
+        'seconds': elapsed,
+        'per_second': len(invoices) / elapsed if elapsed else 0
+    }
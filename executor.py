@@ -0,0 +1,71 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# How often the Tk main loop checks for finished jobs, in milliseconds
+POLL_INTERVAL = 30
+
+
+class DatabaseExecutor:
+    """Run database work on worker threads and hand results back to Tk.
+
+    Tk widgets may only be touched from the main thread, so workers never call
+    back directly: finished jobs are put on a queue that the main loop drains
+    with root.after(). Each worker thread uses its own pooled connection.
+    """
+
+    def __init__(self, root, max_workers=2, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+        self.results = queue.Queue()
+        self.pending = 0
+        self.polling = False
+
+    def submit(self, func, *args, on_done=None, on_error=None):
+        """Run func(*args) off the main thread.
+
+        on_done(result) or on_error(exception) is then called on the main
+        thread. Errors without an on_error handler are re-raised there so Tk
+        reports them like any other callback failure.
+        """
+        self.pending += 1
+        if self.pending == 1 and self.on_busy:
+            self.on_busy(True)
+
+        future = self.pool.submit(func, *args)
+        future.add_done_callback(lambda f: self.results.put((f, on_done, on_error)))
+
+        if not self.polling:
+            self.polling = True
+            self.root.after(POLL_INTERVAL, self._poll)
+        return future
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    future, on_done, on_error = self.results.get_nowait()
+                except queue.Empty:
+                    break
+
+                self.pending -= 1
+                if self.pending == 0 and self.on_busy:
+                    self.on_busy(False)
+
+                error = future.exception()
+                if error is None:
+                    if on_done:
+                        on_done(future.result())
+                elif on_error:
+                    on_error(error)
+                else:
+                    raise error
+        finally:
+            # Keep polling even if a callback raised, or later jobs would stall
+            if self.pending:
+                self.root.after(POLL_INTERVAL, self._poll)
+            else:
+                self.polling = False
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
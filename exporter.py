@@ -0,0 +1,208 @@
+"""Streaming export of orders, production records, invoices and payroll runs.
+
+Rows are read from the cursor in fetchmany batches and written out as they
+arrive, so memory use stays flat however many rows are exported. Output is
+CSV or JSON Lines (one object per line), chosen by the file extension. The
+file is written under a temporary name and moved into place when complete.
+
+Command line, from the project root:
+    python exporter.py production production_june.csv --from 2025-06-01 --to 2025-07-01
+    python exporter.py payroll payroll_june.jsonl --month 6 --year 2025
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+
+from archive import archive_spans, union_source
+from database import (HOURS_PER_ITEM, PAYROLL_COLUMNS, PAYROLL_SQL, get_db_connection,
+                      initialize_database, month_range)
+
+# Rows pulled from the cursor per fetchmany call
+BATCH_SIZE = 5000
+
+FORMATS = ('csv', 'jsonl')
+
+# kind -> (columns, SELECT, date column for --from/--to, archived table or
+# None). Each SELECT is ordered along an index so SQLite can stream it
+# without sorting first; {source} is the table unioned with its archives
+# when the period reaches back into them (see archive.py). A period reaching
+# into more archive years than can be attached at once is exported as
+# consecutive date spans, one query each.
+EXPORTS = {
+    'orders': (
+        ('id', 'client_id', 'client', 'design_id', 'design', 'quantity', 'order_date', 'deadline', 'status'),
+        '''
+        SELECT o.id, o.client_id, c.name, o.design_id, d.name, o.quantity, o.order_date, o.deadline, o.status
+        FROM orders o
+        JOIN clients c ON o.client_id = c.id
+        JOIN designs d ON o.design_id = d.id
+        {where}
+        ORDER BY o.order_date, o.id
+        ''',
+        'o.order_date',
+        None,
+    ),
+    'production': (
+        ('id', 'worker_id', 'worker', 'design_id', 'design', 'quantity', 'date'),
+        '''
+        SELECT wp.id, wp.worker_id, w.name, wp.design_id, d.name, wp.quantity, wp.date
+        FROM {source} wp
+        JOIN workers w ON wp.worker_id = w.id
+        JOIN designs d ON wp.design_id = d.id
+        {where}
+        ORDER BY wp.date, wp.id
+        ''',
+        'wp.date',
+        'worker_production',
+    ),
+    'invoices': (
+        ('id', 'order_id', 'client', 'invoice_date', 'amount', 'tax', 'discount', 'total_amount', 'status'),
+        '''
+        SELECT i.id, i.order_id, c.name, i.invoice_date, i.amount, i.tax, i.discount, i.total_amount, i.status
+        FROM {source} i
+        JOIN orders o ON i.order_id = o.id
+        JOIN clients c ON o.client_id = c.id
+        {where}
+        ORDER BY i.invoice_date, i.id
+        ''',
+        'i.invoice_date',
+        'invoices',
+    ),
+}
+
+KINDS = tuple(EXPORTS) + ('payroll',)
+
+
+def format_for_path(path):
+    """Pick the output format from the file extension (CSV by default)"""
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def _queries(kind, start, end):
+    # Yields the (sql, params) of each query of an export, in output order:
+    # one per span of archive years the period reaches (see archive.archive_spans).
+    # Each is built only once the one before it has been read, as attaching
+    # the next span's archives may detach the previous span's.
+    sql, date_column, table = EXPORTS[kind][1:]
+    conn = get_db_connection()
+    for span_start, span_end in archive_spans(conn, start, end) if table else [(start, end)]:
+        conditions, params = [], []
+        if span_start:
+            conditions.append(f"{date_column} >= ?")
+            params.append(span_start)
+        if span_end:
+            conditions.append(f"{date_column} < ?")
+            params.append(span_end)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        source = union_source(conn, table, span_start, span_end) if table else None
+        yield sql.format(where=where, source=source), tuple(params)
+
+
+def _query(kind, start, end):
+    # Returns (columns, queries) for an export; queries yields (sql, params)
+    if kind == 'payroll':
+        if not (start and end):
+            raise ValueError("A payroll export needs a period")
+        return PAYROLL_COLUMNS, [(PAYROLL_SQL, (HOURS_PER_ITEM, HOURS_PER_ITEM, start, end))]
+    return EXPORTS[kind][0], _queries(kind, start, end)
+
+
+def _batches(cursor, queries, batch_size):
+    for sql, params in queries:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+
+def _write_csv(f, columns, batches):
+    writer = csv.writer(f)
+    writer.writerow(columns)
+    count = 0
+    for rows in batches:
+        writer.writerows(rows)
+        count += len(rows)
+    return count
+
+
+def _write_jsonl(f, columns, batches):
+    # One encoder for the whole export instead of json.dumps' per-call setup
+    encode = json.JSONEncoder(ensure_ascii=False, check_circular=False).encode
+    count = 0
+    for rows in batches:
+        f.write(''.join([encode(dict(zip(columns, row))) + '\n' for row in rows]))
+        count += len(rows)
+    return count
+
+
+def write_rows(columns, batches, path, fmt=None):
+    """Write batches of rows to path as CSV or JSON Lines, replacing it only once complete"""
+    fmt = fmt or format_for_path(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    started = time.perf_counter()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.' + fmt)
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            write = _write_csv if fmt == 'csv' else _write_jsonl
+            count = write(f, columns, batches)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        'rows': count,
+        'path': path,
+        'seconds': elapsed,
+        'per_second': count / elapsed if elapsed else 0
+    }
+
+
+def export_rows(kind, path, fmt=None, start=None, end=None, batch_size=BATCH_SIZE):
+    """Stream `kind` rows in [start, end) to path as CSV or JSON Lines.
+
+    Dates are 'YYYY-MM-DD' strings and either bound may be left open,
+    except for payroll which covers exactly the given period.
+    """
+    columns, queries = _query(kind, start, end)
+    cursor = get_db_connection().cursor()
+    return write_rows(columns, _batches(cursor, queries, batch_size), path, fmt)
+
+
+def export_payroll(month, year, path, fmt=None):
+    return export_rows('payroll', path, fmt, *month_range(month, year))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export records to CSV or JSON Lines")
+    parser.add_argument('kind', choices=KINDS)
+    parser.add_argument('path', help="output file; .jsonl for JSON Lines, anything else for CSV")
+    parser.add_argument('--format', choices=FORMATS, default=None)
+    parser.add_argument('--from', dest='start', help="first date to include (YYYY-MM-DD)")
+    parser.add_argument('--to', dest='end', help="first date to leave out (YYYY-MM-DD)")
+    parser.add_argument('--month', type=int, help="payroll month")
+    parser.add_argument('--year', type=int, help="payroll year")
+    args = parser.parse_args()
+
+    if args.month and args.year:
+        args.start, args.end = month_range(args.month, args.year)
+    if args.kind == 'payroll' and not (args.start and args.end):
+        parser.error("payroll needs --month and --year (or --from and --to)")
+
+    initialize_database()
+    result = export_rows(args.kind, args.path, args.format, args.start, args.end)
+    print(f"exported {result['rows']} rows in {result['seconds']:.2f}s "
+          f"({result['per_second']:,.0f} rows/s) -> {result['path']}")
+
+
+if __name__ == '__main__':
+    main()
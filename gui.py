@@ -1,14 +1,66 @@
 import tkinter as tk
+import sqlite3
 from tkinter import ttk, messagebox, filedialog
 from datetime import datetime
 from database import *
+from connection import transaction
+from executor import DatabaseExecutor
+from importer import import_csv
+from exporter import export_rows, export_payroll
+from lookups import worker_lookup, design_lookup, client_lookup
+from scheduler import production_schedule
+import querylog
 from models import *
-import webbrowser
 import os
-from PIL import Image, ImageTk
-from itertools import cycle
-import time
-from jinja2 import Template
+import tempfile
+
+# PIL, jinja2 (via templates and invoice_pdf), NumPy (via payroll) and
+# webbrowser are imported where they are first used: together they took
+# longer to import than the rest of the application.
+
+LOGO_PATH = os.path.join('images', 'logo.png')
+# Pre-scaled copies of the logo; Tk loads these PNGs without PIL
+LOGO_CACHE_DIR = os.path.join('images', '.cache')
+
+# Real work done behind the welcome screen, in order
+STARTUP_STEPS = (
+    ("Checking database", initialize_database),
+    ("Loading workers", worker_lookup.rows),
+    ("Loading designs", design_lookup.rows),
+    ("Loading clients", client_lookup.rows),
+)
+
+# Typing pause, in milliseconds, before a search box runs its query
+SEARCH_DELAY = 250
+
+# How often the open dashboard recomputes its figures, in milliseconds
+DASHBOARD_REFRESH_MS = 30000
+
+# Most orders the Schedule screen lists
+SCHEDULE_LIMIT = 500
+
+# Pay bases offered by the Payroll Run screen
+PAY_BASES = ('Hourly', 'Piece rate')
+
+# Payroll Run columns as (heading, width, anchor), matching the rows of
+# run_payroll() and payroll.run_piece_payroll()
+HOURLY_PAYROLL_HEADINGS = (("ID", 50, 'center'), ("Worker", 150, 'w'), ("Items", 80, 'center'),
+                           ("Hours", 80, 'e'), ("Hourly Rate", 80, 'e'), ("Salary", 100, 'e'))
+PIECE_PAYROLL_HEADINGS = (("ID", 50, 'center'), ("Worker", 150, 'w'), ("Items", 80, 'center'),
+                          ("Piece Pay", 90, 'e'), ("Bonus", 80, 'e'), ("Deductions", 80, 'e'),
+                          ("Net Pay", 100, 'e'))
+
+
+def scaled_logo(size):
+    """Path of the logo scaled to size x size pixels, rescaled only when logo.png changes"""
+    cached = os.path.join(LOGO_CACHE_DIR, f'logo_{size}.png')
+    if not os.path.exists(cached) or os.path.getmtime(cached) < os.path.getmtime(LOGO_PATH):
+        from PIL import Image
+        os.makedirs(LOGO_CACHE_DIR, exist_ok=True)
+        with Image.open(LOGO_PATH) as image:
+            image.resize((size, size), Image.LANCZOS).save(cached + '.tmp', 'PNG')
+        os.replace(cached + '.tmp', cached)
+    return cached
 
 
 class FactoryManagementGUI:
@@ -42,6 +94,20 @@ class FactoryManagementGUI:
         self.style.configure('Accent.TButton', background=self.accent_color, foreground='white')
         self.style.configure('Dark.TButton', background=self.dark_color, foreground='white')
         
+        # Rows shown in each Treeview, keyed by record id
+        self.shown_rows = {}
+        self.search_generations = {}
+        
+        # (id, version) of the order and invoice being edited
+        self.selected_order_version = (None, None)
+        self.selected_invoice_version = (None, None)
+        
+        # Pending root.after() id of the next dashboard refresh
+        self.dashboard_timer = None
+        
+        # Database work runs off the Tk main thread
+        self.db = DatabaseExecutor(self.root, on_busy=self.set_busy)
+        
         # Create welcome screen
         self.create_welcome_screen()
     
@@ -54,8 +120,13 @@ class FactoryManagementGUI:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
+    def set_busy(self, busy):
+        """Show a busy cursor while background database work is running"""
+        self.root.config(cursor='watch' if busy else '')
+    
     def clear_frame(self):
         """Clear all widgets from root"""
+        self.shown_rows.clear()
         for widget in self.root.winfo_children():
             widget.destroy()
     
@@ -73,9 +144,7 @@ class FactoryManagementGUI:
         
         # Try to load logo image
         try:
-            logo_img = Image.open("images/logo.png")
-            logo_img = logo_img.resize((200, 200), Image.LANCZOS)
-            self.logo = ImageTk.PhotoImage(logo_img)
+            self.logo = tk.PhotoImage(file=scaled_logo(200))
             logo_label = tk.Label(logo_frame, image=self.logo, bg=self.dark_color)
             logo_label.pack()
         except Exception as e:
@@ -97,15 +166,9 @@ class FactoryManagementGUI:
                               font=('Segoe UI', 12), bg=self.dark_color, fg='white')
         loading_text.pack()
         
-        # Animated dots
-        self.dots = cycle(['.', '..', '...'])
-        self.loading_dots = tk.Label(loading_frame, text="", 
-                                    font=('Segoe UI', 12), bg=self.dark_color, fg='white')
-        self.loading_dots.pack()
-        
-        # Progress bar
-        progress = ttk.Progressbar(welcome_frame, orient='horizontal', 
-                                 length=300, mode='determinate')
+        # Progress bar: one step per startup task
+        progress = ttk.Progressbar(welcome_frame, orient='horizontal', length=300, 
+                                 mode='determinate', maximum=len(STARTUP_STEPS))
         progress.pack(pady=20)
         
         # Copyright
@@ -114,17 +177,26 @@ class FactoryManagementGUI:
                                  font=('Segoe UI', 8), bg=self.dark_color, fg='white')
         copyright_label.pack(side='bottom', pady=20)
         
-        # Animate loading
-        self.animate_loading(progress, welcome_frame)
+        self.run_startup(0, progress, loading_text)
     
-    def animate_loading(self, progress, welcome_frame):
-        """Animate loading screen"""
-        if progress['value'] < 100:
-            progress['value'] += 5
-            self.loading_dots.config(text=next(self.dots))
-            self.root.after(100, lambda: self.animate_loading(progress, welcome_frame))
-        else:
-            self.root.after(500, lambda: self.create_main_menu())
+    def run_startup(self, step, progress, loading_text):
+        """Run the startup steps one after another, then open the main menu"""
+        if step == len(STARTUP_STEPS):
+            self.create_main_menu()
+            return
+        
+        name, func = STARTUP_STEPS[step]
+        loading_text.config(text=name + "...")
+        
+        def done(result):
+            progress['value'] = step + 1
+            self.run_startup(step + 1, progress, loading_text)
+        
+        def failed(error):
+            messagebox.showerror("Error", f"{name} failed: {str(error)}")
+            self.root.destroy()
+        
+        self.db.submit(func, on_done=done, on_error=failed)
     
     def create_main_menu(self):
         """Create beautiful main menu"""
@@ -144,9 +216,7 @@ class FactoryManagementGUI:
         
         # Try to load small logo
         try:
-            small_logo_img = Image.open("images/logo.png")
-            small_logo_img = small_logo_img.resize((50, 50), Image.LANCZOS)
-            self.small_logo = ImageTk.PhotoImage(small_logo_img)
+            self.small_logo = tk.PhotoImage(file=scaled_logo(50))
             logo_label = tk.Label(logo_title_frame, image=self.small_logo, bg=self.dark_color)
             logo_label.pack(side='left', padx=10)
         except:
@@ -166,6 +236,7 @@ class FactoryManagementGUI:
         
         # Menu buttons with icons
         menu_items = [
+            ("📈 Dashboard", self.show_dashboard),
             ("👨‍🏭 Workers", self.show_workers_management),
             ("🎨 Designs", self.show_designs_management),
             ("📊 Production", self.show_production_tracking),
@@ -173,6 +244,9 @@ class FactoryManagementGUI:
             ("📦 Orders", self.show_orders_management),
             ("🧾 Invoices", self.show_invoices_management),
             ("💰 Reports", self.show_salary_reports),
+            ("📋 Payroll Run", self.show_payroll_run),
+            ("🗓 Schedule", self.show_schedule),
+            ("🩺 Diagnostics", self.show_diagnostics),
             ("🚪 Exit", self.root.quit)
         ]
         
@@ -185,7 +259,7 @@ class FactoryManagementGUI:
         # Configure grid
         for i in range(2):
             menu_frame.grid_columnconfigure(i, weight=1)
-        for i in range(4):
+        for i in range((len(menu_items) + 1) // 2):
             menu_frame.grid_rowconfigure(i, weight=1)
         
         # Footer
@@ -200,6 +274,217 @@ class FactoryManagementGUI:
                             font=('Segoe UI', 9), bg=self.dark_color, fg='white')
         date_label.pack(side='right', padx=20)
 
+    # ==================== TREEVIEW REFRESH ====================
+    # Tree items use the record id as their iid, and shown_rows keeps the
+    # values last written for each id, so a refresh only touches the rows
+    # that were inserted, changed or deleted.
+    def tree_rows(self, tree):
+        """id -> row values currently shown in tree"""
+        return self.shown_rows.setdefault(tree, {})
+    
+    def upsert_tree_row(self, tree, row, index=0):
+        """Insert a row (at the top by default) or update it in place"""
+        row = tuple(row)
+        shown = self.tree_rows(tree)
+        iid = str(row[0])
+        if iid not in shown:
+            tree.insert('', index, iid=iid, values=row)
+        elif shown[iid] != row:
+            tree.item(iid, values=row)
+        shown[iid] = row
+    
+    def remove_tree_row(self, tree, row_id):
+        shown = self.tree_rows(tree)
+        iid = str(row_id)
+        if shown.pop(iid, None) is not None:
+            tree.delete(iid)
+    
+    def refresh_tree_row(self, tree, row, columns=None):
+        """Show a single edited record; row is None if it no longer exists"""
+        if row is not None:
+            self.upsert_tree_row(tree, tuple(row)[:columns])
+    
+    def sync_tree(self, tree, rows):
+        """Make tree show rows, in order, applying only the differences"""
+        shown = self.tree_rows(tree)
+        wanted = {str(values[0]): values for values in map(tuple, rows)}
+        
+        stale = [iid for iid in shown if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+        
+        for index, (iid, row) in enumerate(wanted.items()):
+            current = shown.get(iid)
+            if current is None:
+                tree.insert('', index, iid=iid, values=row)
+                continue
+            if current != row:
+                tree.item(iid, values=row)
+            # An unchanged row may still be out of place, e.g. one that
+            # refresh_tree_row put at the top
+            if tree.index(iid) != index:
+                tree.move(iid, '', index)
+        
+        shown.clear()
+        shown.update(wanted)
+    
+    # ==================== PAGED TREEVIEWS ====================
+    def create_pager(self, tree, scrollbar, fetch_page):
+        """Fetch rows into tree one page at a time as the user scrolls down"""
+        pager = {'tree': tree, 'fetch': fetch_page, 'cursor': None, 'done': True, 'pending': False}
+        
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            # Bottom of the list reached (or the page doesn't fill the view yet)
+            if float(last) >= 1.0 and not pager['done'] and not pager['pending']:
+                pager['pending'] = True
+                self.root.after_idle(lambda: self.load_next_page(pager))
+        
+        tree.configure(yscrollcommand=on_scroll)
+        return pager
+    
+    def reset_pager(self, pager):
+        """Clear the tree and load its first page again"""
+        tree = pager['tree']
+        tree.delete(*tree.get_children())
+        self.tree_rows(tree).clear()
+        pager['cursor'] = None
+        pager['done'] = False
+        # Results of fetches started before the reset are dropped
+        pager['generation'] = pager.get('generation', 0) + 1
+        pager['pending'] = True
+        self.load_next_page(pager)
+    
+    def load_next_page(self, pager):
+        tree = pager['tree']
+        if pager['done'] or not tree.winfo_exists():
+            pager['pending'] = False
+            return
+        
+        generation = pager['generation']
+        
+        def show_page(result):
+            if generation != pager['generation'] or not tree.winfo_exists():
+                return
+            rows, next_cursor = result
+            for row in rows:
+                self.upsert_tree_row(tree, row, 'end')
+            pager['cursor'] = next_cursor
+            pager['done'] = next_cursor is None
+            pager['pending'] = False
+        
+        self.db.submit(pager['fetch'], pager['cursor'], on_done=show_page)
+
+    # ==================== SEARCH ====================
+    def create_search_box(self, parent, on_search):
+        """Search entry that calls on_search(text) once typing pauses"""
+        frame = tk.Frame(parent, bg=self.light_color)
+        frame.pack(fill='x', pady=(0, 5))
+        tk.Label(frame, text="Search:", bg=self.light_color).pack(side='left', padx=5)
+        
+        search_var = tk.StringVar()
+        ttk.Entry(frame, textvariable=search_var).pack(side='left', expand=True, fill='x')
+        
+        pending = [None]
+        
+        def run():
+            pending[0] = None
+            if frame.winfo_exists():
+                on_search(search_var.get().strip())
+        
+        def changed(*args):
+            # Restart the wait on every keystroke so only the final text is searched
+            if pending[0]:
+                self.root.after_cancel(pending[0])
+            pending[0] = self.root.after(SEARCH_DELAY, run)
+        
+        search_var.trace_add('write', changed)
+        return search_var
+    
+    def run_search(self, tree, search, text, show):
+        """Run search(text) off the UI thread; only the latest result is shown"""
+        generation = self.search_generations[tree] = self.search_generations.get(tree, 0) + 1
+        
+        def done(rows):
+            if generation == self.search_generations.get(tree) and tree.winfo_exists():
+                show(rows)
+        
+        self.db.submit(search, text, on_done=done)
+    
+    def search_clients_list(self, text):
+        if not text:
+            # Drop any search still running, then show everything again
+            self.search_generations[self.clients_tree] = self.search_generations.get(self.clients_tree, 0) + 1
+            self.load_clients()
+            return
+        self.run_search(self.clients_tree, search_clients, text, 
+                        lambda rows: self.sync_tree(self.clients_tree, [row[:5] for row in rows]))
+    
+    def search_designs_list(self, text):
+        if not text:
+            self.search_generations[self.designs_tree] = self.search_generations.get(self.designs_tree, 0) + 1
+            self.load_designs()
+            return
+        self.run_search(self.designs_tree, search_designs, text, 
+                        lambda rows: self.sync_tree(self.designs_tree, rows))
+    
+    def search_orders_list(self, text):
+        # Orders stay paged: the pager just fetches matching orders instead
+        if text:
+            self.orders_pager['fetch'] = lambda cursor: search_orders_page(text, cursor)
+        else:
+            self.orders_pager['fetch'] = get_orders_page
+        self.reset_pager(self.orders_pager)
+
+    # ==================== CSV IMPORT ====================
+    def import_csv_file(self, kind, tree, reload):
+        """Import a CSV of `kind` off the UI thread, then reload the list"""
+        path = filedialog.askopenfilename(title=f"Import {kind} from CSV",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        
+        def imported(result):
+            message = (f"{result['imported']} rows imported in {result['seconds']:.2f}s "
+                       f"({result['per_second']:.0f} rows/s)")
+            rejected = result['rejected']
+            if rejected:
+                message += f"\n\n{len(rejected)} rows rejected:\n"
+                message += "\n".join(f"Line {line}: {reason}" for line, reason in rejected[:10])
+                if len(rejected) > 10:
+                    message += f"\n... and {len(rejected) - 10} more"
+            messagebox.showinfo("Import", message)
+            if result['imported']:
+                production_schedule.invalidate()
+            if result['imported'] and tree.winfo_exists():
+                reload()
+        
+        def failed(error):
+            messagebox.showerror("Error", f"Import failed: {str(error)}")
+        
+        self.db.submit(import_csv, kind, path, on_done=imported, on_error=failed)
+
+    # ==================== EXPORT ====================
+    def ask_export_path(self, name):
+        return filedialog.asksaveasfilename(defaultextension='.csv', initialfile=f"{name}.csv",
+                                            filetypes=[("CSV files", "*.csv"), ("JSON Lines", "*.jsonl")])
+    
+    def export_records(self, kind):
+        """Stream every `kind` row to a CSV or JSON Lines file off the UI thread"""
+        path = self.ask_export_path(f"{kind}_{datetime.now().strftime('%Y-%m-%d')}")
+        if not path:
+            return
+        
+        self.db.submit(export_rows, kind, path, 
+                       on_done=self.show_export_result, on_error=self.show_export_error)
+    
+    def show_export_result(self, result):
+        messagebox.showinfo("Success", f"{result['rows']} rows exported to {result['path']} "
+                                       f"in {result['seconds']:.2f}s")
+    
+    def show_export_error(self, error):
+        messagebox.showerror("Error", f"Export failed: {str(error)}")
+
     # ==================== WORKERS MANAGEMENT ====================
     def show_workers_management(self):
         self.clear_frame()
@@ -285,12 +570,7 @@ class FactoryManagementGUI:
         home_btn.pack(side='bottom', pady=10)
     
     def load_workers(self):
-        for item in self.workers_tree.get_children():
-            self.workers_tree.delete(item)
-        
-        workers = get_all_workers()
-        for worker in workers:
-            self.workers_tree.insert('', 'end', values=worker)
+        self.sync_tree(self.workers_tree, worker_lookup.rows())
     
     def add_worker(self):
         name = self.worker_entries[0].get()
@@ -316,17 +596,17 @@ class FactoryManagementGUI:
                 messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
                 return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO workers (name, contact, joining_date, hourly_rate) VALUES (?, ?, ?, ?)",
-            (name, contact, joining_date, hourly_rate)
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO workers (name, contact, joining_date, hourly_rate) VALUES (?, ?, ?, ?)",
+                (name, contact, joining_date, hourly_rate)
+            )
+        
+        worker_lookup.invalidate()
         
         messagebox.showinfo("Success", "Worker added successfully!")
-        self.load_workers()
+        self.refresh_tree_row(self.workers_tree, get_worker(cursor.lastrowid))
         self.clear_worker_form()
     
     def update_worker(self):
@@ -351,17 +631,17 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Invalid hourly rate!")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE workers SET name=?, contact=?, joining_date=?, hourly_rate=? WHERE id=?",
-            (name, contact, joining_date, hourly_rate, worker_id)
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE workers SET name=?, contact=?, joining_date=?, hourly_rate=? WHERE id=?",
+                (name, contact, joining_date, hourly_rate, worker_id)
+            )
+        
+        worker_lookup.invalidate()
         
         messagebox.showinfo("Success", "Worker updated successfully!")
-        self.load_workers()
+        self.refresh_tree_row(self.workers_tree, get_worker(worker_id))
     
     def delete_worker(self):
         selected = self.workers_tree.selection()
@@ -374,14 +654,18 @@ class FactoryManagementGUI:
         
         worker_id = self.workers_tree.item(selected[0])['values'][0]
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM workers WHERE id=?", (worker_id,))
-        conn.commit()
-        conn.close()
+        try:
+            with transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM workers WHERE id=?", (worker_id,))
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", "Cannot delete this worker because it has production records!")
+            return
+        
+        worker_lookup.invalidate()
         
         messagebox.showinfo("Success", "Worker deleted successfully!")
-        self.load_workers()
+        self.remove_tree_row(self.workers_tree, worker_id)
         self.clear_worker_form()
     
     def clear_worker_form(self):
@@ -449,6 +733,8 @@ class FactoryManagementGUI:
         tk.Label(right_frame, text="Designs List", font=('Segoe UI', 12, 'bold'), 
                 bg=self.light_color).pack(pady=5)
         
+        self.create_search_box(right_frame, self.search_designs_list)
+        
         # Treeview
         self.designs_tree = ttk.Treeview(right_frame, columns=("ID", "Name", "Description", "Base Price", "Complexity"), 
                                        show='headings', selectmode='browse')
@@ -483,12 +769,7 @@ class FactoryManagementGUI:
         home_btn.pack(side='bottom', pady=10)
     
     def load_designs(self):
-        for item in self.designs_tree.get_children():
-            self.designs_tree.delete(item)
-        
-        designs = get_all_designs()
-        for design in designs:
-            self.designs_tree.insert('', 'end', values=design)
+        self.sync_tree(self.designs_tree, design_lookup.rows())
     
     def add_design(self):
         name = self.design_entries[0].get()
@@ -514,17 +795,17 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Complexity must be between 1 and 5!")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO designs (name, description, base_price, complexity_level) VALUES (?, ?, ?, ?)",
-            (name, description, base_price, complexity)
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO designs (name, description, base_price, complexity_level) VALUES (?, ?, ?, ?)",
+                (name, description, base_price, complexity)
+            )
+        
+        design_lookup.invalidate()
         
         messagebox.showinfo("Success", "Design added successfully!")
-        self.load_designs()
+        self.refresh_tree_row(self.designs_tree, get_design(cursor.lastrowid))
         self.clear_design_form()
     
     def update_design(self):
@@ -557,17 +838,17 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Complexity must be between 1 and 5!")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE designs SET name=?, description=?, base_price=?, complexity_level=? WHERE id=?",
-            (name, description, base_price, complexity, design_id)
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE designs SET name=?, description=?, base_price=?, complexity_level=? WHERE id=?",
+                (name, description, base_price, complexity, design_id)
+            )
+        
+        design_lookup.invalidate()
         
         messagebox.showinfo("Success", "Design updated successfully!")
-        self.load_designs()
+        self.refresh_tree_row(self.designs_tree, get_design(design_id))
     
     def delete_design(self):
         selected = self.designs_tree.selection()
@@ -580,14 +861,18 @@ class FactoryManagementGUI:
         
         design_id = self.designs_tree.item(selected[0])['values'][0]
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM designs WHERE id=?", (design_id,))
-        conn.commit()
-        conn.close()
+        try:
+            with transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM designs WHERE id=?", (design_id,))
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", "Cannot delete this design because it is used by orders or production records!")
+            return
+        
+        design_lookup.invalidate()
         
         messagebox.showinfo("Success", "Design deleted successfully!")
-        self.load_designs()
+        self.remove_tree_row(self.designs_tree, design_id)
         self.clear_design_form()
     
     def clear_design_form(self):
@@ -661,6 +946,12 @@ class FactoryManagementGUI:
                  style='Danger.TButton').grid(row=0, column=1, padx=5)
         ttk.Button(button_frame, text="Clear", command=self.clear_production_form, 
                  style='Primary.TButton').grid(row=0, column=2, padx=5)
+        ttk.Button(button_frame, text="Import CSV", 
+                 command=lambda: self.import_csv_file('production', self.production_tree, 
+                                                 self.load_production_records), 
+                 style='Primary.TButton').grid(row=1, column=0, columnspan=3, pady=10, sticky='ew')
+        ttk.Button(button_frame, text="Export...", command=lambda: self.export_records('production'), 
+                 style='Primary.TButton').grid(row=2, column=0, columnspan=3, sticky='ew')
         
         # Right Frame - List
         right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
@@ -686,7 +977,7 @@ class FactoryManagementGUI:
         self.production_tree.column("Date", width=100, anchor='center')
         
         scrollbar = ttk.Scrollbar(right_frame, orient="vertical", command=self.production_tree.yview)
-        self.production_tree.configure(yscrollcommand=scrollbar.set)
+        self.production_pager = self.create_pager(self.production_tree, scrollbar, get_production_page)
         
         self.production_tree.pack(side='left', expand=True, fill='both')
         scrollbar.pack(side='right', fill='y')
@@ -704,21 +995,11 @@ class FactoryManagementGUI:
         home_btn.pack(side='bottom', pady=10)
     
     def load_production_dropdowns(self):
-        workers = get_all_workers()
-        worker_options = [f"{w[0]} - {w[1]}" for w in workers]
-        self.worker_dropdown['values'] = worker_options
-        
-        designs = get_all_designs()
-        design_options = [f"{d[0]} - {d[1]}" for d in designs]
-        self.design_dropdown['values'] = design_options
+        self.worker_dropdown['values'] = worker_lookup.options()
+        self.design_dropdown['values'] = design_lookup.options()
     
     def load_production_records(self):
-        for item in self.production_tree.get_children():
-            self.production_tree.delete(item)
-        
-        records = get_production_records()
-        for record in records:
-            self.production_tree.insert('', 'end', values=record)
+        self.reset_pager(self.production_pager)
     
     def add_production_record(self):
         worker = self.worker_var.get()
@@ -751,17 +1032,11 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
-            (worker_id, design_id, quantity, date)
-        )
-        conn.commit()
-        conn.close()
+        record_id = record_production(worker_id, design_id, quantity, date)
+        self.db.submit(production_schedule.record_production, worker_id, design_id, quantity, date)
         
         messagebox.showinfo("Success", "Production record added successfully!")
-        self.load_production_records()
+        self.refresh_tree_row(self.production_tree, get_production_row(record_id))
         self.clear_production_form()
     
     def delete_production_record(self):
@@ -775,14 +1050,14 @@ class FactoryManagementGUI:
         
         record_id = self.production_tree.item(selected[0])['values'][0]
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM worker_production WHERE id=?", (record_id,))
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM worker_production WHERE id=?", (record_id,))
+        # Output taken back cannot be un-credited; the schedule is rebuilt when next shown
+        production_schedule.invalidate()
         
         messagebox.showinfo("Success", "Record deleted successfully!")
-        self.load_production_records()
+        self.remove_tree_row(self.production_tree, record_id)
         self.clear_production_form()
     
     def clear_production_form(self):
@@ -797,29 +1072,26 @@ class FactoryManagementGUI:
         if not selected:
             return
         
-        record_data = self.production_tree.item(selected[0])['values']
+        record_id = self.production_tree.item(selected[0])['values'][0]
+        record = get_production(record_id)
+        if not record:
+            self.remove_tree_row(self.production_tree, record_id)
+            return
         self.clear_production_form()
         
-        # Set worker
-        worker_id = record_data[1]  # Assuming the worker name is in the format "ID - Name"
-        workers = get_all_workers()
-        for worker in workers:
-            if worker[0] == worker_id:
-                self.worker_var.set(f"{worker[0]} - {worker[1]}")
-                break
-        
-        # Set design
-        design_id = record_data[2]
-        designs = get_all_designs()
-        for design in designs:
-            if design[0] == design_id:
-                self.design_var.set(f"{design[0]} - {design[1]}")
-                break
+        # Set worker and design by id: the list shows names, which need not be unique
+        worker = worker_lookup.get(record.worker_id)
+        if worker:
+            self.worker_var.set(worker_lookup.label(worker))
+        
+        design = design_lookup.get(record.design_id)
+        if design:
+            self.design_var.set(design_lookup.label(design))
         
         # Set quantity and date
-        self.quantity_entry.insert(0, record_data[3])
+        self.quantity_entry.insert(0, record.quantity)
         self.date_entry.delete(0, tk.END)
-        self.date_entry.insert(0, record_data[4])
+        self.date_entry.insert(0, record.date)
 
     # ==================== CLIENTS MANAGEMENT ====================
     def show_clients_management(self):
@@ -863,6 +1135,9 @@ class FactoryManagementGUI:
                  style='Danger.TButton').grid(row=0, column=2, padx=5)
         ttk.Button(button_frame, text="Clear", command=self.clear_client_form, 
                  style='Primary.TButton').grid(row=0, column=3, padx=5)
+        ttk.Button(button_frame, text="Import CSV", 
+                 command=lambda: self.import_csv_file('clients', self.clients_tree, self.load_clients), 
+                 style='Primary.TButton').grid(row=1, column=0, columnspan=4, pady=10, sticky='ew')
         
         # Right Frame - List
         right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
@@ -871,6 +1146,8 @@ class FactoryManagementGUI:
         tk.Label(right_frame, text="Clients List", font=('Segoe UI', 12, 'bold'), 
                 bg=self.light_color).pack(pady=5)
         
+        self.create_search_box(right_frame, self.search_clients_list)
+        
         # Treeview
         self.clients_tree = ttk.Treeview(right_frame, columns=("ID", "Name", "Company", "Contact", "Email"), 
                                        show='headings', selectmode='browse')
@@ -905,12 +1182,8 @@ class FactoryManagementGUI:
         home_btn.pack(side='bottom', pady=10)
     
     def load_clients(self):
-        for item in self.clients_tree.get_children():
-            self.clients_tree.delete(item)
-        
-        clients = get_all_clients()
-        for client in clients:
-            self.clients_tree.insert('', 'end', values=client[:5])  # Only show first 5 fields
+        clients = client_lookup.rows()
+        self.sync_tree(self.clients_tree, [client[:5] for client in clients])  # Only show first 5 fields
     
     def add_client(self):
         name = self.client_entries[0].get()
@@ -923,17 +1196,17 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Name is required!")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO clients (name, company, contact, email, address) VALUES (?, ?, ?, ?, ?)",
-            (name, company, contact, email, address)
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO clients (name, company, contact, email, address) VALUES (?, ?, ?, ?, ?)",
+                (name, company, contact, email, address)
+            )
+        
+        client_lookup.invalidate()
         
         messagebox.showinfo("Success", "Client added successfully!")
-        self.load_clients()
+        self.refresh_tree_row(self.clients_tree, get_client(cursor.lastrowid), columns=5)
         self.clear_client_form()
     
     def update_client(self):
@@ -953,17 +1226,17 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Name is required!")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE clients SET name=?, company=?, contact=?, email=?, address=? WHERE id=?",
-            (name, company, contact, email, address, client_id)
-        )
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE clients SET name=?, company=?, contact=?, email=?, address=? WHERE id=?",
+                (name, company, contact, email, address, client_id)
+            )
+        
+        client_lookup.invalidate()
         
         messagebox.showinfo("Success", "Client updated successfully!")
-        self.load_clients()
+        self.refresh_tree_row(self.clients_tree, get_client(client_id), columns=5)
     
     def delete_client(self):
         selected = self.clients_tree.selection()
@@ -976,14 +1249,18 @@ class FactoryManagementGUI:
         
         client_id = self.clients_tree.item(selected[0])['values'][0]
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM clients WHERE id=?", (client_id,))
-        conn.commit()
-        conn.close()
+        try:
+            with transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM clients WHERE id=?", (client_id,))
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", "Cannot delete this client because it has orders!")
+            return
+        
+        client_lookup.invalidate()
         
         messagebox.showinfo("Success", "Client deleted successfully!")
-        self.load_clients()
+        self.remove_tree_row(self.clients_tree, client_id)
         self.clear_client_form()
     
     def clear_client_form(self):
@@ -1055,7 +1332,7 @@ class FactoryManagementGUI:
         # Status
         tk.Label(form_frame, text="Status:", bg=self.light_color).grid(row=5, column=0, sticky='e', padx=5, pady=5)
         self.order_status_var = tk.StringVar(value="Pending")
-        status_options = ["Pending", "In Progress", "Completed", "Delivered", "Cancelled"]
+        status_options = list(ORDER_STATUSES)
         self.order_status_dropdown = ttk.Combobox(form_frame, textvariable=self.order_status_var, 
                                                 values=status_options, state='readonly', width=23)
         self.order_status_dropdown.grid(row=5, column=1, padx=5, pady=5)
@@ -1071,6 +1348,13 @@ class FactoryManagementGUI:
                  style='Danger.TButton').grid(row=0, column=2, padx=5)
         ttk.Button(button_frame, text="Clear", command=self.clear_order_form, 
                  style='Primary.TButton').grid(row=0, column=3, padx=5)
+        ttk.Button(button_frame, text="Invoice Selected Orders", command=self.invoice_selected_orders, 
+                 style='Success.TButton').grid(row=1, column=0, columnspan=4, pady=10, sticky='ew')
+        ttk.Button(button_frame, text="Import CSV", 
+                 command=lambda: self.import_csv_file('orders', self.orders_tree, self.load_orders), 
+                 style='Primary.TButton').grid(row=2, column=0, columnspan=4, sticky='ew')
+        ttk.Button(button_frame, text="Export...", command=lambda: self.export_records('orders'), 
+                 style='Primary.TButton').grid(row=3, column=0, columnspan=4, pady=10, sticky='ew')
         
         # Right Frame - List
         right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
@@ -1079,9 +1363,11 @@ class FactoryManagementGUI:
         tk.Label(right_frame, text="Orders List", font=('Segoe UI', 12, 'bold'), 
                 bg=self.light_color).pack(pady=5)
         
+        self.create_search_box(right_frame, self.search_orders_list)
+        
         # Treeview
         self.orders_tree = ttk.Treeview(right_frame, columns=("ID", "Client", "Design", "Quantity", "Order Date", "Deadline", "Status"), 
-                                      show='headings', selectmode='browse')
+                                      show='headings', selectmode='extended')
         
         self.orders_tree.heading("ID", text="ID")
         self.orders_tree.heading("Client", text="Client")
@@ -1100,7 +1386,7 @@ class FactoryManagementGUI:
         self.orders_tree.column("Status", width=100, anchor='center')
         
         scrollbar = ttk.Scrollbar(right_frame, orient="vertical", command=self.orders_tree.yview)
-        self.orders_tree.configure(yscrollcommand=scrollbar.set)
+        self.orders_pager = self.create_pager(self.orders_tree, scrollbar, get_orders_page)
         
         self.orders_tree.pack(side='left', expand=True, fill='both')
         scrollbar.pack(side='right', fill='y')
@@ -1118,21 +1404,11 @@ class FactoryManagementGUI:
         home_btn.pack(side='bottom', pady=10)
     
     def load_order_dropdowns(self):
-        clients = get_all_clients()
-        client_options = [f"{c[0]} - {c[1]}" for c in clients]
-        self.order_client_dropdown['values'] = client_options
-        
-        designs = get_all_designs()
-        design_options = [f"{d[0]} - {d[1]}" for d in designs]
-        self.order_design_dropdown['values'] = design_options
+        self.order_client_dropdown['values'] = client_lookup.options()
+        self.order_design_dropdown['values'] = design_lookup.options()
     
     def load_orders(self):
-        for item in self.orders_tree.get_children():
-            self.orders_tree.delete(item)
-        
-        orders = get_all_orders()
-        for order in orders:
-            self.orders_tree.insert('', 'end', values=order)
+        self.reset_pager(self.orders_pager)
     
     def add_order(self):
         client = self.order_client_var.get()
@@ -1168,17 +1444,11 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "INSERT INTO orders (client_id, design_id, quantity, order_date, deadline, status) VALUES (?, ?, ?, ?, ?, ?)",
-            (client_id, design_id, quantity, order_date, deadline, status)
-        )
-        conn.commit()
-        conn.close()
+        order_id = create_order(client_id, design_id, quantity, order_date, deadline, status)
+        self.db.submit(production_schedule.order_changed, order_id)
         
         messagebox.showinfo("Success", "Order added successfully!")
-        self.load_orders()
+        self.refresh_tree_row(self.orders_tree, get_order_row(order_id))
         self.clear_order_form()
     
     def update_order(self):
@@ -1221,17 +1491,31 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Invalid date format! Use YYYY-MM-DD")
             return
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "UPDATE orders SET client_id=?, design_id=?, quantity=?, order_date=?, deadline=?, status=? WHERE id=?",
-            (client_id, design_id, quantity, order_date, deadline, status, order_id)
-        )
-        conn.commit()
-        conn.close()
+        # The version read when the order was selected; the update only
+        # applies if nobody has changed the order since
+        selected_id, version = self.selected_order_version
+        if selected_id != order_id:
+            messagebox.showerror("Error", "Please select the order again before updating it!")
+            return
+        
+        try:
+            self.selected_order_version = (order_id, update_order(
+                order_id, version, client_id, design_id, quantity, order_date, deadline, status))
+        except ConflictError:
+            messagebox.showerror("Error", "This order was changed by someone else after you selected it. "
+                                 "Its latest details have been loaded; check them and update again.")
+            row = get_order_row(order_id)
+            if row:
+                self.refresh_tree_row(self.orders_tree, row)
+                self.on_order_select(None)
+            else:
+                self.remove_tree_row(self.orders_tree, order_id)
+                self.clear_order_form()
+            return
         
+        self.db.submit(production_schedule.order_changed, order_id)
         messagebox.showinfo("Success", "Order updated successfully!")
-        self.load_orders()
+        self.refresh_tree_row(self.orders_tree, get_order_row(order_id))
     
     def delete_order(self):
         selected = self.orders_tree.selection()
@@ -1244,16 +1528,37 @@ class FactoryManagementGUI:
         
         order_id = self.orders_tree.item(selected[0])['values'][0]
         
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM orders WHERE id=?", (order_id,))
-        conn.commit()
-        conn.close()
+        try:
+            with transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM orders WHERE id=?", (order_id,))
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", "Cannot delete this order because it has invoices!")
+            return
+        self.db.submit(production_schedule.order_changed, order_id)
         
         messagebox.showinfo("Success", "Order deleted successfully!")
-        self.load_orders()
+        self.remove_tree_row(self.orders_tree, order_id)
         self.clear_order_form()
     
+    def invoice_selected_orders(self):
+        selected = self.orders_tree.selection()
+        if not selected:
+            messagebox.showerror("Error", "Please select one or more orders to invoice!")
+            return
+        
+        order_ids = [self.orders_tree.item(item)['values'][0] for item in selected]
+        
+        def invoices_created(result):
+            self.db.submit(production_schedule.orders_changed, result['order_ids'])
+            self.show_batch_invoice_result(result)
+            if self.orders_tree.winfo_exists():
+                # Only the invoiced orders changed (their status)
+                for order_id in result['order_ids']:
+                    self.refresh_tree_row(self.orders_tree, get_order_row(order_id))
+        
+        self.db.submit(create_invoices, order_ids, on_done=invoices_created)
+    
     def clear_order_form(self):
         self.order_client_var.set('')
         self.order_design_var.set('')
@@ -1268,31 +1573,35 @@ class FactoryManagementGUI:
         if not selected:
             return
         
-        order_data = self.orders_tree.item(selected[0])['values']
+        order_id = self.orders_tree.item(selected[0])['values'][0]
+        
+        # Version first, then the row: if the order changes in between, the
+        # version is the older one and an update reports a conflict instead
+        # of overwriting the change
+        order = get_order(order_id)
+        order_row = get_order_row(order_id)
+        if not order or not order_row:
+            self.remove_tree_row(self.orders_tree, order_id)
+            return
+        self.selected_order_version = (order_id, order.version)
+        self.refresh_tree_row(self.orders_tree, order_row)
         self.clear_order_form()
         
-        # Set client
-        client_id = order_data[1]  # Assuming the client name is in the format "ID - Name"
-        clients = get_all_clients()
-        for client in clients:
-            if client[0] == client_id:
-                self.order_client_var.set(f"{client[0]} - {client[1]}")
-                break
-        
-        # Set design
-        design_id = order_data[2]
-        designs = get_all_designs()
-        for design in designs:
-            if design[0] == design_id:
-                self.order_design_var.set(f"{design[0]} - {design[1]}")
-                break
-        
-        # Set other fields
-        self.order_quantity_entry.insert(0, order_data[3])
+        # Set client and design by id: the list shows names, which need not be unique
+        client = client_lookup.get(order.client_id)
+        if client:
+            self.order_client_var.set(client_lookup.label(client))
+        
+        design = design_lookup.get(order.design_id)
+        if design:
+            self.order_design_var.set(design_lookup.label(design))
+        
+        # Set other fields, from the same read as the version
+        self.order_quantity_entry.insert(0, order.quantity)
         self.order_date_entry.delete(0, tk.END)
-        self.order_date_entry.insert(0, order_data[4])
-        self.order_deadline_entry.insert(0, order_data[5])
-        self.order_status_var.set(order_data[6])
+        self.order_date_entry.insert(0, order.order_date)
+        self.order_deadline_entry.insert(0, order.deadline)
+        self.order_status_var.set(order.status)
 
     # ==================== INVOICES MANAGEMENT ====================
     def show_invoices_management(self):
@@ -1343,6 +1652,12 @@ class FactoryManagementGUI:
                  style='Primary.TButton').grid(row=0, column=1, padx=5)
         ttk.Button(button_frame, text="Clear", command=self.clear_invoice_form, 
                  style='Primary.TButton').grid(row=0, column=2, padx=5)
+        ttk.Button(button_frame, text="Invoice All Eligible Orders", command=self.generate_all_invoices, 
+                 style='Success.TButton').grid(row=1, column=0, columnspan=3, pady=10, sticky='ew')
+        ttk.Button(button_frame, text="Export...", command=lambda: self.export_records('invoices'), 
+                 style='Primary.TButton').grid(row=2, column=0, columnspan=3, sticky='ew')
+        ttk.Button(button_frame, text="Mark Paid", command=self.mark_invoice_paid, 
+                 style='Primary.TButton').grid(row=3, column=0, columnspan=3, pady=10, sticky='ew')
         
         # Right Frame - Invoices List
         right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
@@ -1370,7 +1685,7 @@ class FactoryManagementGUI:
         self.invoices_tree.column("Status", width=100, anchor='center')
         
         scrollbar = ttk.Scrollbar(right_frame, orient="vertical", command=self.invoices_tree.yview)
-        self.invoices_tree.configure(yscrollcommand=scrollbar.set)
+        self.invoices_pager = self.create_pager(self.invoices_tree, scrollbar, get_invoices_page)
         
         self.invoices_tree.pack(side='left', expand=True, fill='both')
         scrollbar.pack(side='right', fill='y')
@@ -1388,41 +1703,16 @@ class FactoryManagementGUI:
         home_btn.pack(side='bottom', pady=10)
     
     def load_invoice_dropdown(self):
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-        SELECT o.id, c.name, d.name 
-        FROM orders o
-        JOIN clients c ON o.client_id = c.id
-        JOIN designs d ON o.design_id = d.id
-        WHERE o.status != 'Cancelled' AND o.id NOT IN (SELECT order_id FROM invoices)
-        ''')
-        
-        orders = cursor.fetchall()
-        conn.close()
-        
-        order_options = [f"{o[0]} - {o[1]} ({o[2]})" for o in orders]
-        self.invoice_order_dropdown['values'] = order_options
+        def show_orders(orders):
+            if not self.invoice_order_dropdown.winfo_exists():
+                return
+            order_options = [f"{o[0]} - {o[1]} ({o[2]})" for o in orders]
+            self.invoice_order_dropdown['values'] = order_options
+        
+        self.db.submit(get_uninvoiced_orders, on_done=show_orders)
     
     def load_invoices(self):
-        for item in self.invoices_tree.get_children():
-            self.invoices_tree.delete(item)
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-        SELECT i.id, i.order_id, c.name, i.invoice_date, i.total_amount, i.status
-        FROM invoices i
-        JOIN orders o ON i.order_id = o.id
-        JOIN clients c ON o.client_id = c.id
-        ORDER BY i.invoice_date DESC
-        ''')
-        
-        invoices = cursor.fetchall()
-        conn.close()
-        
-        for invoice in invoices:
-            self.invoices_tree.insert('', 'end', values=invoice)
+        self.reset_pager(self.invoices_pager)
     
     def generate_invoice(self):
         order = self.invoice_order_var.get()
@@ -1446,80 +1736,88 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Invalid tax or discount value!")
             return
         
-        invoice_data = create_invoice(order_id, tax, discount)
-        if invoice_data:
+        def invoice_created(invoice_data):
+            if not invoice_data:
+                messagebox.showerror("Error", "Order not found!")
+                return
+            self.db.submit(production_schedule.order_changed, order_id)
             messagebox.showinfo("Success", f"Invoice #{invoice_data['invoice_id']} generated successfully!")
-            self.load_invoice_dropdown()
-            self.load_invoices()
-            self.clear_invoice_form()
+            if self.invoices_tree.winfo_exists():
+                self.load_invoice_dropdown()
+                self.refresh_tree_row(self.invoices_tree, get_invoice_row(invoice_data['invoice_id']))
+                self.clear_invoice_form()
+        
+        def failed(error):
+            if not isinstance(error, ConflictError):
+                raise error
+            messagebox.showerror("Error", str(error))
+            if self.invoices_tree.winfo_exists():
+                self.load_invoice_dropdown()
+        
+        self.db.submit(create_invoice, order_id, tax, discount, on_done=invoice_created, on_error=failed)
+    
+    def generate_all_invoices(self):
+        try:
+            tax = float(self.invoice_tax_entry.get() or 0)
+            discount = float(self.invoice_discount_entry.get() or 0)
+        except ValueError:
+            messagebox.showerror("Error", "Invalid tax or discount value!")
+            return
+        
+        if not messagebox.askyesno("Confirm", "Create invoices for every eligible order?"):
+            return
+        
+        def invoices_created(result):
+            self.db.submit(production_schedule.orders_changed, result['order_ids'])
+            self.show_batch_invoice_result(result)
+            if self.invoices_tree.winfo_exists():
+                self.load_invoice_dropdown()
+                self.load_invoices()
+        
+        self.db.submit(create_invoices, None, tax, discount, on_done=invoices_created)
+    
+    def show_batch_invoice_result(self, result):
+        if not result['count']:
+            messagebox.showinfo("Invoices", "No eligible orders to invoice.")
+            return
+        messagebox.showinfo("Success", 
+                            f"{result['count']} invoices generated in {result['seconds']:.2f}s "
+                            f"({result['per_second']:.0f} invoices/s)\n"
+                            f"Total billed: ${result['total']:.2f}")
     
     def print_invoice(self):
-            selected = self.invoices_tree.selection()
-            if not selected:
-                messagebox.showerror("Error", "Please select an invoice to print!")
-                return
-            
-            invoice_id = self.invoices_tree.item(selected[0])['values'][0]
-            
-            # Get invoice details
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-            SELECT i.id, i.order_id, c.name, c.company, c.address, 
-                d.name, d.base_price, o.quantity, 
-                i.invoice_date, i.amount, i.tax, i.discount, i.total_amount
-            FROM invoices i
-            JOIN orders o ON i.order_id = o.id
-            JOIN clients c ON o.client_id = c.id
-            JOIN designs d ON o.design_id = d.id
-            WHERE i.id = ?
-            ''', (invoice_id,))
-            
-            invoice = cursor.fetchone()
-            conn.close()
-            
-            if not invoice:
+        selected = self.invoices_tree.selection()
+        if not selected:
+            messagebox.showerror("Error", "Please select an invoice to print!")
+            return
+        
+        invoice_id = self.invoices_tree.item(selected[0])['values'][0]
+        
+        def render(invoice_id):
+            invoice_data = get_invoice_details(invoice_id)
+            if not invoice_data:
+                return None
+            from invoice_pdf import export_invoice_pdf, render_invoice_html
+            try:
+                path, pages = export_invoice_pdf(invoice_data)
+            except RuntimeError:
+                # No WeasyPrint on this machine: fall back to an HTML preview
+                path = os.path.join('invoice_template', f'invoice_{invoice_id}.html')
+                with open(path, 'w') as f:
+                    f.write(render_invoice_html(invoice_data))
+            return path
+        
+        def opened(path):
+            if not path:
                 messagebox.showerror("Error", "Invoice not found!")
                 return
-            
-            # Prepare data for template
-            invoice_data = {
-                'invoice_id': invoice[0],
-                'order_id': invoice[1],
-                'client_name': invoice[2],
-                'client_company': invoice[3],
-                'client_address': invoice[4],
-                'design_name': invoice[5],
-                'unit_price': invoice[6],
-                'quantity': invoice[7],
-                'invoice_date': invoice[8],
-                'subtotal': invoice[9],
-                'tax': invoice[10],
-                'discount': invoice[11],
-                'total': invoice[12]
-            }
-            
-            # Load HTML template
-            template_path = os.path.join('invoice_template', 'template.html')
-            try:
-                with open(template_path, 'r') as f:
-                    template_content = f.read()
-                
-                # Create template and render with data
-                template = Template(template_content)
-                html_content = template.render(**invoice_data)
-                
-                # Save to temporary file
-                temp_file = os.path.join('invoice_template', f'invoice_{invoice_id}.html')
-                with open(temp_file, 'w') as f:
-                    f.write(html_content)
-                
-                # Open in browser
-                webbrowser.open('file://' + os.path.abspath(temp_file))
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to generate invoice: {str(e)}")
-
+            import webbrowser
+            webbrowser.open('file://' + os.path.abspath(path))
+        
+        def failed(error):
+            messagebox.showerror("Error", f"Failed to generate invoice: {str(error)}")
+        
+        self.db.submit(render, invoice_id, on_done=opened, on_error=failed)
 
     def clear_invoice_form(self):
         self.invoice_order_var.set('')
@@ -1533,8 +1831,39 @@ class FactoryManagementGUI:
         if not selected:
             return
         
-        invoice_data = self.invoices_tree.item(selected[0])['values']
-        # You can implement details display if needed
+        invoice_id = self.invoices_tree.item(selected[0])['values'][0]
+        
+        # Same order as on_order_select: version first, then the row
+        invoice = get_invoice(invoice_id)
+        invoice_row = get_invoice_row(invoice_id)
+        if not invoice or not invoice_row:
+            self.remove_tree_row(self.invoices_tree, invoice_id)
+            return
+        self.selected_invoice_version = (invoice_id, invoice.version)
+        self.refresh_tree_row(self.invoices_tree, invoice_row)
+    
+    def mark_invoice_paid(self):
+        selected = self.invoices_tree.selection()
+        if not selected:
+            messagebox.showerror("Error", "Please select an invoice to mark as paid!")
+            return
+        
+        invoice_id = self.invoices_tree.item(selected[0])['values'][0]
+        selected_id, version = self.selected_invoice_version
+        if selected_id != invoice_id:
+            messagebox.showerror("Error", "Please select the invoice again!")
+            return
+        
+        try:
+            self.selected_invoice_version = (invoice_id, set_invoice_status(invoice_id, version, 'Paid'))
+        except ConflictError:
+            messagebox.showerror("Error", "This invoice was changed by someone else after you selected it. "
+                                 "Its latest details have been loaded; check them and try again.")
+            self.on_invoice_select(None)
+            return
+        
+        messagebox.showinfo("Success", f"Invoice #{invoice_id} marked as paid!")
+        self.refresh_tree_row(self.invoices_tree, get_invoice_row(invoice_id))
 
     # ==================== SALARY REPORTS ====================
     def show_salary_reports(self):
@@ -1615,9 +1944,7 @@ class FactoryManagementGUI:
         home_btn.pack(side='bottom', pady=10)
     
     def load_salary_dropdown(self):
-        workers = get_all_workers()
-        worker_options = [f"{w[0]} - {w[1]}" for w in workers]
-        self.salary_worker_dropdown['values'] = worker_options
+        self.salary_worker_dropdown['values'] = worker_lookup.options()
     
     def generate_salary_report(self):
         worker = self.salary_worker_var.get()
@@ -1636,19 +1963,17 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "Invalid selection!")
             return
         
-        salary_data = calculate_worker_salary(worker_id, month, year)
+        def show_report(salary_data):
+            if self.report_text.winfo_exists():
+                self.show_salary_report(worker, month, year, salary_data)
+        
+        self.db.submit(calculate_worker_salary, worker_id, month, year, on_done=show_report)
+    
+    def show_salary_report(self, worker, month, year, salary_data):
+        from templates import render_template
         
         # Generate report text
-        report = f"Salary Report\n{'='*40}\n"
-        report += f"Worker: {worker}\n"
-        report += f"Period: {month}/{year}\n"
-        report += f"{'-'*40}\n"
-        report += f"Total Items Produced: {salary_data['total_quantity']}\n"
-        report += f"Hours Worked: {salary_data['hours_worked']:.2f}\n"
-        report += f"Hourly Rate: ${salary_data['hourly_rate']:.2f}\n"
-        report += f"{'-'*40}\n"
-        report += f"Total Salary: ${salary_data['salary']:.2f}\n"
-        report += f"{'='*40}"
+        report = render_template('salary_report.txt', worker=worker, **salary_data)
         
         self.report_text.delete(1.0, tk.END)
         self.report_text.insert(tk.END, report)
@@ -1659,12 +1984,13 @@ class FactoryManagementGUI:
             messagebox.showerror("Error", "No report to print!")
             return
         
-        # Save to temporary file
-        temp_file = os.path.join('invoice_template', 'salary_report.txt')
+        # Save to temporary file (not invoice_template/, where salary_report.txt is the template)
+        temp_file = os.path.join(tempfile.gettempdir(), 'salary_report.txt')
         with open(temp_file, 'w') as f:
             f.write(report_text)
         
         # Open in default text editor
+        import webbrowser
         webbrowser.open('file://' + os.path.abspath(temp_file))
     
     def clear_salary_form(self):
@@ -1673,6 +1999,489 @@ class FactoryManagementGUI:
         self.salary_year_var.set(datetime.now().year)
         self.report_text.delete(1.0, tk.END)
 
+    # ==================== PAYROLL RUN ====================
+    def show_payroll_run(self):
+        self.clear_frame()
+        
+        header = tk.Frame(self.root, bg=self.dark_color)
+        header.pack(fill='x')
+        tk.Label(header, text="Payroll Run", font=('Segoe UI', 18, 'bold'), 
+                fg='white', bg=self.dark_color).pack(pady=10)
+        
+        main_frame = tk.Frame(self.root, bg=self.light_color)
+        main_frame.pack(expand=True, fill='both', padx=20, pady=20)
+        
+        # Left Frame - Period
+        left_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        left_frame.pack(side='left', fill='y')
+        
+        tk.Label(left_frame, text="Monthly Payroll", font=('Segoe UI', 12, 'bold'), 
+                bg=self.light_color).pack(pady=5)
+        
+        form_frame = tk.Frame(left_frame, bg=self.light_color)
+        form_frame.pack(pady=10)
+        
+        # Month dropdown
+        tk.Label(form_frame, text="Month:", bg=self.light_color).grid(row=0, column=0, sticky='e', padx=5, pady=5)
+        self.payroll_month_var = tk.StringVar()
+        payroll_month_dropdown = ttk.Combobox(form_frame, textvariable=self.payroll_month_var, 
+                                            values=list(range(1, 13)), state='readonly', width=23)
+        payroll_month_dropdown.set(datetime.now().month)
+        payroll_month_dropdown.grid(row=0, column=1, padx=5, pady=5)
+        
+        # Year dropdown
+        tk.Label(form_frame, text="Year:", bg=self.light_color).grid(row=1, column=0, sticky='e', padx=5, pady=5)
+        self.payroll_year_var = tk.StringVar()
+        payroll_year_dropdown = ttk.Combobox(form_frame, textvariable=self.payroll_year_var, 
+                                           values=list(range(2020, datetime.now().year + 1)), 
+                                           state='readonly', width=23)
+        payroll_year_dropdown.set(datetime.now().year)
+        payroll_year_dropdown.grid(row=1, column=1, padx=5, pady=5)
+        
+        # Pay basis dropdown
+        tk.Label(form_frame, text="Pay:", bg=self.light_color).grid(row=2, column=0, sticky='e', padx=5, pady=5)
+        self.payroll_basis_var = tk.StringVar()
+        payroll_basis_dropdown = ttk.Combobox(form_frame, textvariable=self.payroll_basis_var, 
+                                            values=PAY_BASES, state='readonly', width=23)
+        payroll_basis_dropdown.set(PAY_BASES[0])
+        payroll_basis_dropdown.grid(row=2, column=1, padx=5, pady=5)
+        
+        button_frame = tk.Frame(left_frame, bg=self.light_color)
+        button_frame.pack(pady=10)
+        
+        ttk.Button(button_frame, text="Run Payroll", command=self.generate_payroll_run, 
+                 style='Success.TButton').grid(row=0, column=0, padx=5)
+        ttk.Button(button_frame, text="Export CSV", command=self.export_payroll_run, 
+                 style='Primary.TButton').grid(row=0, column=1, padx=5)
+        
+        self.payroll_total_label = tk.Label(left_frame, text="", font=('Segoe UI', 11, 'bold'), 
+                                          bg=self.light_color, justify='left')
+        self.payroll_total_label.pack(pady=10)
+        
+        # Right Frame - Payroll
+        right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        right_frame.pack(side='right', expand=True, fill='both')
+        
+        tk.Label(right_frame, text="Payroll", font=('Segoe UI', 12, 'bold'), 
+                bg=self.light_color).pack(pady=5)
+        
+        # Treeview; its columns are set for the pay basis by set_payroll_columns()
+        self.payroll_tree = ttk.Treeview(right_frame, show='headings', selectmode='browse')
+        self.set_payroll_columns(HOURLY_PAYROLL_HEADINGS)
+        
+        scrollbar = ttk.Scrollbar(right_frame, orient="vertical", command=self.payroll_tree.yview)
+        self.payroll_tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.payroll_tree.pack(side='left', expand=True, fill='both')
+        scrollbar.pack(side='right', fill='y')
+        
+        self.payroll_rows = []
+        
+        # Home button
+        home_btn = ttk.Button(main_frame, text="🏠 Home", command=self.create_main_menu,
+                            style='Dark.TButton')
+        home_btn.pack(side='bottom', pady=10)
+    
+    def set_payroll_columns(self, headings):
+        self.payroll_tree['columns'] = [name for name, width, anchor in headings]
+        for name, width, anchor in headings:
+            self.payroll_tree.heading(name, text=name)
+            self.payroll_tree.column(name, width=width, anchor=anchor)
+    
+    def generate_payroll_run(self):
+        try:
+            month = int(self.payroll_month_var.get())
+            year = int(self.payroll_year_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Please select month and year!")
+            return
+        basis = self.payroll_basis_var.get()
+        
+        def show_payroll(rows):
+            if self.payroll_tree.winfo_exists():
+                self.show_payroll_rows(month, year, basis, rows)
+        
+        if basis == 'Piece rate':
+            from payroll import run_piece_payroll
+            self.db.submit(run_piece_payroll, month, year, on_done=show_payroll)
+        else:
+            self.db.submit(run_payroll, month, year, on_done=show_payroll)
+    
+    def show_payroll_rows(self, month, year, basis, rows):
+        self.payroll_rows = rows
+        self.payroll_period = (month, year, basis)
+        
+        for item in self.payroll_tree.get_children():
+            self.payroll_tree.delete(item)
+        
+        if basis == 'Piece rate':
+            self.set_payroll_columns(PIECE_PAYROLL_HEADINGS)
+        else:
+            self.set_payroll_columns(HOURLY_PAYROLL_HEADINGS)
+        # Every column after worker id, name and items is an amount
+        for worker_id, name, quantity, *amounts in self.payroll_rows:
+            self.payroll_tree.insert('', 'end', values=(worker_id, name, quantity, 
+                                                        *(f"{amount:.2f}" for amount in amounts)))
+        
+        total_salary = sum(row[-1] for row in self.payroll_rows)
+        self.payroll_total_label.config(
+            text=f"Workers: {len(self.payroll_rows)}\nTotal Payroll: ${total_salary:.2f}")
+    
+    def export_payroll_run(self):
+        if not self.payroll_rows:
+            messagebox.showerror("Error", "Run the payroll first!")
+            return
+        
+        month, year, basis = self.payroll_period
+        if basis == 'Piece rate':
+            from payroll import export_piece_payroll as export
+            path = self.ask_export_path(f"piece_payroll_{year}_{month:02d}")
+        else:
+            export = export_payroll
+            path = self.ask_export_path(f"payroll_{year}_{month:02d}")
+        if not path:
+            return
+        
+        self.db.submit(export, month, year, path, 
+                       on_done=self.show_export_result, on_error=self.show_export_error)
+
+    # ==================== DASHBOARD ====================
+    def show_dashboard(self):
+        self.clear_frame()
+        
+        header = tk.Frame(self.root, bg=self.dark_color)
+        header.pack(fill='x')
+        tk.Label(header, text="Production Dashboard", font=('Segoe UI', 18, 'bold'), 
+                fg='white', bg=self.dark_color).pack(pady=10)
+        
+        main_frame = tk.Frame(self.root, bg=self.light_color)
+        main_frame.pack(expand=True, fill='both', padx=20, pady=20)
+        
+        # Top row - one card per figure
+        cards_frame = tk.Frame(main_frame, bg=self.light_color)
+        cards_frame.pack(fill='x')
+        
+        self.dashboard_cards = {}
+        cards = [
+            ('output_today', "Output Today"),
+            ('output_week', "Output, Last 7 Days"),
+            ('open_orders', "Open Orders"),
+            ('due_soon_orders', f"Due in {DUE_SOON_DAYS} Days"),
+            ('overdue_orders', "Overdue Orders"),
+            ('unpaid', "Unpaid Invoices"),
+        ]
+        for i, (key, caption) in enumerate(cards):
+            card = tk.Frame(cards_frame, bg='white', padx=15, pady=10)
+            card.grid(row=0, column=i, padx=5, sticky='nsew')
+            cards_frame.grid_columnconfigure(i, weight=1)
+            self.dashboard_cards[key] = tk.Label(card, text="…", font=('Segoe UI', 18, 'bold'), 
+                                                 bg='white', fg=self.dark_color)
+            self.dashboard_cards[key].pack()
+            tk.Label(card, text=caption, font=('Segoe UI', 9), bg='white').pack()
+        
+        # Left Frame - Daily output chart
+        left_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        left_frame.pack(side='left', fill='y')
+        
+        tk.Label(left_frame, text=f"Output per Day, Last {DASHBOARD_DAYS} Days", 
+                font=('Segoe UI', 12, 'bold'), bg=self.light_color).pack(pady=5)
+        self.dashboard_chart = tk.Canvas(left_frame, width=480, height=260, bg='white', highlightthickness=0)
+        self.dashboard_chart.pack()
+        
+        self.dashboard_updated = tk.Label(left_frame, text="", font=('Segoe UI', 9), bg=self.light_color)
+        self.dashboard_updated.pack(pady=5, anchor='w')
+        
+        # Right Frame - Orders coming due
+        right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        right_frame.pack(side='right', expand=True, fill='both')
+        
+        tk.Label(right_frame, text=f"Open Orders Due in the Next {DUE_SOON_DAYS} Days", 
+                font=('Segoe UI', 12, 'bold'), bg=self.light_color).pack(pady=5)
+        
+        columns = ("ID", "Client", "Design", "Quantity", "Order Date", "Deadline", "Status")
+        self.dashboard_tree = ttk.Treeview(right_frame, columns=columns, show='headings')
+        for column in columns:
+            self.dashboard_tree.heading(column, text=column)
+            self.dashboard_tree.column(column, width=90, anchor='center')
+        self.dashboard_tree.column("ID", width=50)
+        self.dashboard_tree.pack(expand=True, fill='both')
+        
+        # Home button
+        home_btn = ttk.Button(main_frame, text="🏠 Home", command=self.create_main_menu,
+                            style='Dark.TButton')
+        home_btn.pack(side='bottom', pady=10)
+        
+        self.refresh_dashboard()
+    
+    def refresh_dashboard(self):
+        """Recompute the figures off the UI thread, then again every DASHBOARD_REFRESH_MS"""
+        if self.dashboard_timer:
+            self.root.after_cancel(self.dashboard_timer)
+            self.dashboard_timer = None
+        chart = self.dashboard_chart
+        if not chart.winfo_exists():
+            # The screen was closed: stop refreshing
+            return
+        
+        def still_open():
+            # False too if the screen was closed and opened again meanwhile
+            return chart is self.dashboard_chart and chart.winfo_exists()
+        
+        def show(dashboard):
+            if not still_open():
+                return
+            self.show_dashboard_figures(dashboard)
+            self.dashboard_timer = self.root.after(DASHBOARD_REFRESH_MS, self.refresh_dashboard)
+        
+        def failed(error):
+            if still_open():
+                self.dashboard_updated.config(text=f"Refresh failed: {error}")
+                self.dashboard_timer = self.root.after(DASHBOARD_REFRESH_MS, self.refresh_dashboard)
+        
+        self.db.submit(get_dashboard, on_done=show, on_error=failed)
+    
+    def show_dashboard_figures(self, dashboard):
+        cards = self.dashboard_cards
+        cards['output_today'].config(text=f"{dashboard['output_today']:,}")
+        cards['output_week'].config(text=f"{dashboard['output_week']:,}")
+        cards['open_orders'].config(text=f"{dashboard['open_orders']:,}")
+        cards['due_soon_orders'].config(text=f"{dashboard['due_soon_orders']:,}")
+        cards['overdue_orders'].config(text=f"{dashboard['overdue_orders']:,}", 
+                                       fg=self.accent_color if dashboard['overdue_orders'] else self.dark_color)
+        cards['unpaid'].config(text=f"{dashboard['unpaid_invoices']:,} / ${dashboard['unpaid_total']:,.0f}")
+        
+        self.draw_output_chart(dashboard['daily_output'])
+        self.sync_tree(self.dashboard_tree, dashboard['due_orders'])
+        self.dashboard_updated.config(text=f"Updated {datetime.now().strftime('%H:%M:%S')}, "
+                                           f"refreshed every {DASHBOARD_REFRESH_MS // 1000} s")
+    
+    def draw_output_chart(self, daily_output):
+        chart = self.dashboard_chart
+        chart.delete('all')
+        width, height = int(chart['width']), int(chart['height'])
+        top, bottom = 20, height - 25
+        highest = max((quantity for day, quantity in daily_output), default=0) or 1
+        slot = width / len(daily_output)
+        
+        for i, (day, quantity) in enumerate(daily_output):
+            x0 = i * slot + slot * 0.15
+            x1 = (i + 1) * slot - slot * 0.15
+            y0 = bottom - (bottom - top) * quantity / highest
+            chart.create_rectangle(x0, y0, x1, bottom, fill=self.primary_color, width=0)
+            chart.create_text((x0 + x1) / 2, bottom + 12, text=day[8:], font=('Segoe UI', 8))
+            if quantity:
+                chart.create_text((x0 + x1) / 2, y0 - 8, text=f"{quantity:,}", font=('Segoe UI', 7))
+    
+    # ==================== SCHEDULE ====================
+    def show_schedule(self):
+        self.clear_frame()
+        
+        header = tk.Frame(self.root, bg=self.dark_color)
+        header.pack(fill='x')
+        tk.Label(header, text="Production Schedule", font=('Segoe UI', 18, 'bold'), 
+                fg='white', bg=self.dark_color).pack(pady=10)
+        
+        main_frame = tk.Frame(self.root, bg=self.light_color)
+        main_frame.pack(expand=True, fill='both', padx=20, pady=20)
+        
+        # Left Frame - Summary
+        left_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        left_frame.pack(side='left', fill='y')
+        
+        tk.Label(left_frame, text="Open Orders", font=('Segoe UI', 12, 'bold'), 
+                bg=self.light_color).pack(pady=5)
+        
+        self.schedule_late_var = tk.BooleanVar()
+        ttk.Checkbutton(left_frame, text="Late orders only", variable=self.schedule_late_var, 
+                       command=self.load_schedule).pack(pady=5)
+        
+        button_frame = tk.Frame(left_frame, bg=self.light_color)
+        button_frame.pack(pady=10)
+        
+        ttk.Button(button_frame, text="Replan", command=self.replan_schedule, 
+                 style='Primary.TButton').grid(row=0, column=0, padx=5)
+        
+        self.schedule_summary_label = tk.Label(left_frame, text="Planning...", font=('Segoe UI', 11, 'bold'), 
+                                             bg=self.light_color, justify='left')
+        self.schedule_summary_label.pack(pady=10)
+        
+        # Right Frame - Plan
+        right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        right_frame.pack(side='right', expand=True, fill='both')
+        
+        tk.Label(right_frame, text=f"Most Urgent First (up to {SCHEDULE_LIMIT})", font=('Segoe UI', 12, 'bold'), 
+                bg=self.light_color).pack(pady=5)
+        
+        # Treeview
+        self.schedule_tree = ttk.Treeview(right_frame, columns=("Order", "Design", "Left", "Worker", "Start", 
+                                                               "Finish", "Deadline"), 
+                                        show='headings', selectmode='browse')
+        
+        for column, width, anchor in (("Order", 60, 'center'), ("Design", 150, 'w'), ("Left", 60, 'center'), 
+                                      ("Worker", 150, 'w'), ("Start", 90, 'center'), ("Finish", 90, 'center'), 
+                                      ("Deadline", 90, 'center')):
+            self.schedule_tree.heading(column, text=column)
+            self.schedule_tree.column(column, width=width, anchor=anchor)
+        self.schedule_tree.tag_configure('late', foreground=self.accent_color)
+        
+        scrollbar = ttk.Scrollbar(right_frame, orient="vertical", command=self.schedule_tree.yview)
+        self.schedule_tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.schedule_tree.pack(side='left', expand=True, fill='both')
+        scrollbar.pack(side='right', fill='y')
+        
+        # Home button
+        home_btn = ttk.Button(main_frame, text="🏠 Home", command=self.create_main_menu,
+                            style='Dark.TButton')
+        home_btn.pack(side='bottom', pady=10)
+        
+        self.load_schedule()
+    
+    def load_schedule(self):
+        """Read the plan off the UI thread; the first time this also builds it"""
+        late_only = self.schedule_late_var.get()
+        
+        def read_schedule():
+            return production_schedule.summary(), production_schedule.rows(late_only, SCHEDULE_LIMIT)
+        
+        def show(result):
+            if self.schedule_tree.winfo_exists():
+                self.show_schedule_rows(*result)
+        
+        self.db.submit(read_schedule, on_done=show)
+    
+    def replan_schedule(self):
+        self.schedule_summary_label.config(text="Planning...")
+        self.db.submit(production_schedule.replan, on_done=lambda result: self.load_schedule())
+    
+    def show_schedule_rows(self, summary, rows):
+        for item in self.schedule_tree.get_children():
+            self.schedule_tree.delete(item)
+        
+        for order_id, design_id, remaining, worker_id, start, finish, deadline, late in rows:
+            design = design_lookup.get(design_id)
+            worker = worker_lookup.get(worker_id)
+            self.schedule_tree.insert('', 'end', values=(order_id, design[1] if design else design_id, remaining, 
+                                                         worker[1] if worker else worker_id, start, finish, 
+                                                         deadline), 
+                                      tags=('late',) if late else ())
+        
+        text = (f"To make: {summary['scheduled']}\nLate: {summary['late']}\n"
+                f"Already made: {summary['made']}")
+        if summary['unscheduled']:
+            text += f"\nNobody to make: {summary['unscheduled']}"
+        self.schedule_summary_label.config(text=text)
+
+    # ==================== DIAGNOSTICS ====================
+    def show_diagnostics(self):
+        self.clear_frame()
+        
+        header = tk.Frame(self.root, bg=self.dark_color)
+        header.pack(fill='x')
+        tk.Label(header, text="Query Diagnostics", font=('Segoe UI', 18, 'bold'), 
+                fg='white', bg=self.dark_color).pack(pady=10)
+        
+        main_frame = tk.Frame(self.root, bg=self.light_color)
+        main_frame.pack(expand=True, fill='both', padx=20, pady=20)
+        
+        # Left Frame - Summary and details of the selected statement
+        left_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        left_frame.pack(side='left', fill='y')
+        
+        self.diagnostics_summary = tk.Label(left_frame, text="", font=('Segoe UI', 11, 'bold'), 
+                                           bg=self.light_color, justify='left')
+        self.diagnostics_summary.pack(pady=5, anchor='w')
+        
+        button_frame = tk.Frame(left_frame, bg=self.light_color)
+        button_frame.pack(pady=10)
+        
+        ttk.Button(button_frame, text="Refresh", command=self.load_diagnostics, 
+                 style='Primary.TButton').grid(row=0, column=0, padx=5)
+        ttk.Button(button_frame, text="Reset", command=self.reset_diagnostics, 
+                 style='Warning.TButton').grid(row=0, column=1, padx=5)
+        ttk.Button(button_frame, text="Slow Query Log", command=self.open_slow_query_log, 
+                 style='Primary.TButton').grid(row=0, column=2, padx=5)
+        
+        self.diagnostics_text = tk.Text(left_frame, width=60, height=25, font=('Consolas', 9), wrap='word')
+        self.diagnostics_text.pack(fill='y', expand=True)
+        
+        # Right Frame - Top statements
+        right_frame = tk.Frame(main_frame, bg=self.light_color, padx=10, pady=10)
+        right_frame.pack(side='right', expand=True, fill='both')
+        
+        tk.Label(right_frame, text="Top Statements by Total Time", font=('Segoe UI', 12, 'bold'), 
+                bg=self.light_color).pack(pady=5)
+        
+        # Treeview
+        columns = ("Statement", "Calls", "Total ms", "Avg ms", "p95 ms", "Max ms", "Rows", "Slow")
+        self.diagnostics_tree = ttk.Treeview(right_frame, columns=columns, show='headings', selectmode='browse')
+        
+        for column in columns:
+            self.diagnostics_tree.heading(column, text=column)
+            self.diagnostics_tree.column(column, width=70, anchor='e')
+        self.diagnostics_tree.column("Statement", width=320, anchor='w')
+        
+        scrollbar = ttk.Scrollbar(right_frame, orient="vertical", command=self.diagnostics_tree.yview)
+        self.diagnostics_tree.configure(yscrollcommand=scrollbar.set)
+        
+        self.diagnostics_tree.pack(side='left', expand=True, fill='both')
+        scrollbar.pack(side='right', fill='y')
+        
+        # Bind selection event
+        self.diagnostics_tree.bind('<<TreeviewSelect>>', self.on_diagnostics_select)
+        
+        self.load_diagnostics()
+        
+        # Home button
+        home_btn = ttk.Button(main_frame, text="🏠 Home", command=self.create_main_menu,
+                            style='Dark.TButton')
+        home_btn.pack(side='bottom', pady=10)
+    
+    def load_diagnostics(self):
+        self.diagnostics_rows = querylog.snapshot(limit=100)
+        self.diagnostics_tree.delete(*self.diagnostics_tree.get_children())
+        for i, row in enumerate(self.diagnostics_rows):
+            self.diagnostics_tree.insert('', 'end', iid=i, values=(
+                row['sql'][:120], row['calls'], f"{row['total_ms']:.1f}", f"{row['avg_ms']:.2f}", 
+                f"{row['p95_ms']:.2f}", f"{row['max_ms']:.1f}", row['rows'], row['slow_calls']))
+        
+        total_ms = sum(row['total_ms'] for row in self.diagnostics_rows)
+        slow = sum(row['slow_calls'] for row in self.diagnostics_rows)
+        self.diagnostics_summary.config(
+            text=f"Statements: {len(self.diagnostics_rows)}\nTotal time: {total_ms / 1000:.2f}s\n"
+                 f"Slow (>= {querylog.SLOW_QUERY_MS} ms): {slow}")
+        self.diagnostics_text.delete(1.0, tk.END)
+    
+    def on_diagnostics_select(self, event):
+        selected = self.diagnostics_tree.selection()
+        if not selected:
+            return
+        
+        row = self.diagnostics_rows[int(selected[0])]
+        lines = [row['sql'], '', "Call sites:"]
+        lines += [f"  {count:>6}  {site}" for site, count in row['sites'][:10]]
+        lines += ['', "Latency histogram (ms):"]
+        lines += [f"  <= {bound:>7}  {count}" for bound, count in row['histogram'] if count]
+        if row['last_plan']:
+            lines += ['', "Query plan (last slow call):"]
+            lines += [f"  {step}" for step in row['last_plan']]
+        if row['errors']:
+            lines += ['', f"Errors: {row['errors']}"]
+        
+        self.diagnostics_text.delete(1.0, tk.END)
+        self.diagnostics_text.insert(tk.END, "\n".join(lines))
+    
+    def reset_diagnostics(self):
+        querylog.reset()
+        self.load_diagnostics()
+    
+    def open_slow_query_log(self):
+        if not os.path.exists(querylog.SLOW_LOG_PATH):
+            messagebox.showinfo("Diagnostics", "No slow queries logged yet.")
+            return
+        import webbrowser
+        webbrowser.open('file://' + os.path.abspath(querylog.SLOW_LOG_PATH))
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = FactoryManagementGUI(root)
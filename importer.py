@@ -0,0 +1,232 @@
+"""Streaming CSV import for production records, orders and clients.
+
+Rows flow through a generator pipeline (read -> validate/resolve -> chunk)
+and are written with executemany, one transaction per chunk, so memory use
+does not depend on the file size. Workers, designs and clients may be given
+by id or by name; names are resolved through in-memory maps built once per
+import. Rows that fail validation are skipped and reported with their line
+number.
+
+Command line, from the project root:
+    python importer.py production shift_2025_06_01.csv
+"""
+import argparse
+import csv
+import time
+from datetime import datetime
+from itertools import islice
+from operator import itemgetter
+
+import database
+from connection import transaction
+from database import bulk_production_load, initialize_database
+from lookups import client_lookup, design_lookup, worker_lookup
+
+CHUNK_SIZE = 50000
+
+# Imported orders may already have been invoiced in another system
+ORDER_STATUSES = database.ORDER_STATUSES + ('Invoiced',)
+
+
+def _read_csv(f, columns, required):
+    """Yield (line_number, values) with values in `columns` order"""
+    reader = csv.reader(f)
+    header = [name.strip().lower() for name in next(reader, [])]
+    missing = [name for name in required if name not in header]
+    if missing:
+        raise ValueError(f"CSV is missing required column(s): {', '.join(missing)}")
+
+    positions = [header.index(name) if name in header else None for name in columns]
+    if None in positions:
+        # Optional columns absent from the file come through as ''
+        def pick(row):
+            return tuple(row[i] if i is not None else '' for i in positions)
+    else:
+        pick = itemgetter(*positions)
+
+    for row in reader:
+        if not row:
+            continue
+        try:
+            values = pick(row)
+        except IndexError:
+            # Short row: pad it rather than stop the import
+            values = tuple(row[i] if i is not None and i < len(row) else '' for i in positions)
+        # reader.line_num is the physical line, which is what a user will look for
+        yield reader.line_num, values
+
+
+def _reference_map(lookup):
+    # Built once per import so each row costs a dictionary lookup, not a
+    # query. Keys are names and ids as text; a name wins if both match.
+    keys = {}
+    for row in lookup.rows():
+        keys[str(row[0])] = row[0]
+    for row in reversed(lookup.rows()):
+        # Names are not unique; the first in name order wins
+        keys[row[1]] = row[0]
+    return keys
+
+
+def _resolve(keys, value, kind):
+    # Slow path for values that missed the map, e.g. stray whitespace
+    row_id = keys.get(value.strip())
+    if row_id is None:
+        raise ValueError(f"unknown {kind} '{value}'")
+    return row_id
+
+
+def _date_checker():
+    seen = set()
+
+    def check(value, field):
+        # Only a handful of distinct dates appear in a file; parse each once
+        if value not in seen:
+            try:
+                datetime.strptime(value, '%Y-%m-%d')
+            except ValueError:
+                raise ValueError(f"invalid {field} '{value}' (use YYYY-MM-DD)")
+            seen.add(value)
+        return value
+    return check
+
+
+def _positive_int(value, field):
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"invalid {field} '{value}'")
+    if number <= 0:
+        raise ValueError(f"{field} must be positive")
+    return number
+
+
+def _production_rows(rows, rejected):
+    workers = _reference_map(worker_lookup)
+    designs = _reference_map(design_lookup)
+    check_date = _date_checker()
+    # The hot loop of the importer: plain dict lookups, no per-row queries
+    for line, (worker, design, quantity, date) in rows:
+        try:
+            worker_id = workers.get(worker) or _resolve(workers, worker, 'worker')
+            design_id = designs.get(design) or _resolve(designs, design, 'design')
+            yield (worker_id, design_id, _positive_int(quantity, 'quantity'), check_date(date.strip(), 'date'))
+        except ValueError as e:
+            rejected.append((line, str(e)))
+
+
+def _order_rows(rows, rejected):
+    clients = _reference_map(client_lookup)
+    designs = _reference_map(design_lookup)
+    check_date = _date_checker()
+    for line, (client, design, quantity, order_date, deadline, status) in rows:
+        try:
+            client_id = clients.get(client) or _resolve(clients, client, 'client')
+            design_id = designs.get(design) or _resolve(designs, design, 'design')
+            status = status.strip() or 'Pending'
+            if status not in ORDER_STATUSES:
+                raise ValueError(f"invalid status '{status}'")
+            yield (client_id, design_id, _positive_int(quantity, 'quantity'),
+                   check_date(order_date.strip(), 'order_date'), check_date(deadline.strip(), 'deadline'), status)
+        except ValueError as e:
+            rejected.append((line, str(e)))
+
+
+def _client_rows(rows, rejected):
+    for line, values in rows:
+        values = tuple(value.strip() for value in values)
+        if not values[0]:
+            rejected.append((line, "name is required"))
+            continue
+        yield values
+
+
+# kind -> (CSV columns, required columns, row pipeline, INSERT statement,
+#          chunk sort key, transaction for each chunk, cache to invalidate)
+IMPORTS = {
+    'production': (
+        ('worker', 'design', 'quantity', 'date'),
+        ('worker', 'design', 'quantity', 'date'),
+        _production_rows,
+        "INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+        # Inserting in worker_id order touches idx_worker_production_worker_date
+        # in runs instead of at random, which is most of the write cost. A
+        # single int key sorts several times faster than (worker_id, date).
+        itemgetter(0),
+        bulk_production_load,
+        None,
+    ),
+    'orders': (
+        ('client', 'design', 'quantity', 'order_date', 'deadline', 'status'),
+        ('client', 'design', 'quantity', 'order_date', 'deadline'),
+        _order_rows,
+        "INSERT INTO orders (client_id, design_id, quantity, order_date, deadline, status) VALUES (?, ?, ?, ?, ?, ?)",
+        None,
+        transaction,
+        None,
+    ),
+    'clients': (
+        ('name', 'company', 'contact', 'email', 'address'),
+        ('name',),
+        _client_rows,
+        "INSERT INTO clients (name, company, contact, email, address) VALUES (?, ?, ?, ?, ?)",
+        None,
+        transaction,
+        client_lookup,
+    ),
+}
+
+
+def import_csv(kind, path, chunk_size=CHUNK_SIZE):
+    """Import a CSV file of `kind` ('production', 'orders' or 'clients').
+
+    Each chunk is committed on its own, so a failure part-way keeps the
+    chunks already written. Returns a summary with the rejected rows.
+    """
+    columns, required, pipeline, insert_sql, sort_key, chunk_transaction, cache = IMPORTS[kind]
+    started = time.perf_counter()
+    rejected = []
+    imported = 0
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = pipeline(_read_csv(f, columns, required), rejected)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            if sort_key is not None:
+                chunk.sort(key=sort_key)
+            with chunk_transaction() as conn:
+                conn.executemany(insert_sql, chunk)
+            imported += len(chunk)
+
+    if cache is not None and imported:
+        cache.invalidate()
+
+    elapsed = time.perf_counter() - started
+    return {
+        'imported': imported,
+        'rejected': rejected,
+        'seconds': elapsed,
+        'per_second': imported / elapsed if elapsed else 0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import records from a CSV file")
+    parser.add_argument('kind', choices=sorted(IMPORTS))
+    parser.add_argument('path')
+    args = parser.parse_args()
+
+    initialize_database()
+    result = import_csv(args.kind, args.path)
+    print(f"imported {result['imported']} rows in {result['seconds']:.2f}s "
+          f"({result['per_second']:,.0f} rows/s), rejected {len(result['rejected'])}")
+    for line, reason in result['rejected'][:50]:
+        print(f"  line {line}: {reason}")
+    if len(result['rejected']) > 50:
+        print(f"  ... and {len(result['rejected']) - 50} more")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Render invoices to PDF, one at a time or a whole period in parallel.
+
+Command line, from the project root:
+    python invoice_pdf.py --month 6 --year 2025 --out invoices_pdf
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from templates import TEMPLATE_DIR, render_template
+
+TEMPLATE_NAME = 'template.html'
+OUTPUT_DIR = 'invoices'
+
+
+def render_invoice_html(invoice_data):
+    return render_template(TEMPLATE_NAME, **invoice_data)
+
+
+def html_to_pdf(html_content):
+    """Convert HTML to PDF bytes; returns (pdf_bytes, page_count)"""
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError) as e:
+        # OSError: the Python package is installed but Pango/Cairo are missing
+        raise RuntimeError(f"PDF export needs WeasyPrint and its system libraries: {e}")
+
+    # base_url lets the template reference images relative to its folder
+    document = HTML(string=html_content, base_url=os.path.abspath(TEMPLATE_DIR)).render()
+    return document.write_pdf(), len(document.pages)
+
+
+def write_atomic(path, data):
+    """Write bytes so readers never see a half-written file"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.pdf')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def invoice_filename(invoice_data):
+    return f"invoice_{invoice_data['invoice_id']}.pdf"
+
+
+def export_invoice_pdf(invoice_data, out_dir=OUTPUT_DIR):
+    """Render one invoice to out_dir; returns (path, page_count)"""
+    os.makedirs(out_dir, exist_ok=True)
+    pdf, pages = html_to_pdf(render_invoice_html(invoice_data))
+    path = os.path.join(out_dir, invoice_filename(invoice_data))
+    write_atomic(path, pdf)
+    return path, pages
+
+
+def _export_job(job):
+    # Module-level so it can be pickled into pool workers
+    invoice_data, out_dir = job
+    return export_invoice_pdf(invoice_data, out_dir)
+
+
+def export_invoices_pdf(invoices, out_dir=OUTPUT_DIR, workers=None):
+    """Render many invoices across a process pool (HTML to PDF is CPU-bound)"""
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+    files = []
+    pages = 0
+
+    jobs = [(invoice_data, out_dir) for invoice_data in invoices]
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, len(jobs) // ((workers or os.cpu_count() or 1) * 4))
+            for path, page_count in pool.map(_export_job, jobs, chunksize=chunksize):
+                files.append(path)
+                pages += page_count
+
+    elapsed = time.perf_counter() - started
+    return {
+        'count': len(files),
+        'pages': pages,
+        'files': files,
+        'seconds': elapsed,
+        'pages_per_second': pages / elapsed if elapsed else 0
+    }
+
+
+def main():
+    from database import get_invoice_details_between, initialize_database, month_range
+
+    parser = argparse.ArgumentParser(description="Export a month of invoices to PDF")
+    parser.add_argument('--month', type=int, required=True)
+    parser.add_argument('--year', type=int, required=True)
+    parser.add_argument('--out', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    initialize_database()
+    invoices = get_invoice_details_between(*month_range(args.month, args.year))
+    result = export_invoices_pdf(invoices, args.out, args.workers)
+    print(f"{result['count']} invoices, {result['pages']} pages in {result['seconds']:.2f}s "
+          f"({result['pages_per_second']:.1f} pages/s) -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
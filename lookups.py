@@ -0,0 +1,49 @@
+import threading
+
+from database import get_all_clients, get_all_designs, get_all_workers
+
+
+class ReferenceCache:
+    """Rows of a small reference table, indexed by id.
+
+    Loaded on first use and kept until invalidate() is called, which every
+    write to the underlying table must do. Safe to read from the GUI thread
+    and from background database jobs.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.data = None
+
+    def _load(self):
+        with self.lock:
+            if self.data is None:
+                rows = self.loader()
+                by_id = {row[0]: row for row in rows}
+                options = [self.label(row) for row in rows]
+                self.data = (rows, by_id, options)
+            return self.data
+
+    def rows(self):
+        """All rows, ordered by name"""
+        return self._load()[0]
+
+    def get(self, row_id):
+        return self._load()[1].get(row_id)
+
+    def options(self):
+        """'id - name' labels for dropdowns"""
+        return self._load()[2]
+
+    def label(self, row):
+        return f"{row[0]} - {row[1]}"
+
+    def invalidate(self):
+        with self.lock:
+            self.data = None
+
+
+worker_lookup = ReferenceCache(get_all_workers)
+design_lookup = ReferenceCache(get_all_designs)
+client_lookup = ReferenceCache(get_all_clients)
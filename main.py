@@ -1,12 +1,8 @@
 import tkinter as tk
-from database import initialize_database
 from gui import FactoryManagementGUI
 
 def main():
-    # Initialize database
-    initialize_database()
-    
-    # Create main window
+    # Create main window; the database is checked behind its welcome screen
     root = tk.Tk()
     app = FactoryManagementGUI(root)
     
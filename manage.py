@@ -0,0 +1,82 @@
+"""Database maintenance commands.
+
+Run from the project root:
+    python manage.py rebuild-rollup     recompute production_daily from worker_production
+    python manage.py check-rollup       list production_daily rows that disagree with the raw rows
+    python manage.py archive            move production and paid invoices older than --months
+                                        (default 12) to the yearly archive files; --vacuum
+                                        then shrinks the main database file
+    python manage.py archive-status     list the archive files
+"""
+import argparse
+import os
+import time
+
+import connection
+from archive import ARCHIVE_MONTHS, archive_before, archive_status, cutoff_for
+from database import check_production_daily, get_db_connection, initialize_database, rebuild_production_daily
+
+
+def rebuild_rollup(args):
+    started = time.perf_counter()
+    count = rebuild_production_daily()
+    print(f"production_daily rebuilt: {count} rows in {time.perf_counter() - started:.2f}s")
+
+
+def check_rollup(args):
+    mismatches = check_production_daily()
+    if not mismatches:
+        print("production_daily matches worker_production")
+        return 0
+    print(f"{len(mismatches)} production_daily rows disagree with worker_production:")
+    for date, worker_id, design_id, rollup, raw in mismatches[:50]:
+        print(f"  {date} worker {worker_id} design {design_id}: rollup {rollup}, raw {raw}")
+    print("run 'python manage.py rebuild-rollup' to fix")
+    return 1
+
+
+def archive(args):
+    cutoff = cutoff_for(args.months)
+    size = os.path.getsize(connection.DB_PATH)
+    started = time.perf_counter()
+    moved = archive_before(cutoff)
+    for year, (production, invoices) in moved.items():
+        print(f"  {year}: {production} production records, {invoices} paid invoices")
+    print(f"archived everything before {cutoff} in {time.perf_counter() - started:.2f}s")
+    if args.vacuum and moved:
+        conn = get_db_connection()
+        conn.execute("VACUUM")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        print(f"{connection.DB_PATH}: {size / 2**20:.1f} MB -> {os.path.getsize(connection.DB_PATH) / 2**20:.1f} MB")
+
+
+def show_archives(args):
+    status = archive_status()
+    if not status:
+        print("nothing has been archived")
+    for year, archived_before, path, size in status:
+        print(f"  {year}: up to {archived_before}, {size / 2**20:.1f} MB  {path}")
+
+
+COMMANDS = {
+    'rebuild-rollup': rebuild_rollup,
+    'check-rollup': check_rollup,
+    'archive': archive,
+    'archive-status': show_archives,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database maintenance commands")
+    parser.add_argument('command', choices=COMMANDS)
+    parser.add_argument('--months', type=int, default=ARCHIVE_MONTHS,
+                        help="archive: months of history to keep in the main database")
+    parser.add_argument('--vacuum', action='store_true', help="archive: VACUUM the main database afterwards")
+    args = parser.parse_args()
+
+    initialize_database()
+    return COMMANDS[args.command](args)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
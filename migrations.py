@@ -0,0 +1,289 @@
+from connection import get_connection, transaction
+
+# Fills production_daily from the raw rows; also used to rebuild it
+PRODUCTION_DAILY_BACKFILL = '''
+INSERT INTO production_daily (date, worker_id, design_id, quantity, records)
+SELECT date, worker_id, design_id, SUM(COALESCE(quantity, 0)), COUNT(*)
+FROM worker_production
+WHERE date IS NOT NULL AND worker_id IS NOT NULL AND design_id IS NOT NULL
+GROUP BY date, worker_id, design_id
+'''
+
+# Triggers that keep production_daily exact; bulk loads drop and recreate
+# them inside their transaction (see database.bulk_production_load)
+PRODUCTION_DAILY_TRIGGERS = {
+    'trg_worker_production_insert': '''
+CREATE TRIGGER IF NOT EXISTS trg_worker_production_insert
+AFTER INSERT ON worker_production
+WHEN NEW.date IS NOT NULL AND NEW.worker_id IS NOT NULL AND NEW.design_id IS NOT NULL
+BEGIN
+    INSERT INTO production_daily (date, worker_id, design_id, quantity, records)
+    VALUES (NEW.date, NEW.worker_id, NEW.design_id, COALESCE(NEW.quantity, 0), 1)
+    ON CONFLICT (date, worker_id, design_id) DO UPDATE
+    SET quantity = quantity + excluded.quantity, records = records + 1;
+END
+''',
+    'trg_worker_production_delete': '''
+CREATE TRIGGER IF NOT EXISTS trg_worker_production_delete
+AFTER DELETE ON worker_production
+WHEN OLD.date IS NOT NULL AND OLD.worker_id IS NOT NULL AND OLD.design_id IS NOT NULL
+BEGIN
+    UPDATE production_daily
+    SET quantity = quantity - COALESCE(OLD.quantity, 0), records = records - 1
+    WHERE date = OLD.date AND worker_id = OLD.worker_id AND design_id = OLD.design_id;
+    DELETE FROM production_daily
+    WHERE date = OLD.date AND worker_id = OLD.worker_id AND design_id = OLD.design_id AND records <= 0;
+END
+''',
+    # An update is the delete of the old row plus the insert of the new one
+    'trg_worker_production_update': '''
+CREATE TRIGGER IF NOT EXISTS trg_worker_production_update
+AFTER UPDATE OF date, worker_id, design_id, quantity ON worker_production
+BEGIN
+    UPDATE production_daily
+    SET quantity = quantity - COALESCE(OLD.quantity, 0), records = records - 1
+    WHERE date = OLD.date AND worker_id = OLD.worker_id AND design_id = OLD.design_id;
+    DELETE FROM production_daily
+    WHERE date = OLD.date AND worker_id = OLD.worker_id AND design_id = OLD.design_id AND records <= 0;
+    INSERT INTO production_daily (date, worker_id, design_id, quantity, records)
+    SELECT NEW.date, NEW.worker_id, NEW.design_id, COALESCE(NEW.quantity, 0), 1
+    WHERE NEW.date IS NOT NULL AND NEW.worker_id IS NOT NULL AND NEW.design_id IS NOT NULL
+    ON CONFLICT (date, worker_id, design_id) DO UPDATE
+    SET quantity = quantity + excluded.quantity, records = records + 1;
+END
+''',
+}
+
+# Each migration is (version, description, statements). Versions are stored in
+# PRAGMA user_version, so an up-to-date database costs a single pragma read on
+# startup. Append new migrations to the end; never edit one that has shipped.
+MIGRATIONS = [
+    (1, "initial schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS workers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            contact TEXT,
+            joining_date TEXT,
+            hourly_rate REAL DEFAULT 0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS designs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            base_price REAL DEFAULT 0,
+            complexity_level INTEGER DEFAULT 1
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS worker_production (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            worker_id INTEGER,
+            design_id INTEGER,
+            quantity INTEGER,
+            date TEXT,
+            FOREIGN KEY(worker_id) REFERENCES workers(id),
+            FOREIGN KEY(design_id) REFERENCES designs(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            company TEXT,
+            contact TEXT,
+            email TEXT,
+            address TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            client_id INTEGER,
+            design_id INTEGER,
+            quantity INTEGER,
+            order_date TEXT,
+            deadline TEXT,
+            status TEXT DEFAULT 'Pending',
+            FOREIGN KEY(client_id) REFERENCES clients(id),
+            FOREIGN KEY(design_id) REFERENCES designs(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS invoices (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER,
+            invoice_date TEXT,
+            amount REAL,
+            tax REAL DEFAULT 0,
+            discount REAL DEFAULT 0,
+            total_amount REAL,
+            status TEXT DEFAULT 'Unpaid',
+            FOREIGN KEY(order_id) REFERENCES orders(id)
+        )
+        ''',
+    ]),
+    (2, "production indexes", [
+        "CREATE INDEX IF NOT EXISTS idx_worker_production_worker_date ON worker_production(worker_id, date)",
+        "CREATE INDEX IF NOT EXISTS idx_worker_production_date ON worker_production(date)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)",
+        "CREATE INDEX IF NOT EXISTS idx_orders_client_id ON orders(client_id)",
+        "CREATE INDEX IF NOT EXISTS idx_invoices_order_id ON invoices(order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_invoices_invoice_date ON invoices(invoice_date)",
+        "ANALYZE",
+    ]),
+    (3, "daily production rollup", [
+        # One row per (date, worker, design) holding the summed quantity and
+        # the number of raw records behind it, kept exact by PRODUCTION_DAILY_TRIGGERS
+        '''
+        CREATE TABLE IF NOT EXISTS production_daily (
+            date TEXT NOT NULL,
+            worker_id INTEGER NOT NULL,
+            design_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            records INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (date, worker_id, design_id)
+        ) WITHOUT ROWID
+        ''',
+        # quantity is included so salary sums are answered from the index alone
+        "CREATE INDEX IF NOT EXISTS idx_production_daily_worker_date ON production_daily(worker_id, date, quantity)",
+        PRODUCTION_DAILY_BACKFILL,
+        *PRODUCTION_DAILY_TRIGGERS.values(),
+        "ANALYZE production_daily",
+    ]),
+    (4, "full-text search", [
+        # External-content FTS5 indexes: the text lives only in clients and
+        # designs, the triggers below keep the indexes in step with them
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+            name, company, contact, email, address,
+            content='clients', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS designs_fts USING fts5(
+            name, description,
+            content='designs', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+        ''',
+        "INSERT INTO clients_fts(clients_fts) VALUES ('rebuild')",
+        "INSERT INTO designs_fts(designs_fts) VALUES ('rebuild')",
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_clients_fts_insert AFTER INSERT ON clients BEGIN
+            INSERT INTO clients_fts (rowid, name, company, contact, email, address)
+            VALUES (NEW.id, NEW.name, NEW.company, NEW.contact, NEW.email, NEW.address);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_clients_fts_delete AFTER DELETE ON clients BEGIN
+            INSERT INTO clients_fts (clients_fts, rowid, name, company, contact, email, address)
+            VALUES ('delete', OLD.id, OLD.name, OLD.company, OLD.contact, OLD.email, OLD.address);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_clients_fts_update AFTER UPDATE ON clients BEGIN
+            INSERT INTO clients_fts (clients_fts, rowid, name, company, contact, email, address)
+            VALUES ('delete', OLD.id, OLD.name, OLD.company, OLD.contact, OLD.email, OLD.address);
+            INSERT INTO clients_fts (rowid, name, company, contact, email, address)
+            VALUES (NEW.id, NEW.name, NEW.company, NEW.contact, NEW.email, NEW.address);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_designs_fts_insert AFTER INSERT ON designs BEGIN
+            INSERT INTO designs_fts (rowid, name, description) VALUES (NEW.id, NEW.name, NEW.description);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_designs_fts_delete AFTER DELETE ON designs BEGIN
+            INSERT INTO designs_fts (designs_fts, rowid, name, description)
+            VALUES ('delete', OLD.id, OLD.name, OLD.description);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS trg_designs_fts_update AFTER UPDATE ON designs BEGIN
+            INSERT INTO designs_fts (designs_fts, rowid, name, description)
+            VALUES ('delete', OLD.id, OLD.name, OLD.description);
+            INSERT INTO designs_fts (rowid, name, description) VALUES (NEW.id, NEW.name, NEW.description);
+        END
+        ''',
+        # Order search looks orders up by the matching clients and designs
+        "CREATE INDEX IF NOT EXISTS idx_orders_design_id ON orders(design_id)",
+        "ANALYZE orders",
+    ]),
+    (5, "row versions", [
+        # Bumped by every update, which only applies if the version is still
+        # the one the writer read (see database.update_order)
+        "ALTER TABLE orders ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+        "ALTER TABLE invoices ADD COLUMN version INTEGER NOT NULL DEFAULT 1",
+    ]),
+    (6, "dashboard indexes", [
+        # Only orders still to be made, by deadline; the condition must match
+        # database.OPEN_ORDER_STATUSES for the dashboard queries to use it, and
+        # status is included so their counts are answered from the index alone
+        "CREATE INDEX IF NOT EXISTS idx_orders_open_deadline ON orders(deadline, status) "
+        "WHERE status IN ('Pending', 'In Progress')",
+        # Unpaid totals are summed from the index alone
+        "CREATE INDEX IF NOT EXISTS idx_invoices_status_total ON invoices(status, total_amount)",
+        "ANALYZE orders",
+        "ANALYZE invoices",
+    ]),
+    (7, "scheduler index", [
+        # A design's output since a date, summed from the index alone (the
+        # scheduler credits it to the design's open orders)
+        "CREATE INDEX IF NOT EXISTS idx_production_daily_design_date ON production_daily(design_id, date, quantity)",
+        "ANALYZE production_daily",
+    ]),
+    (8, "hot/cold archive", [
+        # Per year, the date up to which its rows have been moved to the
+        # year's archive file (see archive.py)
+        '''
+        CREATE TABLE IF NOT EXISTS archives (
+            year INTEGER PRIMARY KEY,
+            archived_before TEXT NOT NULL
+        )
+        ''',
+        # Ids of the invoices moved to the archive files; the foreign key
+        # still stops their orders being deleted
+        '''
+        CREATE TABLE IF NOT EXISTS archived_invoices (
+            id INTEGER PRIMARY KEY,
+            order_id INTEGER,
+            invoice_date TEXT,
+            FOREIGN KEY(order_id) REFERENCES orders(id)
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_archived_invoices_order_id ON archived_invoices(order_id)",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn=None):
+    conn = conn or get_connection()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def run_migrations():
+    """Bring the database up to LATEST_VERSION; returns the versions applied"""
+    if get_schema_version() >= LATEST_VERSION:
+        return []
+
+    applied = []
+    with transaction() as conn:
+        # Re-read inside the write transaction in case another process
+        # migrated the file in the meantime
+        current = get_schema_version(conn)
+        for version, description, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version}")
+            applied.append(version)
+    return applied
@@ -1,7 +1,20 @@
 from datetime import datetime
 
+# Record types use __slots__ so each instance is a fixed set of attribute
+# slots with no per-instance __dict__. from_db_row expects the table's
+# column order (SELECT *), and row_factory can be set on a cursor so
+# fetched rows come back as records instead of tuples:
+#
+#     cursor.row_factory = Worker.row_factory
+#
+# The *Row types at the end are the rows of the list screens, with names in
+# place of ids; they iterate in column order, e.g. for a Treeview's values.
+
 class Worker:
-    def __init__(self, name, contact=None, joining_date=None, hourly_rate=0):
+    __slots__ = ('id', 'name', 'contact', 'joining_date', 'hourly_rate')
+
+    def __init__(self, name, contact=None, joining_date=None, hourly_rate=0, id=None):
+        self.id = id
         self.name = name
         self.contact = contact
         self.joining_date = joining_date or datetime.now().strftime('%Y-%m-%d')
@@ -9,15 +22,22 @@ class Worker:
 
     @classmethod
     def from_db_row(cls, row):
-        return cls(
-            name=row[1],
-            contact=row[2],
-            joining_date=row[3],
-            hourly_rate=row[4]
-        )
+        worker = object.__new__(cls)
+        worker.id, worker.name, worker.contact, worker.joining_date, worker.hourly_rate = row
+        return worker
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls.from_db_row(row)
+
+    def __repr__(self):
+        return f"Worker(id={self.id!r}, name={self.name!r})"
 
 class Design:
-    def __init__(self, name, description=None, base_price=0, complexity_level=1):
+    __slots__ = ('id', 'name', 'description', 'base_price', 'complexity_level')
+
+    def __init__(self, name, description=None, base_price=0, complexity_level=1, id=None):
+        self.id = id
         self.name = name
         self.description = description
         self.base_price = base_price
@@ -25,15 +45,22 @@ class Design:
 
     @classmethod
     def from_db_row(cls, row):
-        return cls(
-            name=row[1],
-            description=row[2],
-            base_price=row[3],
-            complexity_level=row[4]
-        )
+        design = object.__new__(cls)
+        design.id, design.name, design.description, design.base_price, design.complexity_level = row
+        return design
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls.from_db_row(row)
+
+    def __repr__(self):
+        return f"Design(id={self.id!r}, name={self.name!r})"
 
 class Client:
-    def __init__(self, name, company=None, contact=None, email=None, address=None):
+    __slots__ = ('id', 'name', 'company', 'contact', 'email', 'address')
+
+    def __init__(self, name, company=None, contact=None, email=None, address=None, id=None):
+        self.id = id
         self.name = name
         self.company = company
         self.contact = contact
@@ -42,36 +69,64 @@ class Client:
 
     @classmethod
     def from_db_row(cls, row):
-        return cls(
-            name=row[1],
-            company=row[2],
-            contact=row[3],
-            email=row[4],
-            address=row[5]
-        )
+        client = object.__new__(cls)
+        client.id, client.name, client.company, client.contact, client.email, client.address = row
+        return client
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls.from_db_row(row)
+
+    def __repr__(self):
+        return f"Client(id={self.id!r}, name={self.name!r})"
 
 class Order:
-    def __init__(self, client_id, design_id, quantity, deadline, order_date=None, status='Pending'):
+    __slots__ = ('id', 'client_id', 'design_id', 'quantity', 'order_date', 'deadline', 'status', 'version')
+
+    def __init__(self, client_id, design_id, quantity, deadline, order_date=None, status='Pending', id=None,
+                 version=1):
+        self.id = id
         self.client_id = client_id
         self.design_id = design_id
         self.quantity = quantity
         self.order_date = order_date or datetime.now().strftime('%Y-%m-%d')
         self.deadline = deadline
         self.status = status
+        self.version = version
 
     @classmethod
     def from_db_row(cls, row):
-        return cls(
-            client_id=row[1],
-            design_id=row[2],
-            quantity=row[3],
-            deadline=row[5],
-            order_date=row[4],
-            status=row[6]
-        )
+        order = object.__new__(cls)
+        (order.id, order.client_id, order.design_id, order.quantity,
+         order.order_date, order.deadline, order.status, order.version) = row
+        return order
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls.from_db_row(row)
+
+    def __repr__(self):
+        return f"Order(id={self.id!r}, status={self.status!r})"
+
+# Date strings seen so far, shared between records; emptied once it holds
+# SHARED_DATES_LIMIT days so a long-running process does not keep every
+# date it ever read
+SHARED_DATES_LIMIT = 4096
+_shared_dates = {}
+
+def _shared_date(date):
+    shared = _shared_dates.get(date)
+    if shared is None:
+        if len(_shared_dates) >= SHARED_DATES_LIMIT:
+            _shared_dates.clear()
+        shared = _shared_dates[date] = date
+    return shared
 
 class ProductionRecord:
-    def __init__(self, worker_id, design_id, quantity, date=None):
+    __slots__ = ('id', 'worker_id', 'design_id', 'quantity', 'date')
+
+    def __init__(self, worker_id, design_id, quantity, date=None, id=None):
+        self.id = id
         self.worker_id = worker_id
         self.design_id = design_id
         self.quantity = quantity
@@ -79,9 +134,87 @@ class ProductionRecord:
 
     @classmethod
     def from_db_row(cls, row):
-        return cls(
-            worker_id=row[1],
-            design_id=row[2],
-            quantity=row[3],
-            date=row[4]
-        )
\ No newline at end of file
+        record = object.__new__(cls)
+        record.id, record.worker_id, record.design_id, record.quantity, date = row
+        # sqlite3 returns a new str per row; sharing one object per distinct
+        # day keeps a million records from holding a million date strings
+        record.date = _shared_date(date)
+        return record
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls.from_db_row(row)
+
+    def __repr__(self):
+        return f"ProductionRecord(id={self.id!r}, worker_id={self.worker_id!r}, date={self.date!r})"
+
+class Invoice:
+    __slots__ = ('id', 'order_id', 'invoice_date', 'amount', 'tax', 'discount', 'total_amount', 'status',
+                 'version')
+
+    def __init__(self, order_id, amount, tax=0, discount=0, total_amount=None, invoice_date=None,
+                 status='Unpaid', id=None, version=1):
+        self.id = id
+        self.order_id = order_id
+        self.invoice_date = invoice_date or datetime.now().strftime('%Y-%m-%d')
+        self.amount = amount
+        self.tax = tax
+        self.discount = discount
+        self.total_amount = total_amount if total_amount is not None else amount + amount * tax / 100 - discount
+        self.status = status
+        self.version = version
+
+    @classmethod
+    def from_db_row(cls, row):
+        invoice = object.__new__(cls)
+        (invoice.id, invoice.order_id, invoice.invoice_date, invoice.amount, invoice.tax,
+         invoice.discount, invoice.total_amount, invoice.status, invoice.version) = row
+        return invoice
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls.from_db_row(row)
+
+    def __repr__(self):
+        return f"Invoice(id={self.id!r}, order_id={self.order_id!r}, status={self.status!r})"
+
+class _ListRow:
+    __slots__ = ()
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls.from_db_row(row)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"{type(self).__name__}{tuple(self)!r}"
+
+class OrderRow(_ListRow):
+    __slots__ = ('id', 'client', 'design', 'quantity', 'order_date', 'deadline', 'status')
+
+    @classmethod
+    def from_db_row(cls, row):
+        order = object.__new__(cls)
+        order.id, order.client, order.design, order.quantity, order.order_date, order.deadline, order.status = row
+        return order
+
+class ProductionRow(_ListRow):
+    __slots__ = ('id', 'worker', 'design', 'quantity', 'date')
+
+    @classmethod
+    def from_db_row(cls, row):
+        record = object.__new__(cls)
+        record.id, record.worker, record.design, record.quantity, date = row
+        record.date = _shared_date(date)
+        return record
+
+class InvoiceRow(_ListRow):
+    __slots__ = ('id', 'order_id', 'client', 'invoice_date', 'total_amount', 'status')
+
+    @classmethod
+    def from_db_row(cls, row):
+        invoice = object.__new__(cls)
+        invoice.id, invoice.order_id, invoice.client, invoice.invoice_date, invoice.total_amount, invoice.status = row
+        return invoice
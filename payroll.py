@@ -0,0 +1,191 @@
+"""Piece-rate payroll: workers paid per item, by how hard the design is to make.
+
+A run fetches the period's production from the production_daily rollup as
+three columns (worker, design, quantity) and prices it in one pass. Each
+item earns its design's piece rate: DESIGN_PIECE_RATES if the design has
+one, otherwise PIECE_RATES for its complexity_level. Each of a worker's
+items beyond BONUS_THRESHOLD earns BONUS_RATE on top, DEDUCTION_RATE of the
+gross is withheld, and per-worker adjustments (advances, one-off bonuses)
+are applied last.
+
+NumPy is optional: with it each column arrives as one comma-separated
+string, parsed straight into an array and priced with array operations;
+without it the same rules run row by row in plain Python.
+
+Command line, from the project root:
+    python payroll.py --month 6 --year 2025 [--out piece_payroll_june.csv]
+"""
+import argparse
+import itertools
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from database import get_db_connection, initialize_database, month_range
+from exporter import write_rows
+
+# Pay per item by designs.complexity_level (1 = simplest)
+PIECE_RATES = {1: 0.50, 2: 0.80, 3: 1.20, 4: 1.80, 5: 2.50}
+
+# Pay per item for designs with no or an unknown complexity level
+DEFAULT_PIECE_RATE = 0.50
+
+# Pay per item for individual designs, overriding PIECE_RATES ({design_id: rate})
+DESIGN_PIECE_RATES = {}
+
+# Items per period after which each further item earns BONUS_RATE extra
+BONUS_THRESHOLD = 2000
+BONUS_RATE = 0.10  # per item, in the same currency as the piece rates
+
+# Share of gross pay withheld (e.g. social security contributions)
+DEDUCTION_RATE = 0.0
+
+# Column order of the rows returned by run_piece_payroll()
+PIECE_PAYROLL_COLUMNS = ('worker_id', 'worker_name', 'total_quantity', 'piece_pay', 'bonus', 'deductions',
+                         'net_pay')
+
+# Rows pulled from the cursor per fetchmany call; iterating the cursor row by
+# row costs a Python call per row when queries are logged
+FETCH_SIZE = 5000
+
+PRODUCTION_SQL = '''
+SELECT worker_id, design_id, quantity
+FROM production_daily
+WHERE date >= ? AND date < ?
+'''
+
+# The same rows as one row of three columns; the group_concat()s run over
+# the same scan, so the nth value of each string belongs to the same row
+PRODUCTION_COLUMNS_SQL = '''
+SELECT group_concat(worker_id), group_concat(design_id), group_concat(quantity)
+FROM production_daily
+WHERE date >= ? AND date < ?
+'''
+
+
+def design_rates(overrides=None):
+    """Piece rate of every design, as {design_id: rate}"""
+    rates = {}
+    for design_id, level in get_db_connection().execute("SELECT id, complexity_level FROM designs"):
+        rates[design_id] = PIECE_RATES.get(level, DEFAULT_PIECE_RATE)
+    rates.update(DESIGN_PIECE_RATES)
+    rates.update(overrides or {})
+    return rates
+
+
+def _fetch_arrays(conn, start, end):
+    # (workers, designs, quantities) arrays, parsed in C rather than row by row
+    columns = conn.execute(PRODUCTION_COLUMNS_SQL, (start, end)).fetchone()
+    if columns[0] is None:
+        return None
+    return [np.fromstring(column, dtype=np.int64, sep=',') for column in columns]
+
+
+def _price_arrays(production, rates):
+    # {worker_id: (quantity, piece pay, bonus, deductions)} with NumPy
+    if production is None:
+        return {}
+    workers, designs, quantities = production
+
+    lookup = np.full(max(max(rates, default=0), int(designs.max())) + 1, DEFAULT_PIECE_RATE)
+    lookup[np.fromiter(rates.keys(), np.int64, len(rates))] = np.fromiter(rates.values(), np.float64, len(rates))
+
+    quantity = np.bincount(workers, weights=quantities)
+    piece_pay = np.bincount(workers, weights=quantities * lookup[designs])
+    bonus = np.maximum(quantity - BONUS_THRESHOLD, 0) * BONUS_RATE
+    deductions = (piece_pay + bonus) * DEDUCTION_RATE
+
+    paid = np.flatnonzero(quantity)
+    return dict(zip(paid.tolist(), zip(quantity[paid].astype(np.int64).tolist(), piece_pay[paid].tolist(),
+                                       bonus[paid].tolist(), deductions[paid].tolist())))
+
+
+def _price_rows(production, rates):
+    # Same as _price_arrays, one row at a time
+    totals = {}
+    for worker_id, design_id, quantity in production:
+        total = totals.setdefault(worker_id, [0, 0.0])
+        total[0] += quantity
+        total[1] += quantity * rates.get(design_id, DEFAULT_PIECE_RATE)
+
+    priced = {}
+    for worker_id, (quantity, piece_pay) in totals.items():
+        if not quantity:
+            continue
+        bonus = max(quantity - BONUS_THRESHOLD, 0) * BONUS_RATE
+        priced[worker_id] = (quantity, piece_pay, bonus, (piece_pay + bonus) * DEDUCTION_RATE)
+    return priced
+
+
+def piece_payroll_between(start, end, rates=None, adjustments=None, vectorized=None):
+    """Piece-rate pay for every worker over [start, end).
+
+    rates overrides the piece rate of individual designs ({design_id: rate});
+    adjustments are amounts added to (or, if negative, withheld from) a
+    worker's pay ({worker_id: amount}). Returns tuples in
+    PIECE_PAYROLL_COLUMNS order, by worker name, with a zero row for
+    workers who produced nothing. vectorized=False prices the rows without
+    NumPy even when it is installed.
+    """
+    if vectorized is None:
+        vectorized = np is not None
+    conn = get_db_connection()
+    rates = design_rates(rates)
+    if vectorized:
+        priced = _price_arrays(_fetch_arrays(conn, start, end), rates)
+    else:
+        cursor = conn.execute(PRODUCTION_SQL, (start, end))
+        priced = _price_rows(itertools.chain.from_iterable(iter(lambda: cursor.fetchmany(FETCH_SIZE), [])), rates)
+
+    adjustments = adjustments or {}
+    payroll = []
+    for worker_id, name in conn.execute("SELECT id, name FROM workers ORDER BY name"):
+        quantity, piece_pay, bonus, deductions = priced.get(worker_id, (0, 0.0, 0.0, 0.0))
+        adjustment = adjustments.get(worker_id, 0)
+        if adjustment > 0:
+            bonus += adjustment
+        else:
+            deductions -= adjustment
+        payroll.append((worker_id, name, quantity, round(piece_pay, 2), round(bonus, 2), round(deductions, 2),
+                        round(piece_pay + bonus - deductions, 2)))
+    return payroll
+
+
+def run_piece_payroll(month, year, rates=None, adjustments=None):
+    """Piece-rate pay for every worker for the month; see piece_payroll_between()"""
+    return piece_payroll_between(*month_range(month, year), rates, adjustments)
+
+
+def export_piece_payroll(month, year, path, fmt=None):
+    return write_rows(PIECE_PAYROLL_COLUMNS, [run_piece_payroll(month, year)], path, fmt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--month', type=int, required=True)
+    parser.add_argument('--year', type=int, required=True)
+    parser.add_argument('--out', help="write the payroll to this CSV or .jsonl file instead of printing it")
+    args = parser.parse_args()
+
+    initialize_database()
+    if args.out:
+        result = export_piece_payroll(args.month, args.year, args.out)
+        print(f"{result['rows']} workers written to {result['path']} in {result['seconds']:.2f}s")
+        return
+
+    started = time.perf_counter()
+    payroll = run_piece_payroll(args.month, args.year)
+    elapsed = time.perf_counter() - started
+    print(f"{'ID':>5} {'Worker':25} {'Items':>8} {'Piece pay':>11} {'Bonus':>9} {'Deductions':>11} {'Net pay':>11}")
+    for worker_id, name, quantity, piece_pay, bonus, deductions, net_pay in payroll:
+        print(f"{worker_id:>5} {name[:25]:25} {quantity:>8} {piece_pay:>11.2f} {bonus:>9.2f} "
+              f"{deductions:>11.2f} {net_pay:>11.2f}")
+    print(f"{len(payroll)} workers, total {sum(row[6] for row in payroll):,.2f}, "
+          f"priced in {elapsed * 1000:.0f} ms{'' if np is not None else ' (without NumPy)'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,305 @@
+"""Per-statement timing for every SQL statement the application runs.
+
+connection.py opens its connections with InstrumentedConnection, so each
+execute/executemany is timed from the call until the last row has been
+fetched, and recorded against its SQL text with the rows it touched and the
+code that issued it. Statements slower than SLOW_QUERY_MS are appended to
+SLOW_LOG_PATH together with their EXPLAIN QUERY PLAN. snapshot() feeds the
+diagnostics screen.
+"""
+import contextlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+
+# Set to False before the first connection is opened to run without timing
+ENABLED = True
+
+SLOW_QUERY_MS = 100
+SLOW_LOG_PATH = 'slow_queries.log'
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+# Frames in these files are plumbing; the call site is the first frame outside
+_SKIP_FILES = {
+    __file__,
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'connection.py'),
+    contextlib.__file__,
+}
+# Standard library frames (threading, tkinter, concurrent.futures) are skipped too
+_STDLIB = os.path.dirname(os.__file__)
+
+# Statements worth asking SQLite for a plan
+_PLANNED = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+_stats = {}
+_keys = {}
+_sites = {}
+_lock = threading.Lock()
+_log_lock = threading.Lock()
+# Timings of cursors garbage-collected before their last row, added to the
+# statistics by the next record() or snapshot()
+_dropped = deque()
+
+
+class QueryStats:
+    __slots__ = ('sql', 'calls', 'errors', 'total_ms', 'max_ms', 'rows', 'buckets', 'sites',
+                 'slow_calls', 'last_plan')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.sites = Counter()
+        self.slow_calls = 0
+        self.last_plan = None
+
+    def percentile(self, fraction):
+        """Approximate latency percentile: the upper bound of its bucket"""
+        wanted = self.calls * fraction
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if count and seen >= wanted:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+def _normalize(sql):
+    # The same few dozen SQL strings come round again and again
+    key = _keys.get(sql)
+    if key is None:
+        key = _keys[sql] = ' '.join(sql.split())
+    return key
+
+
+def _call_site(depth=3):
+    # Up to `depth` application frames, outermost first, e.g.
+    # "gui.py:812 add_worker > database.py:98 _fetch_row"
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < depth:
+        code = frame.f_code
+        if code.co_filename not in _SKIP_FILES and not code.co_filename.startswith(_STDLIB):
+            frames.append((code, frame.f_lineno))
+        frame = frame.f_back
+    frames = tuple(frames)
+    site = _sites.get(frames)
+    if site is None:
+        site = _sites[frames] = ' > '.join(f"{os.path.basename(code.co_filename)}:{line} {code.co_name}"
+                                           for code, line in reversed(frames)) or '?'
+    return site
+
+
+def _bucket(ms):
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS_MS) - 1
+
+
+def _explain(conn, sql, parameters):
+    if not sql.lstrip().upper().startswith(_PLANNED):
+        return None
+    try:
+        # The plain method, so the EXPLAIN itself is not recorded
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, parameters or ())
+        return [row[3] for row in rows]
+    except sqlite3.Error:
+        # e.g. executemany parameters that have already been consumed
+        return None
+
+
+def _write_slow_entry(key, ms, rows, site, plan):
+    lines = [f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  {ms:.1f} ms  {rows} rows  {site}",
+             f"    {key}"]
+    lines += [f"    plan: {step}" for step in plan or ()]
+    try:
+        with _log_lock, open(SLOW_LOG_PATH, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n\n')
+    except OSError:
+        # A read-only working directory must not break the query itself
+        pass
+
+
+def _record_dropped():
+    # No connection: their plans are not looked up
+    while _dropped:
+        try:
+            sql, parameters, ms, rows, site = _dropped.popleft()
+        except IndexError:
+            return
+        _add(sql, ms, rows, site)
+
+
+def record(sql, ms, rows, site, conn=None, parameters=None, failed=False):
+    """Add one finished statement to the statistics"""
+    _record_dropped()
+    _add(sql, ms, rows, site, conn, parameters, failed)
+
+
+def _add(sql, ms, rows, site, conn=None, parameters=None, failed=False):
+    key = _normalize(sql)
+    slow = ms >= SLOW_QUERY_MS
+    plan = _explain(conn, sql, parameters) if slow and conn is not None else None
+
+    with _lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = QueryStats(key)
+        stats.calls += 1
+        stats.errors += failed
+        stats.total_ms += ms
+        stats.max_ms = max(stats.max_ms, ms)
+        stats.rows += rows
+        stats.buckets[_bucket(ms)] += 1
+        stats.sites[site] += 1
+        if slow:
+            stats.slow_calls += 1
+            stats.last_plan = plan
+
+    if slow:
+        _write_slow_entry(key, ms, rows, site, plan)
+
+
+def snapshot(order_by='total_ms', limit=None):
+    """Per-statement statistics as dicts, most expensive first"""
+    _record_dropped()
+    with _lock:
+        rows = [{
+            'sql': s.sql,
+            'calls': s.calls,
+            'errors': s.errors,
+            'total_ms': s.total_ms,
+            'avg_ms': s.total_ms / s.calls if s.calls else 0,
+            'p50_ms': s.percentile(0.5),
+            'p95_ms': s.percentile(0.95),
+            'max_ms': s.max_ms,
+            'rows': s.rows,
+            'slow_calls': s.slow_calls,
+            'histogram': list(zip(BUCKETS_MS, s.buckets)),
+            'sites': s.sites.most_common(),
+            'last_plan': s.last_plan,
+        } for s in _stats.values()]
+    rows.sort(key=lambda row: row[order_by], reverse=True)
+    return rows[:limit] if limit else rows
+
+
+def reset():
+    _dropped.clear()
+    with _lock:
+        _stats.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times each statement through to its last fetched row"""
+
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        site = _call_site()
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except sqlite3.Error:
+            record(sql, (time.perf_counter() - started) * 1000, 0, site, failed=True)
+            raise
+        ms = (time.perf_counter() - started) * 1000
+        if self.description is None:
+            # Nothing to fetch: the statement is already complete
+            record(sql, ms, max(self.rowcount, 0), site, self.connection, parameters)
+        else:
+            self._pending = [sql, parameters, ms, 0, site]
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        site = _call_site()
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except sqlite3.Error:
+            record(sql, (time.perf_counter() - started) * 1000, 0, site, failed=True)
+            raise
+        record(sql, (time.perf_counter() - started) * 1000, max(self.rowcount, 0), site, self.connection)
+        return self
+
+    def _finish(self):
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            sql, parameters, ms, rows, site = pending
+            record(sql, ms, rows, site, self.connection, parameters)
+
+    def _fetched(self, started, rows, done):
+        pending = self._pending
+        if pending is not None:
+            pending[2] += (time.perf_counter() - started) * 1000
+            pending[3] += rows
+            if done:
+                self._finish()
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(started, row is not None, row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(started, len(rows), not rows)
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(started, len(rows), True)
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(started, 0, True)
+            raise
+        self._fetched(started, 1, False)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # A cursor dropped before its last row (e.g. a single fetchone()).
+        # This can run from garbage collection at any point, even inside
+        # record() on this thread: no SQL, locks or file writes here, only
+        # a deque append, which is atomic.
+        pending = self._pending
+        if pending is not None:
+            self._pending = None
+            _dropped.append(pending)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, and shortcut execute methods, are timed"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
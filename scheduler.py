@@ -0,0 +1,372 @@
+"""Deadline-aware production schedule for the open orders.
+
+Each worker's throughput per design (items per day worked on it) is
+estimated from the last THROUGHPUT_DAYS of production. Production is not
+recorded against orders, so a design's output since its oldest open order
+was placed is credited to its open orders, earliest deadline first; what
+is left is the order's remaining work.
+
+Orders are taken from a priority queue ordered by deadline slack: the
+deadline less the days the fastest worker would need for the remaining
+work. Each goes to whichever of the design's CANDIDATES fastest workers
+would finish it soonest, and an order finishing after its deadline is
+flagged as late. Days are calendar days counted from today.
+
+After the first build the database is not read again in full:
+record_production() adds the new output to that worker's throughput and to
+the design's output, and order_changed() re-reads one order and its
+design's output. The assignment is run again in memory when the plan is
+next read, so it is always the one a fresh build would make. On a new calendar day, or after
+replan(), it is built again from the database.
+
+Command line, from the project root:
+    python scheduler.py [--late] [--today 2025-06-30] [--limit 50]
+"""
+import argparse
+import bisect
+import heapq
+import json
+import math
+import threading
+import time
+from datetime import date, timedelta
+
+from database import OPEN_ORDER_STATUSES, get_db_connection, initialize_database
+
+# Days of production history used to estimate throughput
+THROUGHPUT_DAYS = 90
+
+# Fastest workers for a design that an order of it may be given to
+CANDIDATES = 10
+
+# Column order of the rows returned by Scheduler.rows()
+SCHEDULE_COLUMNS = ('order_id', 'design_id', 'remaining', 'worker_id', 'start', 'finish', 'deadline', 'late')
+
+
+class Job:
+    """An open order's remaining work and its place in the plan.
+
+    start, finish and deadline are days from today; deadline is the end of
+    the deadline day. key is the deadline slack the queues are ordered by.
+    """
+    __slots__ = ('order_id', 'design_id', 'quantity', 'remaining', 'deadline', 'key', 'worker_id', 'start', 'finish')
+
+    def __init__(self, order_id, design_id, quantity, deadline):
+        self.order_id = order_id
+        self.design_id = design_id
+        self.quantity = quantity
+        self.remaining = quantity
+        self.deadline = deadline
+        self.key = None
+        self.worker_id = None
+        self.start = None
+        self.finish = None
+
+    @property
+    def late(self):
+        return self.finish is not None and self.finish > self.deadline
+
+
+# Per design with open orders: the date of its oldest open order and the
+# output since then, less what went into orders placed since then that are
+# already finished. {designs} narrows it to some designs.
+OUTPUT_SQL = f'''
+WITH oldest AS (
+    SELECT design_id, MIN(order_date) AS since FROM orders
+    WHERE status IN {OPEN_ORDER_STATUSES} {{designs}} GROUP BY design_id
+)
+SELECT oldest.design_id, oldest.since,
+       (SELECT TOTAL(pd.quantity) FROM production_daily pd
+        WHERE pd.design_id = oldest.design_id AND pd.date >= oldest.since)
+     - (SELECT TOTAL(o.quantity) FROM orders o
+        WHERE o.design_id = oldest.design_id AND o.order_date >= oldest.since
+          AND o.status NOT IN {OPEN_ORDER_STATUSES} AND o.status != 'Cancelled')
+FROM oldest
+'''
+
+
+def _open_order_key(job):
+    return (job.deadline, job.order_id)
+
+
+class Scheduler:
+    """Plan of the open orders, built on first use and then kept up to date.
+
+    Safe to call from the GUI thread and from background database jobs;
+    changes made before the first build are simply read by it.
+    """
+
+    def __init__(self, today=None):
+        self.today = today
+        self.lock = threading.Lock()
+        self.built = False
+
+    def _stale(self):
+        # Not built yet, or built on an earlier day: deadlines and the
+        # throughput window are counted from the day of the build
+        return not self.built or (self.today is None and self.day != date.today())
+
+    def _days_until(self, day):
+        return (date.fromisoformat(day) - self.day).days + 1
+
+    def _build(self):
+        self.day = self.today or date.today()
+        since = (self.day - timedelta(days=THROUGHPUT_DAYS)).isoformat()
+        conn = get_db_connection()
+
+        # Items and days worked per (worker, design), and per worker for
+        # designs the worker has not made lately
+        self.pair_totals = {}
+        self.design_rates = {}
+        for worker_id, design_id, quantity, days in conn.execute('''
+        SELECT worker_id, design_id, SUM(quantity), COUNT(*) FROM production_daily
+        WHERE date >= ? GROUP BY worker_id, design_id
+        ''', (since,)).fetchall():
+            self.pair_totals[(worker_id, design_id)] = [quantity, days]
+            self.design_rates.setdefault(design_id, {})[worker_id] = quantity / days
+        self.worker_totals = {}
+        for worker_id, quantity, days in conn.execute('''
+        SELECT worker_id, SUM(quantity), COUNT(DISTINCT date) FROM production_daily
+        WHERE date >= ? GROUP BY worker_id
+        ''', (since,)).fetchall():
+            self.worker_totals[worker_id] = [quantity, days]
+
+        self.jobs = {}
+        self.open_jobs = {}
+        for order_id, design_id, quantity, deadline in conn.execute(f'''
+        SELECT id, design_id, quantity, deadline FROM orders
+        WHERE status IN {OPEN_ORDER_STATUSES}
+        ''').fetchall():
+            try:
+                job = Job(order_id, design_id, quantity or 0, self._days_until(deadline))
+            except (TypeError, ValueError):
+                continue
+            self.jobs[order_id] = job
+            self.open_jobs.setdefault(design_id, []).append(job)
+        for jobs in self.open_jobs.values():
+            jobs.sort(key=_open_order_key)
+
+        self.output_since = {}
+        self.output = {}
+        self._load_output()
+        for design_id in self.open_jobs:
+            self._credit(design_id)
+        self._plan()
+        self.built = True
+
+    def _load_output(self, design_ids=None):
+        # Reads OUTPUT_SQL into output_since and output, for every design or
+        # for design_ids only
+        if design_ids is None:
+            rows = get_db_connection().execute(OUTPUT_SQL.format(designs=''))
+        else:
+            for design_id in design_ids:
+                self.output_since.pop(design_id, None)
+                self.output.pop(design_id, None)
+            rows = get_db_connection().execute(
+                OUTPUT_SQL.format(designs="AND design_id IN (SELECT value FROM json_each(?))"),
+                (json.dumps(list(design_ids)),))
+        for design_id, since, quantity in rows.fetchall():
+            self.output_since[design_id] = since
+            self.output[design_id] = int(quantity)
+
+    def _credit(self, design_id):
+        # Hands the design's output to its open orders, earliest deadline first
+        left = max(self.output.get(design_id, 0), 0)
+        for job in self.open_jobs.get(design_id, ()):
+            used = min(left, job.quantity)
+            job.remaining = job.quantity - used
+            left -= used
+
+    def _plan(self):
+        # Most urgent first, each to the candidate who would finish it
+        # soonest. Only reads what is in memory, so it is run again in full
+        # the next time the plan is read after a change: the greedy
+        # assignment of one order depends on all the more urgent ones, so a
+        # local repair drifts from a rebuild.
+        self.fastest_workers = sorted(
+            ((quantity / days, worker_id) for worker_id, (quantity, days) in self.worker_totals.items() if quantity),
+            reverse=True)[:CANDIDATES]
+        self.candidates = {}
+        queue = []
+        for job in self.jobs.values():
+            job.key = job.worker_id = job.start = job.finish = None
+            if job.remaining > 0 and self._candidates(job.design_id):
+                job.key = job.deadline - job.remaining / self._best_rate(job.design_id)
+                queue.append((job.key, job.deadline, job.order_id))
+        heapq.heapify(queue)
+        self.queues = {}
+        free = {}
+        while queue:
+            job = self.jobs[heapq.heappop(queue)[2]]
+            best = None
+            for rate, worker_id in self._candidates(job.design_id):
+                finish = free.get(worker_id, 0.0) + job.remaining / rate
+                if best is None or finish < best[0]:
+                    best = (finish, worker_id)
+            job.worker_id = best[1]
+            job.start = free.get(best[1], 0.0)
+            job.finish = free[best[1]] = best[0]
+            self.queues.setdefault(best[1], []).append(job)
+        self.planned = True
+
+    def _candidates(self, design_id):
+        # [(rate, worker_id)], fastest first
+        candidates = self.candidates.get(design_id)
+        if candidates is None:
+            rates = self.design_rates.get(design_id)
+            if rates:
+                candidates = sorted(((rate, worker_id) for worker_id, rate in rates.items() if rate),
+                                    reverse=True)[:CANDIDATES]
+            candidates = candidates or self.fastest_workers
+            self.candidates[design_id] = candidates
+        return candidates
+
+    def _best_rate(self, design_id):
+        candidates = self._candidates(design_id)
+        return candidates[0][0] if candidates else 0
+
+    def replan(self):
+        """Throw the plan away and build it again from the database"""
+        with self.lock:
+            self._build()
+
+    def invalidate(self):
+        with self.lock:
+            self.built = False
+
+    def record_production(self, worker_id, design_id, quantity, day):
+        """Bring the plan up to date with a production record just saved"""
+        with self.lock:
+            if self._stale():
+                # Read by the next build
+                self.built = False
+                return
+            conn = get_db_connection()
+            if day >= (self.day - timedelta(days=THROUGHPUT_DAYS)).isoformat():
+                # One record more on this rollup row; a first one is a new day worked
+                records = conn.execute(
+                    "SELECT records FROM production_daily WHERE date=? AND worker_id=? AND design_id=?",
+                    (day, worker_id, design_id)).fetchone()
+                new_day = bool(records) and records[0] == 1
+                totals = self.pair_totals.setdefault((worker_id, design_id), [0, 0])
+                totals[0] += quantity
+                totals[1] += new_day
+                worker = self.worker_totals.setdefault(worker_id, [0, 0])
+                worker[0] += quantity
+                if new_day and conn.execute("SELECT COUNT(*) FROM production_daily WHERE worker_id=? AND date=?",
+                                            (worker_id, day)).fetchone()[0] == 1:
+                    worker[1] += 1
+                if totals[1]:
+                    self.design_rates.setdefault(design_id, {})[worker_id] = totals[0] / totals[1]
+            since = self.output_since.get(design_id)
+            if since is not None and day >= since:
+                self.output[design_id] += quantity
+                self._credit(design_id)
+            self.planned = False
+
+    def order_changed(self, order_id):
+        """Bring the plan up to date with an order created, edited, invoiced or deleted"""
+        self.orders_changed([order_id])
+
+    def orders_changed(self, order_ids):
+        """order_changed() for many orders at once, e.g. after a batch of invoices"""
+        with self.lock:
+            if self._stale():
+                self.built = False
+                return
+            order_ids = list(order_ids)
+            designs = set()
+            for order_id in order_ids:
+                old = self.jobs.pop(order_id, None)
+                if old:
+                    self.open_jobs[old.design_id].remove(old)
+                    designs.add(old.design_id)
+            for order_id, design_id, quantity, deadline in get_db_connection().execute(f'''
+            SELECT id, design_id, quantity, deadline FROM orders
+            WHERE id IN (SELECT value FROM json_each(?)) AND status IN {OPEN_ORDER_STATUSES}
+            ''', (json.dumps(order_ids),)).fetchall():
+                try:
+                    job = Job(order_id, design_id, quantity or 0, self._days_until(deadline))
+                except (TypeError, ValueError):
+                    continue
+                self.jobs[order_id] = job
+                bisect.insort(self.open_jobs.setdefault(design_id, []), job, key=_open_order_key)
+                designs.add(design_id)
+            if not designs:
+                return
+            # An order opening or closing can move its design's oldest open
+            # order, and with it the output counted towards the design
+            self._load_output(designs)
+            for design_id in designs:
+                self._credit(design_id)
+            self.planned = False
+
+    def rows(self, late_only=False, limit=None):
+        """Scheduled orders, most urgent first, as tuples in SCHEDULE_COLUMNS order.
+
+        Start, finish and deadline are ISO dates; orders already made in
+        full are left out.
+        """
+        with self.lock:
+            if self._stale():
+                self._build()
+            elif not self.planned:
+                self._plan()
+            jobs = [job for job in self.jobs.values()
+                    if job.worker_id is not None and (job.late or not late_only)]
+            jobs.sort(key=lambda job: (job.key, job.order_id))
+            return [(job.order_id, job.design_id, job.remaining, job.worker_id, self._date(job.start),
+                     self._date(math.ceil(job.finish) - 1), self._date(job.deadline - 1), job.late)
+                    for job in jobs[:limit]]
+
+    def summary(self):
+        """Counts of open orders: scheduled, late, already made in full and unschedulable"""
+        with self.lock:
+            if self._stale():
+                self._build()
+            elif not self.planned:
+                self._plan()
+            counts = {'scheduled': 0, 'late': 0, 'made': 0, 'unscheduled': 0}
+            for job in self.jobs.values():
+                if job.remaining <= 0:
+                    counts['made'] += 1
+                elif job.worker_id is None:
+                    counts['unscheduled'] += 1
+                else:
+                    counts['scheduled'] += 1
+                    counts['late'] += job.late
+            return counts
+
+    def _date(self, days):
+        # The calendar day a number of days from the start of today falls on
+        return (self.day + timedelta(days=math.floor(days))).isoformat()
+
+
+production_schedule = Scheduler()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--late', action='store_true', help="list only the orders that will miss their deadline")
+    parser.add_argument('--today', type=date.fromisoformat, help="plan as if it were this date")
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    initialize_database()
+    schedule = Scheduler(args.today)
+    started = time.perf_counter()
+    schedule.replan()
+    elapsed = time.perf_counter() - started
+    print(f"{'Order':>8} {'Design':>7} {'Left':>6} {'Worker':>7} {'Start':>11} {'Finish':>11} {'Deadline':>11}")
+    for order_id, design_id, remaining, worker_id, start, finish, deadline, late in schedule.rows(args.late,
+                                                                                                   args.limit):
+        print(f"{order_id:>8} {design_id:>7} {remaining:>6} {worker_id:>7} {start:>11} {finish:>11} {deadline:>11}"
+              f"{'  LATE' if late else ''}")
+    counts = schedule.summary()
+    print(f"{counts['scheduled']} orders scheduled, {counts['late']} late, {counts['made']} already made, "
+          f"{counts['unscheduled']} without anyone to make them; planned in {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
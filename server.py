@@ -0,0 +1,476 @@
+"""Headless HTTP/JSON service over the database layer.
+
+Lets shop-floor terminals and other machines use one factory.db over the
+network instead of each keeping a copy. HTTP/1.1 with keep-alive is served
+by asyncio; every database call runs on a single database thread with one
+connection. Requests that arrive while a batch is running are queued and
+run together as the next batch: its reads first, outside any transaction,
+then its writes in one transaction, each inside its own savepoint, so a
+burst of writes costs one commit instead of one per request and a failing
+request does not undo the others. A batch that finds the database locked
+by another process is retried with backoff before it fails.
+
+    GET  /workers, /designs, /clients            reference lists (?q= searches clients and designs)
+    GET  /orders[?cursor=&q=]                    one page: {"rows": [...], "next": cursor or null}
+    GET  /orders/<id>                            {"order": row, "version": n}
+    POST /orders                                 {"client_id", "design_id", "quantity", "order_date", "deadline"[, "status"]}
+    PUT  /orders/<id>                            the same fields plus the "version" read; 409 if it has changed
+    GET  /production[?cursor=]
+    POST /production                             {"worker_id", "design_id", "quantity", "date"}, or a list of them
+    GET  /invoices[?cursor=]
+    GET  /invoices/<id>
+    POST /invoices                               {"order_id"[, "tax", "discount"]}
+    GET  /salary?worker_id=&month=&year=
+    GET  /payroll?month=&year=
+    GET  /stats                                  requests, batches and retries served
+
+Run from the project root:
+    python server.py --host 0.0.0.0 --port 8080
+"""
+import argparse
+import asyncio
+import json
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import connection
+from connection import transaction
+from database import (ORDER_STATUSES, PAYROLL_COLUMNS, ConflictError, calculate_worker_salary, create_invoice,
+                      create_order, get_all_clients, get_all_designs, get_all_workers, get_invoice_details,
+                      get_invoices_page, get_order, get_order_row, get_orders_page, get_production_page,
+                      get_production_row, get_worker, initialize_database, record_production,
+                      record_production_many, run_payroll, search_clients, search_designs, search_orders_page,
+                      update_order)
+from models import InvoiceRow, OrderRow, ProductionRow
+
+# Most requests run together in one transaction
+BATCH_SIZE = 64
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1024 * 1024
+
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def _json_value(value):
+    # List rows go out as arrays in column order; anything else (dates) as text
+    if isinstance(value, (OrderRow, ProductionRow, InvoiceRow)):
+        return list(value)
+    return str(value)
+
+
+class RequestError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# ==================== VALIDATION ====================
+def _field(data, name, kind=str, default=None):
+    value = data.get(name, default)
+    if value is None:
+        raise RequestError(400, f"'{name}' is required")
+    try:
+        if kind is int and isinstance(value, float) and not value.is_integer():
+            raise ValueError
+        return kind(value)
+    except (TypeError, ValueError):
+        raise RequestError(400, f"'{name}' must be {'a number' if kind is not str else 'text'}")
+
+
+def _positive(data, name):
+    value = _field(data, name, int)
+    if value <= 0:
+        raise RequestError(400, f"'{name}' must be a positive integer")
+    return value
+
+
+def _date(data, name):
+    value = _field(data, name)
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise RequestError(400, f"'{name}' must be a date in YYYY-MM-DD format")
+    return value
+
+
+def _month(query):
+    month = _field(query, 'month', int)
+    if not 1 <= month <= 12:
+        raise RequestError(400, "'month' must be between 1 and 12")
+    return month, _field(query, 'year', int)
+
+
+def _found(row, what):
+    if row is None:
+        raise RequestError(404, f"{what} not found")
+    return row
+
+
+# ==================== HANDLERS ====================
+# Each runs on the database thread as handler(query, body, *path_ids) and
+# returns (status, payload). query holds the last value of each parameter.
+
+def list_workers(query, body):
+    return 200, get_all_workers()
+
+
+def list_designs(query, body):
+    if query.get('q'):
+        return 200, search_designs(query['q'])
+    return 200, get_all_designs()
+
+
+def list_clients(query, body):
+    if query.get('q'):
+        return 200, search_clients(query['q'])
+    return 200, get_all_clients()
+
+
+def _page(result):
+    rows, next_cursor = result
+    return 200, {'rows': rows, 'next': next_cursor}
+
+
+def list_orders(query, body):
+    try:
+        if query.get('q'):
+            return _page(search_orders_page(query['q'], query.get('cursor')))
+        return _page(get_orders_page(query.get('cursor')))
+    except (ValueError, TypeError):
+        raise RequestError(400, "invalid 'cursor'")
+
+
+def show_order(query, body, order_id):
+    # Version first, as in the GUI: a change in between shows up as a conflict
+    order = _found(get_order(order_id), "Order")
+    return 200, {'order': get_order_row(order_id), 'version': order.version}
+
+
+def _order_fields(body):
+    status = _field(body, 'status', default='Pending')
+    if status not in ORDER_STATUSES:
+        raise RequestError(400, f"'status' must be one of {', '.join(ORDER_STATUSES)}")
+    return (_field(body, 'client_id', int), _field(body, 'design_id', int), _positive(body, 'quantity'),
+            _date(body, 'order_date'), _date(body, 'deadline'), status)
+
+
+def add_order(query, body):
+    return 201, get_order_row(create_order(*_order_fields(body)))
+
+
+def change_order(query, body, order_id):
+    version = update_order(order_id, _field(body, 'version', int), *_order_fields(body))
+    return 200, {'order': get_order_row(order_id), 'version': version}
+
+
+def list_production(query, body):
+    try:
+        return _page(get_production_page(query.get('cursor')))
+    except (ValueError, TypeError):
+        raise RequestError(400, "invalid 'cursor'")
+
+
+def add_production(query, body):
+    def record(data):
+        if not isinstance(data, dict):
+            raise RequestError(400, "each production record must be an object")
+        return (_field(data, 'worker_id', int), _field(data, 'design_id', int),
+                _positive(data, 'quantity'), _date(data, 'date'))
+
+    if isinstance(body, list):
+        # A whole shift's records in one request
+        return 201, {'count': record_production_many([record(data) for data in body])}
+    return 201, get_production_row(record_production(*record(body)))
+
+
+def list_invoices(query, body):
+    try:
+        return _page(get_invoices_page(query.get('cursor')))
+    except (ValueError, TypeError):
+        raise RequestError(400, "invalid 'cursor'")
+
+
+def show_invoice(query, body, invoice_id):
+    return 200, _found(get_invoice_details(invoice_id), "Invoice")
+
+
+def add_invoice(query, body):
+    order_id = _field(body, 'order_id', int)
+    order = _found(get_order(order_id), "Order")
+    if order.status in ('Invoiced', 'Cancelled'):
+        raise RequestError(400, f"Order {order_id} is {order.status.lower()}")
+    return 201, create_invoice(order_id, _field(body, 'tax', float, 0), _field(body, 'discount', float, 0))
+
+
+def worker_salary(query, body):
+    worker_id = _field(query, 'worker_id', int)
+    _found(get_worker(worker_id), "Worker")
+    return 200, calculate_worker_salary(worker_id, *_month(query))
+
+
+def payroll(query, body):
+    return 200, [dict(zip(PAYROLL_COLUMNS, row)) for row in run_payroll(*_month(query))]
+
+
+# (method, path pattern) -> handler; numeric path parts become handler arguments
+ROUTES = [
+    ('GET', r'/workers', list_workers),
+    ('GET', r'/designs', list_designs),
+    ('GET', r'/clients', list_clients),
+    ('GET', r'/orders', list_orders),
+    ('GET', r'/orders/(\d+)', show_order),
+    ('POST', r'/orders', add_order),
+    ('PUT', r'/orders/(\d+)', change_order),
+    ('GET', r'/production', list_production),
+    ('POST', r'/production', add_production),
+    ('GET', r'/invoices', list_invoices),
+    ('GET', r'/invoices/(\d+)', show_invoice),
+    ('POST', r'/invoices', add_invoice),
+    ('GET', r'/salary', worker_salary),
+    ('GET', r'/payroll', payroll),
+]
+ROUTES = [(method, re.compile(pattern + '$'), handler) for method, pattern, handler in ROUTES]
+
+
+def route(method, path):
+    """(handler, path ids) for a request; raises RequestError for 404/405"""
+    allowed = False
+    for route_method, pattern, handler in ROUTES:
+        match = pattern.match(path)
+        if match:
+            if route_method == method:
+                return handler, [int(part) for part in match.groups()]
+            allowed = True
+    raise RequestError(405 if allowed else 404, f"{method} {path} is not supported")
+
+
+# ==================== DATABASE THREAD ====================
+class BatchRunner:
+    """Runs queued handlers on one thread and connection, a batch per transaction"""
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self.jobs = queue.Queue()
+        self.requests = 0
+        self.batches = 0
+        self.largest_batch = 0
+        self.retries = 0
+        self.thread = threading.Thread(target=self._run, name='db-batch', daemon=True)
+        self.thread.start()
+
+    def submit(self, handler, *args, write=True):
+        """Awaitable (status, payload) of handler(*args); write=False runs it outside the write transaction"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.jobs.put((loop, future, handler, args, write))
+        return future
+
+    def stop(self):
+        self.jobs.put(None)
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            batch = [self.jobs.get()]
+            # Whatever queued up while the previous batch ran joins this one
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.jobs.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = None in batch
+            batch = [job for job in batch if job is not None]
+            if batch:
+                self._run_batch(batch)
+            if stopping:
+                connection.close_connection()
+                return
+
+    def _run_batch(self, batch):
+        # Reads need no write lock: each runs in autocommit mode and is
+        # answered before the writes start, so it neither holds BEGIN
+        # IMMEDIATE nor waits for it
+        reads = [job for job in batch if not job[4]]
+        writes = [job for job in batch if job[4]]
+        self.requests += len(batch)
+        self.batches += 1
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self._resolve_all(reads, [self._call(handler, args) for loop, future, handler, args, write in reads])
+        if writes:
+            self._resolve_all(writes, self._write(writes))
+
+    def _resolve_all(self, jobs, outcomes):
+        for (loop, future, handler, args, write), (result, error) in zip(jobs, outcomes):
+            loop.call_soon_threadsafe(_resolve, future, result, error)
+
+    def _call(self, handler, args):
+        try:
+            return handler(*args), None
+        except Exception as error:
+            return None, error
+
+    def _write(self, batch):
+        # Outcomes of the write handlers, all saved in one transaction
+        for attempt in range(connection.BUSY_RETRIES + 1):
+            outcomes = []
+            try:
+                with transaction():
+                    for loop, future, handler, args, write in batch:
+                        try:
+                            with transaction():
+                                outcomes.append((handler(*args), None))
+                        except Exception as error:
+                            outcomes.append((None, error))
+                return outcomes
+            except sqlite3.Error as error:
+                # BEGIN or COMMIT itself failed, so nothing in the batch was saved
+                conn = connection.get_connection()
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                if attempt == connection.BUSY_RETRIES or not connection.is_busy_error(error):
+                    return [(None, error)] * len(batch)
+            # Another process holds the write lock past busy_timeout; run
+            # the whole batch again once it has had time to finish
+            self.retries += 1
+            time.sleep(random.uniform(0, connection.BUSY_BACKOFF * 2 ** attempt))
+
+
+def _resolve(future, result, error):
+    if future.cancelled():
+        return
+    if error is None:
+        future.set_result(result)
+    else:
+        future.set_exception(error)
+
+
+# ==================== HTTP ====================
+class Server:
+    def __init__(self, runner):
+        self.runner = runner
+
+    async def respond(self, method, target, body):
+        """(status, payload) for one request"""
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            if url.path == '/stats' and method == 'GET':
+                return 200, self.stats()
+            handler, ids = route(method, url.path.rstrip('/') or '/')
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                raise RequestError(400, "request body is not valid JSON")
+            return await self.runner.submit(handler, query, data, *ids, write=method != 'GET')
+        except RequestError as error:
+            return error.status, {'error': str(error)}
+        except ConflictError as error:
+            return 409, {'error': str(error)}
+        except sqlite3.IntegrityError as error:
+            # e.g. an unknown worker_id, design_id or client_id
+            return 400, {'error': str(error)}
+        except Exception as error:
+            return 500, {'error': str(error)}
+
+    def stats(self):
+        runner = self.runner
+        return {
+            'requests': runner.requests,
+            'batches': runner.batches,
+            'average_batch': runner.requests / runner.batches if runner.batches else 0,
+            'largest_batch': runner.largest_batch,
+            'retries': runner.retries,
+            'queued': runner.jobs.qsize(),
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    await self.send(writer, 400, {'error': "malformed request"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self.send(writer, 413, {'error': f"body larger than {MAX_BODY} bytes"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                status, payload = await self.respond(method.upper(), target, body)
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, default=_json_value).encode()
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n")
+        if not keep_alive:
+            head += "Connection: close\r\n"
+        writer.write(head.encode('latin-1') + b"\r\n" + data)
+        await writer.drain()
+
+
+async def serve(host, port, batch_size=BATCH_SIZE, ready=None):
+    """Serve until cancelled; ready(port) is called once listening"""
+    runner = BatchRunner(batch_size)
+    server = await asyncio.start_server(Server(runner).handle, host, port)
+    if ready:
+        ready(server.sockets[0].getsockname()[1])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await asyncio.get_running_loop().run_in_executor(None, runner.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless HTTP/JSON service over the database")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--db', help="database file (default: factory.db)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                        help="most requests per transaction (1 turns batching off)")
+    args = parser.parse_args()
+
+    if args.db:
+        connection.set_database_path(args.db)
+    initialize_database()
+
+    def ready(port):
+        print(f"serving {connection.DB_PATH} on http://{args.host}:{port}", flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_size, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
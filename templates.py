@@ -0,0 +1,31 @@
+import os
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATE_DIR = 'invoice_template'
+# Compiled template bytecode survives restarts and is shared by pool workers
+CACHE_DIR = os.path.join(TEMPLATE_DIR, '.cache')
+
+_environment = None
+
+
+def get_environment():
+    """Shared Jinja2 environment; templates are compiled once and reused.
+
+    auto_reload re-checks each template's mtime on use, so edits to the
+    files still show up without restarting the app.
+    """
+    global _environment
+    if _environment is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _environment = Environment(
+            loader=FileSystemLoader(TEMPLATE_DIR),
+            bytecode_cache=FileSystemBytecodeCache(CACHE_DIR),
+            auto_reload=True,
+            cache_size=50,
+        )
+    return _environment
+
+
+def render_template(name, **context):
+    return get_environment().get_template(name).render(**context)
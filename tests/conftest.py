@@ -0,0 +1,70 @@
+# The modules live at the project root, not in a package
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+import connection  # noqa: E402
+import database  # noqa: E402
+from lookups import client_lookup, design_lookup, worker_lookup  # noqa: E402
+
+
+def seed(workers=50, designs=50, clients=100, orders=2000, production=20000):
+    """Fill the current database with reproducible workers, designs, clients, orders and production.
+
+    Orders are all Pending, placed during 2024 and due 2025-01-01;
+    production is dated during 2024.
+    """
+    rnd = random.Random(42)
+    with connection.transaction() as conn:
+        conn.executemany("INSERT INTO workers (name, contact, joining_date, hourly_rate) VALUES (?, ?, ?, ?)",
+                         [(f"Worker {i}", "", "2024-01-01", 10 + i % 5) for i in range(workers)])
+        conn.executemany("INSERT INTO designs (name, description, base_price, complexity_level) VALUES (?, ?, ?, ?)",
+                         [(f"Design {i}", "", 5 + i % 20, 1 + i % 5) for i in range(designs)])
+        conn.executemany("INSERT INTO clients (name, company, contact, email, address) VALUES (?, ?, ?, ?, ?)",
+                         [(f"Client {i}", f"Company {i}", "", "", "") for i in range(clients)])
+        conn.executemany("INSERT INTO orders (client_id, design_id, quantity, order_date, deadline, status) "
+                         "VALUES (?, ?, ?, ?, ?, ?)",
+                         [(rnd.randint(1, clients), rnd.randint(1, designs), rnd.randint(1, 500),
+                           f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}", "2025-01-01", "Pending")
+                          for _ in range(orders)])
+        conn.executemany("INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+                         [(rnd.randint(1, workers), rnd.randint(1, designs), rnd.randint(1, 50),
+                           f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}")
+                          for _ in range(production)])
+
+
+def open_database(path):
+    connection.set_database_path(str(path))
+    database.initialize_database()
+    # The reference caches are module-wide and would outlive the file
+    for lookup in (worker_lookup, design_lookup, client_lookup):
+        lookup.invalidate()
+
+
+@pytest.fixture
+def db(tmp_path):
+    """Path of an empty, migrated database that the connection manager points at"""
+    path = tmp_path / 'factory.db'
+    open_database(path)
+    yield path
+    connection.close_all()
+
+
+@pytest.fixture
+def seeded_db(db):
+    """db with a small seed(): 10 workers, 10 designs, 20 clients, 200 orders, 2,000 production records"""
+    seed(workers=10, designs=10, clients=20, orders=200, production=2000)
+    return db
+
+
+@pytest.fixture(scope='module')
+def large_db(tmp_path_factory):
+    """A module-wide database with the default seed(), for read-only tests"""
+    open_database(tmp_path_factory.mktemp('large') / 'factory.db')
+    seed()
+    yield
+    connection.close_all()
@@ -0,0 +1,98 @@
+"""Hot/cold archival: what moves, and what still reads the archived rows."""
+import os
+
+import pytest
+
+import archive
+import connection
+import database
+import exporter
+
+
+def paid_old_invoices(order_ids, invoice_date='2024-03-15'):
+    # Invoices are dated today; back-date them so they fall before the cutoff
+    database.create_invoices(order_ids)
+    with connection.transaction() as conn:
+        conn.executemany("UPDATE invoices SET status = 'Paid', invoice_date = ? WHERE order_id = ?",
+                         [(invoice_date, order_id) for order_id in order_ids])
+
+
+def test_archive_moves_old_rows_out_of_the_main_file(seeded_db):
+    paid_old_invoices([1, 2, 3])
+    database.create_invoice(4)  # unpaid: stays hot
+    june = database.get_production_between('2024-06-01', '2024-07-01')
+    payroll = database.run_payroll(6, 2024)
+
+    moved = archive.archive_before('2024-07-01')
+    assert set(moved) == {2024}
+    production, invoices = moved[2024]
+    assert invoices == 3
+    conn = connection.get_connection()
+    assert conn.execute("SELECT COUNT(*) FROM main.worker_production WHERE date < '2024-07-01'").fetchone()[0] == 0
+    assert production == conn.execute(f"SELECT COUNT(*) FROM {archive.attach(conn, [2024])[0]}.worker_production"
+                                      ).fetchone()[0]
+    assert os.path.exists(archive.archive_path(2024))
+    assert archive.archive_boundary() == '2024-07-01'
+
+    # Archived production is still read, and the rollup kept the archived days
+    assert [record.id for record in database.get_production_between('2024-06-01', '2024-07-01')] == \
+        [record.id for record in june]
+    assert database.run_payroll(6, 2024) == payroll
+    assert database.check_production_daily() == []
+
+
+def test_archived_invoices_stay_readable_and_uninvoiceable(seeded_db):
+    paid_old_invoices([1, 2])
+    invoice_ids = [row[0] for row in connection.get_connection().execute("SELECT id FROM invoices ORDER BY id")]
+    archive.archive_before('2024-07-01')
+
+    assert connection.get_connection().execute("SELECT COUNT(*) FROM main.invoices").fetchone()[0] == 0
+    assert database.get_invoice(invoice_ids[0]).status == 'Paid'
+    assert database.get_invoice_row(invoice_ids[1]).order_id == 2
+    assert database.get_invoice_details(invoice_ids[0])['order_id'] == 1
+
+    # Even with the status set back by hand, an archived invoice's order is not offered again
+    with connection.transaction() as conn:
+        conn.execute("UPDATE orders SET status = 'Pending' WHERE id IN (1, 2)")
+    uninvoiced = {row[0] for row in database.get_uninvoiced_orders()}
+    assert not uninvoiced & {1, 2}
+    assert database.create_invoices([1, 2])['count'] == 0
+
+
+def test_export_reads_across_the_archive(seeded_db, tmp_path):
+    total = connection.get_connection().execute("SELECT COUNT(*) FROM worker_production").fetchone()[0]
+    archive.archive_before('2024-07-01')
+    result = exporter.export_rows('production', str(tmp_path / 'all.csv'))
+    assert result['rows'] == total
+
+
+def test_archiving_again_moves_only_the_new_period(seeded_db):
+    archive.archive_before('2024-07-01')
+    assert archive.archive_before('2024-07-01') == {}
+
+    later = connection.get_connection().execute(
+        "SELECT COUNT(*) FROM worker_production WHERE date >= '2024-07-01' AND date < '2024-09-01'").fetchone()[0]
+    assert archive.archive_before('2024-09-01') == {2024: (later, 0)}
+    assert archive.archive_boundary() == '2024-09-01'
+    assert [row[:2] for row in archive.archive_status()] == [(2024, '2024-09-01')]
+
+
+def test_reads_span_more_archive_years_than_can_be_attached(seeded_db, tmp_path):
+    years = range(2010, 2010 + archive.MAX_ATTACHED + 2)
+    database.record_production_many([(1 + year % 10, 1, year - 2000, f"{year}-05-01") for year in years])
+    conn = connection.get_connection()
+    total = conn.execute("SELECT COUNT(*) FROM worker_production").fetchone()[0]
+    old = conn.execute("SELECT id FROM worker_production WHERE date < '2024-01-01' ORDER BY date, id").fetchall()
+    archive.archive_before('2024-07-01')
+    assert len(archive.archived_years(conn)) == archive.MAX_ATTACHED + 3
+
+    with pytest.raises(ValueError, match="more than the 10"):
+        archive.union_source(conn, 'worker_production')
+    spans = archive.archive_spans(conn)
+    assert spans == [(None, '2020-01-01'), ('2020-01-01', None)]
+    assert len(archive.archive_spans(conn, '2015-01-01', '2024-01-01')) == 1
+
+    assert exporter.export_rows('production', str(tmp_path / 'all.csv'))['rows'] == total
+    assert [record.id for record in database.get_production_between('2000-01-01', '2024-01-01')] == \
+        [row[0] for row in old]
+    assert len(conn.execute("PRAGMA database_list").fetchall()) <= 2 + archive.MAX_ATTACHED
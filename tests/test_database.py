@@ -0,0 +1,130 @@
+"""Writes in database.py: version checks, invoicing rules and the production_daily rollup."""
+import pytest
+
+import connection
+import database
+from database import ConflictError
+
+
+def test_update_order_checks_the_version(seeded_db):
+    order = database.get_order(1)
+    fields = (order.client_id, order.design_id, order.quantity + 1, order.order_date, order.deadline, order.status)
+    version = database.update_order(1, order.version, *fields)
+    assert version == order.version + 1
+    assert database.get_order(1).quantity == order.quantity + 1
+
+    # A second clerk still holding the old version must not overwrite the change
+    with pytest.raises(ConflictError):
+        database.update_order(1, order.version, *fields)
+    assert database.get_order(1).version == version
+
+
+def test_update_order_of_a_deleted_order_conflicts(seeded_db):
+    order = database.get_order(2)
+    with connection.transaction() as conn:
+        conn.execute("DELETE FROM orders WHERE id = 2")
+    with pytest.raises(ConflictError):
+        database.update_order(2, order.version, order.client_id, order.design_id, order.quantity,
+                              order.order_date, order.deadline, order.status)
+
+
+def test_set_invoice_status_checks_the_version(seeded_db):
+    invoice_id = database.create_invoice(1)['invoice_id']
+    invoice = database.get_invoice(invoice_id)
+    assert database.set_invoice_status(invoice_id, invoice.version, 'Paid') == invoice.version + 1
+    with pytest.raises(ConflictError):
+        database.set_invoice_status(invoice_id, invoice.version, 'Unpaid')
+    assert database.get_invoice(invoice_id).status == 'Paid'
+
+
+def test_create_invoice_prices_the_order(seeded_db):
+    order = database.get_order(3)
+    design = database.get_design(order.design_id)
+    invoice = database.create_invoice(3, tax=10, discount=5)
+    assert invoice['subtotal'] == design[3] * order.quantity
+    assert invoice['total'] == pytest.approx(invoice['subtotal'] * 1.1 - 5)
+    assert database.get_order(3).status == 'Invoiced'
+    assert database.create_invoice(10 ** 6) is None
+
+
+def test_create_invoice_refuses_cancelled_and_invoiced_orders(seeded_db):
+    order = database.get_order(4)
+    database.update_order(4, order.version, order.client_id, order.design_id, order.quantity,
+                          order.order_date, order.deadline, 'Cancelled')
+    with pytest.raises(ConflictError, match="cancelled"):
+        database.create_invoice(4)
+
+    database.create_invoice(5)
+    with pytest.raises(ConflictError, match="already been invoiced"):
+        database.create_invoice(5)
+
+    # Reopening an invoiced order by hand does not make it invoiceable again
+    order = database.get_order(5)
+    database.update_order(5, order.version, order.client_id, order.design_id, order.quantity,
+                          order.order_date, order.deadline, 'Pending')
+    with pytest.raises(ConflictError, match="already been invoiced"):
+        database.create_invoice(5)
+
+
+def test_create_invoices_skips_ineligible_orders(seeded_db):
+    database.create_invoice(1)
+    order = database.get_order(2)
+    database.update_order(2, order.version, order.client_id, order.design_id, order.quantity,
+                          order.order_date, order.deadline, 'Cancelled')
+
+    result = database.create_invoices([1, 2, 3, 4, 10 ** 6], tax=5)
+    assert sorted(result['order_ids']) == [3, 4]
+    assert result['count'] == 2
+    assert {database.get_order(order_id).status for order_id in (3, 4)} == {'Invoiced'}
+
+    # Everything else, and nothing twice
+    result = database.create_invoices()
+    assert result['count'] == 200 - 4
+    assert database.create_invoices()['count'] == 0
+    assert database.get_uninvoiced_orders() == []
+
+
+def test_uninvoiced_orders_survive_null_order_ids(seeded_db):
+    # NOT IN would match nothing once invoices held a NULL order_id
+    with connection.transaction() as conn:
+        conn.execute("INSERT INTO invoices (order_id, invoice_date, amount, total_amount) "
+                     "VALUES (NULL, '2024-01-01', 0, 0)")
+    assert len(database.get_uninvoiced_orders()) == 200
+
+
+def test_production_daily_follows_inserts_updates_and_deletes(seeded_db):
+    record_id = database.record_production(1, 1, 7, '2024-02-03')
+    database.record_production_many([(1, 1, 3, '2024-02-03'), (2, 1, 4, '2024-02-04')])
+    with connection.transaction() as conn:
+        conn.execute("UPDATE worker_production SET quantity = 8, date = '2024-02-05' WHERE id = ?", (record_id,))
+        conn.execute("DELETE FROM worker_production WHERE id = (SELECT MIN(id) FROM worker_production)")
+    assert database.check_production_daily() == []
+
+
+def test_bulk_production_load_keeps_the_rollup_exact(seeded_db):
+    with database.bulk_production_load() as conn:
+        conn.executemany("INSERT INTO worker_production (worker_id, design_id, quantity, date) VALUES (?, ?, ?, ?)",
+                         [(1 + i % 10, 1 + i % 7, 1 + i % 30, f"2024-03-{1 + i % 28:02d}") for i in range(500)])
+    assert database.check_production_daily() == []
+    # The triggers are back for ordinary inserts
+    database.record_production(1, 1, 5, '2024-03-01')
+    assert database.check_production_daily() == []
+
+
+def test_rebuild_production_daily_repairs_the_rollup(seeded_db):
+    with connection.transaction() as conn:
+        conn.execute("UPDATE production_daily SET quantity = quantity + 1 "
+                     "WHERE date = (SELECT MIN(date) FROM production_daily)")
+        damaged = conn.execute("SELECT COUNT(*) FROM production_daily "
+                               "WHERE date = (SELECT MIN(date) FROM production_daily)").fetchone()[0]
+    assert len(database.check_production_daily()) == damaged
+    database.rebuild_production_daily()
+    assert database.check_production_daily() == []
+
+
+def test_salary_matches_payroll(seeded_db):
+    payroll = {row[0]: row for row in database.run_payroll(6, 2024)}
+    for worker_id in (1, 5, 10):
+        salary = database.calculate_worker_salary(worker_id, 6, 2024)
+        assert salary['total_quantity'] == payroll[worker_id][2]
+        assert salary['salary'] == pytest.approx(payroll[worker_id][5])
@@ -0,0 +1,62 @@
+"""Streaming export to CSV and JSON Lines."""
+import csv
+import json
+import os
+
+import pytest
+
+import database
+import exporter
+
+
+def test_orders_export_csv(seeded_db, tmp_path):
+    (tmp_path / 'out').mkdir()
+    path = tmp_path / 'out' / 'orders.csv'
+    result = exporter.export_rows('orders', str(path), batch_size=7)
+    assert result['rows'] == 200
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == exporter.EXPORTS['orders'][0]
+    dates = [row[6] for row in rows[1:]]
+    assert len(dates) == 200 and dates == sorted(dates)
+    # Only the finished file is left in the directory
+    assert os.listdir(tmp_path / 'out') == ['orders.csv']
+
+
+def test_production_export_jsonl_by_period(seeded_db, tmp_path):
+    path = tmp_path / 'june.jsonl'
+    result = exporter.export_rows('production', str(path), start='2024-06-01', end='2024-07-01')
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    expected = database.get_db_connection().execute(
+        "SELECT COUNT(*) FROM worker_production WHERE date >= '2024-06-01' AND date < '2024-07-01'").fetchone()[0]
+    assert result['rows'] == len(records) == expected
+    assert all('2024-06-01' <= record['date'] < '2024-07-01' for record in records)
+    assert set(records[0]) == set(exporter.EXPORTS['production'][0])
+
+
+def test_payroll_export_matches_run_payroll(seeded_db, tmp_path):
+    path = tmp_path / 'payroll.csv'
+    exporter.export_payroll(6, 2024, str(path))
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))[1:]
+    assert [(int(row[0]), int(row[2])) for row in rows] == [(row[0], row[2]) for row in database.run_payroll(6, 2024)]
+
+
+def test_payroll_export_needs_a_period(seeded_db, tmp_path):
+    with pytest.raises(ValueError):
+        exporter.export_rows('payroll', str(tmp_path / 'payroll.csv'))
+
+
+def test_failed_export_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'out.csv'
+    path.write_text('old')
+
+    def batches():
+        yield [(1,)]
+        raise RuntimeError("cursor failed")
+
+    with pytest.raises(RuntimeError):
+        exporter.write_rows(('id',), batches(), str(path))
+    assert path.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['out.csv']
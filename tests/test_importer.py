@@ -0,0 +1,77 @@
+"""CSV import: name/id resolution, rejected rows and the rollup after a bulk load."""
+import pytest
+
+import database
+import importer
+from lookups import client_lookup
+
+
+def write_csv(path, text):
+    path.write_text(text, encoding='utf-8')
+    return path
+
+
+def test_production_import_resolves_names_and_ids(seeded_db, tmp_path):
+    path = write_csv(tmp_path / 'shift.csv',
+                     "Worker,Design,Quantity,Date\n"
+                     "Worker 1,Design 2,10,2025-06-01\n"
+                     "3, 4 ,5,2025-06-01\n"
+                     "\n"
+                     "Worker 1,Design 2,7,2025-06-02\n")
+    before = database.get_db_connection().execute("SELECT MAX(id) FROM worker_production").fetchone()[0]
+    result = importer.import_csv('production', path, chunk_size=2)
+    assert result['imported'] == 3
+    assert result['rejected'] == []
+    assert result['per_second'] > 0
+
+    rows = database.get_db_connection().execute(
+        "SELECT w.name, d.name, quantity, date FROM worker_production wp "
+        "JOIN workers w ON w.id = wp.worker_id JOIN designs d ON d.id = wp.design_id "
+        "WHERE wp.id > ? ORDER BY date, quantity", (before,)).fetchall()
+    # Seeded names count from 0, so id 3 is 'Worker 2'
+    assert rows == [('Worker 2', 'Design 3', 5, '2025-06-01'), ('Worker 1', 'Design 2', 10, '2025-06-01'),
+                    ('Worker 1', 'Design 2', 7, '2025-06-02')]
+    assert database.check_production_daily() == []
+
+
+def test_production_import_reports_rejected_lines(seeded_db, tmp_path):
+    path = write_csv(tmp_path / 'shift.csv',
+                     "worker,design,quantity,date\n"
+                     "Nobody,Design 1,5,2025-06-01\n"
+                     "Worker 1,Design 1,0,2025-06-01\n"
+                     "Worker 1,Design 1,x,2025-06-01\n"
+                     "Worker 1,Design 1,5,01/06/2025\n"
+                     "Worker 1,Design 1,5,2025-06-01\n")
+    result = importer.import_csv('production', path)
+    assert result['imported'] == 1
+    assert [line for line, message in result['rejected']] == [2, 3, 4, 5]
+    assert "unknown worker 'Nobody'" in result['rejected'][0][1]
+
+
+def test_missing_required_column_is_an_error(seeded_db, tmp_path):
+    path = write_csv(tmp_path / 'shift.csv', "worker,design,date\nWorker 1,Design 1,2025-06-01\n")
+    with pytest.raises(ValueError, match="quantity"):
+        importer.import_csv('production', path)
+
+
+def test_order_import_checks_status(seeded_db, tmp_path):
+    path = write_csv(tmp_path / 'orders.csv',
+                     "client,design,quantity,order_date,deadline,status\n"
+                     "Client 1,Design 1,100,2025-06-01,2025-07-01,\n"
+                     "Client 1,Design 1,100,2025-06-01,2025-07-01,Invoiced\n"
+                     "Client 1,Design 1,100,2025-06-01,2025-07-01,Lost\n")
+    result = importer.import_csv('orders', path)
+    assert result['imported'] == 2
+    assert result['rejected'] == [(4, "invalid status 'Lost'")]
+    statuses = [row[0] for row in database.get_db_connection().execute(
+        "SELECT status FROM orders WHERE id > 200 ORDER BY id")]
+    assert statuses == ['Pending', 'Invoiced']
+
+
+def test_client_import_refreshes_the_lookup(seeded_db, tmp_path):
+    assert len(client_lookup.rows()) == 20
+    path = write_csv(tmp_path / 'clients.csv', "name,company\nNew Client,New Co\n,No Name\n")
+    result = importer.import_csv('clients', path)
+    assert result['imported'] == 1
+    assert result['rejected'] == [(3, "name is required")]
+    assert 'New Client' in [row[1] for row in client_lookup.rows()]
@@ -0,0 +1,59 @@
+"""Invoice documents: the HTML template, and PDF output where WeasyPrint can run."""
+import os
+
+import pytest
+
+import database
+import invoice_pdf
+
+
+def weasyprint_error():
+    # WeasyPrint imports fine without Pango/Cairo only to fail with OSError
+    try:
+        import weasyprint  # noqa: F401
+    except (ImportError, OSError) as e:
+        return e
+    return None
+
+
+needs_weasyprint = pytest.mark.skipif(weasyprint_error() is not None,
+                                      reason="WeasyPrint or its system libraries are not installed")
+
+
+@pytest.fixture
+def invoices(seeded_db):
+    database.create_invoice(1, tax=10, discount=2)
+    database.create_invoices([2, 3])
+    return [database.get_invoice_details(invoice_id) for invoice_id in (1, 2, 3)]
+
+
+def test_invoice_html(invoices):
+    invoice = invoices[0]
+    html = invoice_pdf.render_invoice_html(invoice)
+    assert f"Invoice #{invoice['invoice_id']}" in html
+    assert invoice['client_name'] in html and invoice['design_name'] in html
+    assert f"PKR {invoice['total']:.2f}" in html
+
+
+@pytest.mark.skipif(weasyprint_error() is None, reason="WeasyPrint is installed")
+def test_missing_weasyprint_is_reported(invoices, tmp_path):
+    out_dir = tmp_path / 'invoices'
+    with pytest.raises(RuntimeError, match="WeasyPrint"):
+        invoice_pdf.export_invoice_pdf(invoices[0], str(out_dir))
+    assert not out_dir.exists() or os.listdir(out_dir) == []
+
+
+@needs_weasyprint
+def test_invoice_pdf(invoices, tmp_path):
+    path, pages = invoice_pdf.export_invoice_pdf(invoices[0], str(tmp_path / 'invoices'))
+    assert os.path.basename(path) == 'invoice_1.pdf' and pages >= 1
+    with open(path, 'rb') as f:
+        assert f.read(5) == b'%PDF-'
+
+
+@needs_weasyprint
+def test_invoice_pdfs_in_parallel(invoices, tmp_path):
+    out_dir = tmp_path / 'invoices'
+    result = invoice_pdf.export_invoices_pdf(invoices, str(out_dir), workers=2)
+    assert result['count'] == 3 and result['pages'] >= 3
+    assert sorted(os.listdir(out_dir)) == ['invoice_1.pdf', 'invoice_2.pdf', 'invoice_3.pdf']
@@ -0,0 +1,54 @@
+"""Piece-rate payroll: the NumPy and row-by-row paths agree and apply the pay rules."""
+import pytest
+
+import connection
+import database
+import payroll
+
+
+def piece_payroll(vectorized, **kwargs):
+    return payroll.piece_payroll_between('2024-06-01', '2024-07-01', vectorized=vectorized, **kwargs)
+
+
+@pytest.fixture(params=[False, True], ids=['rows', 'numpy'])
+def vectorized(request):
+    if request.param and payroll.np is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+def test_both_paths_agree(seeded_db):
+    if payroll.np is None:
+        pytest.skip("NumPy is not installed")
+    assert piece_payroll(True) == piece_payroll(False)
+    assert piece_payroll(True, rates={1: 9.0}, adjustments={2: -10}) == \
+        piece_payroll(False, rates={1: 9.0}, adjustments={2: -10})
+
+
+def test_pay_is_quantity_times_design_rate(db, vectorized):
+    with connection.transaction() as conn:
+        conn.execute("INSERT INTO workers (name, hourly_rate) VALUES ('Idle', 10), ('Busy', 10)")
+        conn.execute("INSERT INTO designs (name, base_price, complexity_level) VALUES ('Easy', 1, 1), ('Hard', 1, 5)")
+    database.record_production_many([(2, 1, 10, '2024-06-03'), (2, 2, 4, '2024-06-04'),
+                                     (2, 2, 100, '2024-07-01')])
+    rows = {row[1]: row for row in piece_payroll(vectorized)}
+    easy, hard = payroll.PIECE_RATES[1], payroll.PIECE_RATES[5]
+    assert rows['Busy'] == (2, 'Busy', 14, round(10 * easy + 4 * hard, 2), 0, 0, round(10 * easy + 4 * hard, 2))
+    assert rows['Idle'] == (1, 'Idle', 0, 0, 0, 0, 0)
+
+
+def test_bonus_deductions_and_adjustments(db, vectorized, monkeypatch):
+    monkeypatch.setattr(payroll, 'BONUS_THRESHOLD', 10)
+    monkeypatch.setattr(payroll, 'DEDUCTION_RATE', 0.1)
+    with connection.transaction() as conn:
+        conn.execute("INSERT INTO workers (name, hourly_rate) VALUES ('A', 10), ('B', 10)")
+        conn.execute("INSERT INTO designs (name, base_price, complexity_level) VALUES ('D', 1, 1)")
+    database.record_production_many([(1, 1, 30, '2024-06-03'), (2, 1, 5, '2024-06-03')])
+    rows = {row[0]: row for row in piece_payroll(vectorized, rates={1: 1.0}, adjustments={1: 5, 2: -2})}
+
+    # A: 30 items, 20 over the threshold earn the bonus rate; +5 adjustment
+    bonus = 20 * payroll.BONUS_RATE
+    deductions = (30 + bonus) * 0.1
+    assert rows[1][2:] == (30, 30.0, round(bonus + 5, 2), round(deductions, 2), round(30 + bonus + 5 - deductions, 2))
+    # B: under the threshold; the negative adjustment is withheld
+    assert rows[2][2:] == (5, 5.0, 0.0, round(0.5 + 2, 2), round(5 - 0.5 - 2, 2))
@@ -0,0 +1,79 @@
+"""The database.py queries are served by the schema's indexes.
+
+Every statement a helper sends to SQLite is captured with a trace callback
+and re-run under EXPLAIN QUERY PLAN; each plan must use the indexes listed
+for its helper.
+"""
+from datetime import date
+
+import pytest
+
+import connection
+import database
+
+# helper name -> (call, index usages that must appear in its plans)
+CHECKS = {
+    'get_all_orders': (lambda: database.get_all_orders(),
+                       ['idx_orders_order_date']),
+    'get_production_records': (lambda: database.get_production_records(),
+                               ['idx_worker_production_date']),
+    'calculate_worker_salary': (lambda: database.calculate_worker_salary(1, 3, 2024),
+                                ['idx_production_daily_worker_date (worker_id=? AND date>? AND date<?)']),
+    # Keyset pages: a later page seeks past its cursor rather than scanning to it
+    'get_orders_page': (lambda: database.get_orders_page(),
+                        ['idx_orders_order_date']),
+    'get_orders_page.cursor': (lambda: database.get_orders_page('2024-06-01|5'),
+                               ['idx_orders_order_date (order_date<?)']),
+    'get_production_page.cursor': (lambda: database.get_production_page('2024-06-01|5'),
+                                   ['idx_worker_production_date (date<?)']),
+    'get_invoices_page.cursor': (lambda: database.get_invoices_page('2030-01-01|5'),
+                                 ['idx_invoices_invoice_date (invoice_date<?)']),
+    # Searches go through the FTS5 indexes (a MATCH lookup, "INDEX 0:M")
+    'search_clients': (lambda: database.search_clients('Client 1'),
+                       ['f VIRTUAL TABLE INDEX 0:M', 't USING INTEGER PRIMARY KEY']),
+    'search_designs': (lambda: database.search_designs('Design'),
+                       ['f VIRTUAL TABLE INDEX 0:M', 't USING INTEGER PRIMARY KEY']),
+    'search_orders_page': (lambda: database.search_orders_page('Client 3'),
+                           ['clients_fts VIRTUAL TABLE INDEX 0:M', 'designs_fts VIRTUAL TABLE INDEX 0:M',
+                            'idx_orders_order_date']),
+    'search_orders_page.cursor': (lambda: database.search_orders_page('Client 3', '2024-06-01|5'),
+                                  ['clients_fts VIRTUAL TABLE INDEX 0:M', 'idx_orders_order_date (order_date<?)']),
+    'run_payroll': (lambda: database.run_payroll(3, 2024),
+                    ['idx_production_daily_worker_date (worker_id=? AND date>? AND date<?)']),
+    'get_dashboard': (lambda: database.get_dashboard(date(2024, 12, 28)),
+                      ['production_daily USING PRIMARY KEY (date>? AND date<?)',
+                       'COVERING INDEX idx_orders_open_deadline',
+                       'idx_orders_open_deadline (deadline>? AND deadline<?)',
+                       'COVERING INDEX idx_invoices_status_total (status=?)']),
+}
+
+
+@pytest.fixture(scope='module', autouse=True)
+def analyzed_database(large_db):
+    # Invoice most orders so the planner's statistics see a realistic invoices table
+    database.create_invoices(range(1, 1500))
+    connection.get_connection().execute("ANALYZE")
+
+
+def capture_statements(call):
+    conn = connection.get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith('SELECT')]
+
+
+def query_plan(sql):
+    conn = connection.get_connection()
+    return [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+
+
+@pytest.mark.parametrize('name', CHECKS)
+def test_query_uses_indexes(name):
+    call, indexes = CHECKS[name]
+    details = [line for sql in capture_statements(call) for line in query_plan(sql)]
+    missing = [ix for ix in indexes if not any(ix in line for line in details)]
+    assert not missing, f"{name} does not use {missing}; plan:\n" + "\n".join(details)
@@ -0,0 +1,59 @@
+"""Statement timing: finished, failed and abandoned cursors."""
+import gc
+
+import pytest
+
+import connection
+import querylog
+
+
+@pytest.fixture
+def log(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(querylog, 'SLOW_LOG_PATH', str(tmp_path / 'slow.log'))
+    querylog.reset()
+    yield
+    querylog.reset()
+
+
+def stats(sql):
+    return next(row for row in querylog.snapshot() if row['sql'] == sql)
+
+
+def test_statement_is_timed_through_its_last_row(log):
+    conn = connection.get_connection()
+    conn.execute("SELECT * FROM workers").fetchall()
+    conn.execute("INSERT INTO workers (name) VALUES ('A'), ('B')")
+    assert stats("SELECT * FROM workers")['calls'] == 1
+    assert stats("INSERT INTO workers (name) VALUES ('A'), ('B')")['rows'] == 2
+    with pytest.raises(Exception):
+        conn.execute("SELECT * FROM nowhere")
+    assert stats("SELECT * FROM nowhere")['errors'] == 1
+
+
+def test_slow_statement_is_logged_with_its_plan(log, monkeypatch):
+    monkeypatch.setattr(querylog, 'SLOW_QUERY_MS', 0)
+    connection.get_connection().execute("SELECT * FROM workers WHERE id = ?", (1,)).fetchall()
+    row = stats("SELECT * FROM workers WHERE id = ?")
+    assert row['slow_calls'] == 1 and row['last_plan']
+    with open(querylog.SLOW_LOG_PATH, encoding='utf-8') as f:
+        assert "plan: SEARCH workers" in f.read()
+
+
+def test_abandoned_cursor_is_recorded_without_sql(log, monkeypatch):
+    monkeypatch.setattr(querylog, 'SLOW_QUERY_MS', 0)
+    conn = connection.get_connection()
+    with connection.transaction():
+        conn.executemany("INSERT INTO workers (name) VALUES (?)", [('A',), ('B',), ('C',)])
+
+    def no_sql(*args):
+        raise AssertionError("EXPLAIN run while collecting a cursor")
+
+    monkeypatch.setattr(querylog, '_explain', no_sql)
+    cursor = conn.execute("SELECT name FROM workers ORDER BY name")
+    cursor.fetchone()
+    del cursor
+    gc.collect()
+
+    row = stats("SELECT name FROM workers ORDER BY name")
+    assert row['calls'] == 1 and row['rows'] == 1
+    assert row['slow_calls'] == 1 and row['last_plan'] is None
@@ -0,0 +1,80 @@
+"""Production schedule: kept up to date, it stays identical to a fresh build."""
+from datetime import date, timedelta
+
+import pytest
+
+import database
+import scheduler
+
+TODAY = date(2024, 12, 1)
+
+
+def fresh_plan(today=TODAY):
+    schedule = scheduler.Scheduler(today)
+    return schedule.summary(), schedule.rows()
+
+
+@pytest.fixture
+def schedule(seeded_db):
+    schedule = scheduler.Scheduler(TODAY)
+    schedule.replan()
+    return schedule
+
+
+def test_plan_covers_the_open_orders(schedule):
+    counts = schedule.summary()
+    assert counts['scheduled'] + counts['made'] + counts['unscheduled'] == 200
+    rows = schedule.rows()
+    assert len(rows) == counts['scheduled']
+    for order_id, design_id, remaining, worker_id, start, finish, deadline, late in rows:
+        assert remaining > 0 and start <= finish
+        assert late == (finish > deadline)
+    assert schedule.rows(late_only=True) == [row for row in rows if row[-1]]
+
+
+def test_an_impossible_order_is_late(schedule):
+    order_id = database.create_order(1, 1, 10 ** 6, TODAY.isoformat(), (TODAY + timedelta(days=1)).isoformat())
+    schedule.order_changed(order_id)
+    assert order_id in [row[0] for row in schedule.rows(late_only=True)]
+
+
+def test_changes_keep_the_plan_identical_to_a_rebuild(schedule):
+    day = (TODAY - timedelta(days=1)).isoformat()
+    for worker_id, design_id, quantity in [(1, 2, 40), (3, 2, 500), (4, 7, 1), (9, 9, 60)]:
+        database.record_production(worker_id, design_id, quantity, day)
+        schedule.record_production(worker_id, design_id, quantity, day)
+    assert (schedule.summary(), schedule.rows()) == fresh_plan()
+
+    new_order = database.create_order(2, 2, 300, TODAY.isoformat(), (TODAY + timedelta(days=20)).isoformat())
+    schedule.order_changed(new_order)
+    order = database.get_order(5)
+    database.update_order(5, order.version, order.client_id, order.design_id, order.quantity * 3,
+                          order.order_date, order.deadline, 'In Progress')
+    schedule.order_changed(5)
+    assert (schedule.summary(), schedule.rows()) == fresh_plan()
+
+    invoiced = database.create_invoices(range(10, 60))['order_ids']
+    schedule.orders_changed(invoiced)
+    assert (schedule.summary(), schedule.rows()) == fresh_plan()
+    assert not set(invoiced) & {row[0] for row in schedule.rows()}
+
+
+def test_a_new_day_rebuilds_the_plan(seeded_db, monkeypatch):
+    class Today(date):
+        day = TODAY
+
+        @classmethod
+        def today(cls):
+            return date(cls.day.year, cls.day.month, cls.day.day)
+
+    monkeypatch.setattr(scheduler, 'date', Today)
+    schedule = scheduler.Scheduler()
+    first = schedule.rows()
+    assert schedule.day == TODAY
+
+    # Changes on the next day are read by the rebuild instead of being applied to yesterday's plan
+    Today.day = TODAY + timedelta(days=1)
+    schedule.record_production(1, 1, 10, Today.day.isoformat())
+    assert schedule.rows() == fresh_plan(Today.day)[1]
+    assert schedule.day == Today.day
+    assert schedule.rows() != first
@@ -0,0 +1,102 @@
+"""The HTTP service, over a real socket."""
+import asyncio
+import http.client
+import json
+import threading
+from urllib.parse import quote
+
+import pytest
+
+import database
+import server
+
+
+@pytest.fixture
+def api(seeded_db):
+    """request(method, path, body=None) -> (status, payload) against a running server"""
+    started = threading.Event()
+    state = {}
+
+    def ready(port):
+        state['port'] = port
+        started.set()
+
+    async def run():
+        state['loop'] = asyncio.get_running_loop()
+        state['task'] = asyncio.current_task()
+        try:
+            await server.serve('127.0.0.1', 0, ready=ready)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=asyncio.run, args=(run(),))
+    thread.start()
+    assert started.wait(10)
+    client = http.client.HTTPConnection('127.0.0.1', state['port'], timeout=10)
+
+    def request(method, path, body=None):
+        client.request(method, path, body=None if body is None else json.dumps(body))
+        response = client.getresponse()
+        return response.status, json.loads(response.read())
+
+    yield request
+    client.close()
+    state['loop'].call_soon_threadsafe(state['task'].cancel)
+    thread.join(10)
+
+
+def test_lists_and_pages(api):
+    status, workers = api('GET', '/workers')
+    assert status == 200 and len(workers) == 10
+    status, page = api('GET', '/orders')
+    assert status == 200 and len(page['rows']) == database.PAGE_SIZE == 200
+    # A full page always has a cursor; the page after the last one is empty
+    assert api('GET', '/orders?cursor=' + quote(page['next']))[1] == {'rows': [], 'next': None}
+    status, page = api('GET', '/production')
+    assert len(page['rows']) == database.PAGE_SIZE and page['next']
+    status, second = api('GET', '/production?cursor=' + quote(page['next']))
+    assert status == 200 and not {row[0] for row in page['rows']} & {row[0] for row in second['rows']}
+    assert api('GET', '/orders?cursor=bad')[0] == 400
+    status, clients = api('GET', '/clients?q=Client%201')
+    assert status == 200 and all('Client 1' in row[1] for row in clients)
+
+
+def test_order_edit_with_version_check(api):
+    status, shown = api('GET', '/orders/1')
+    assert status == 200 and shown['order'][0] == 1
+    order = database.get_order(1)
+    fields = {'client_id': order.client_id, 'design_id': order.design_id, 'quantity': order.quantity + 1,
+              'order_date': order.order_date, 'deadline': order.deadline, 'status': 'In Progress'}
+    status, changed = api('PUT', '/orders/1', dict(fields, version=shown['version']))
+    assert status == 200 and changed['version'] == shown['version'] + 1
+    assert changed['order'][3] == order.quantity + 1
+    # The same stale version again is a conflict
+    assert api('PUT', '/orders/1', dict(fields, version=shown['version']))[0] == 409
+
+
+def test_writes(api):
+    status, row = api('POST', '/production', {'worker_id': 1, 'design_id': 2, 'quantity': 5, 'date': '2025-06-01'})
+    assert status == 201 and row[3] == 5 and row[4] == '2025-06-01'
+    shift = [{'worker_id': 2, 'design_id': 3, 'quantity': 1, 'date': '2025-06-01'}] * 3
+    assert api('POST', '/production', shift) == (201, {'count': 3})
+    assert database.check_production_daily() == []
+
+    status, row = api('POST', '/orders', {'client_id': 1, 'design_id': 1, 'quantity': 10,
+                                         'order_date': '2025-06-01', 'deadline': '2025-07-01'})
+    assert status == 201 and row[-1] == 'Pending'
+    status, invoice = api('POST', '/invoices', {'order_id': row[0]})
+    assert status == 201
+    assert api('GET', f"/invoices/{invoice['invoice_id']}")[1]['order_id'] == row[0]
+    assert api('POST', '/invoices', {'order_id': row[0]}) == (400, {'error': f"Order {row[0]} is invoiced"})
+
+
+def test_errors(api):
+    assert api('GET', '/nowhere')[0] == 404
+    assert api('DELETE', '/orders')[0] == 405
+    assert api('GET', '/orders/999999')[0] == 404
+    assert api('POST', '/production', {'worker_id': 1, 'design_id': 2, 'quantity': -1, 'date': '2025-06-01'})[0] == 400
+    assert api('POST', '/production', {'worker_id': 999, 'design_id': 2, 'quantity': 1, 'date': '2025-06-01'})[0] \
+        == 400
+    # 404s and 405s are answered without reaching the database thread
+    status, stats = api('GET', '/stats')
+    assert status == 200 and stats['requests'] == 3 and stats['retries'] == 0